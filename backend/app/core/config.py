@@ -26,6 +26,128 @@ class Settings(BaseSettings):
     # Alternative LLM settings (for local models)
     use_local_llm: bool = False
     local_llm_url: Optional[str] = None
+    local_llm_urls: Optional[str] = None  # comma-separated replicas; overrides local_llm_url
+    
+    # Routing across local LLM replicas (EWMA latency x in-flight) and hedging
+    llm_routing_ewma_alpha: float = 0.3
+    enable_llm_hedging: bool = False
+    llm_hedge_percentile: float = 95.0  # duplicate calls slower than this latency percentile
+    llm_hedge_min_delay_ms: float = 50.0
+    
+    # Micro-batching of classification prompts (batch-capable local LLM only)
+    enable_local_llm_batching: bool = False
+    local_llm_batch_url: Optional[str] = None
+    local_llm_batch_max_size: int = 8
+    local_llm_batch_max_wait_ms: int = 20
+    
+    # LLM HTTP connection pool settings (shared by OpenAI and local LLM clients)
+    llm_pool_max_connections: int = 100
+    llm_pool_max_keepalive_connections: int = 20
+    llm_pool_keepalive_expiry: float = 30.0  # seconds
+    llm_http2: bool = False
+    llm_connect_timeout: float = 5.0
+    llm_read_timeout: float = 60.0
+    llm_write_timeout: float = 10.0
+    llm_pool_timeout: float = 5.0  # max wait for a free pooled connection
+    
+    # LLM concurrency limits (separate pools per task, bounded wait queue)
+    llm_max_concurrency_classify: int = 8
+    llm_max_concurrency_advice: int = 4
+    llm_max_queue_classify: int = 50
+    llm_max_queue_advice: int = 20
+    llm_max_queue_wait: float = 10.0  # seconds before a queued call is rejected
+    
+    # Priority lanes for queued LLM calls (issue urgency; speculative work runs in
+    # background). Priority is the lane weight plus the aging rate per second waited.
+    enable_llm_priority: bool = True
+    llm_priority_weight_high: float = 3.0
+    llm_priority_weight_medium: float = 2.0
+    llm_priority_weight_low: float = 1.0
+    llm_priority_weight_background: float = 0.0
+    llm_priority_aging_rate: float = 0.5  # weight gained per second queued; 0 = strict priority
+    
+    # Per-task model settings: classification needs a short answer, advice is long-form.
+    # Unset OpenAI models fall back to openai_model; local models are sent as "model" when set.
+    classify_model: Optional[str] = None
+    classify_max_tokens: int = 200
+    classify_temperature: float = 0.1
+    advice_model: Optional[str] = None
+    advice_max_tokens: Optional[int] = None  # defaults to openai_max_tokens
+    advice_temperature: float = 0.1
+    local_llm_classify_model: Optional[str] = None
+    local_llm_advice_model: Optional[str] = None
+    
+    # Retry classifications below the threshold on the advice model
+    enable_model_escalation: bool = False
+    model_escalation_threshold: float = 0.5
+    
+    # Prompt versions (see app/services/prompts.py); unknown versions use the newest
+    classify_prompt_version: str = "v2"
+    advice_prompt_version: str = "v2"
+    combined_prompt_version: str = "v1"
+    
+    # Structured LLM output: off, json_object or json_schema (OpenAI response_format,
+    # json_schema field for local servers), plus re-asks when output fails validation
+    # (repairs only happen when structured output is on)
+    llm_structured_output: str = "off"
+    llm_repair_attempts: int = 1
+    
+    # LLM circuit breaker (one per backend; fail fast while a backend is degraded)
+    enable_llm_circuit_breaker: bool = True
+    llm_circuit_window: int = 20  # most recent calls considered
+    llm_circuit_min_calls: int = 5
+    llm_circuit_error_rate: float = 0.5
+    llm_circuit_slow_call_ms: float = 30000.0
+    llm_circuit_slow_rate: float = 0.5
+    llm_circuit_open_seconds: float = 30.0  # wait before a half-open probe
+    
+    # LLM call log (llm_call_log table, written in the background)
+    enable_llm_call_log: bool = True
+    llm_call_log_queue_size: int = 1000  # records beyond this are dropped, never waited on
+    llm_call_log_batch_size: int = 100
+    
+    # Daily LLM budgets per task (UTC days; unset means unlimited). Over budget,
+    # calls are not made and callers get cached or deterministic answers. Usage
+    # of capped tasks is counted in the database, so the caps hold across workers.
+    llm_daily_token_budget_classify: Optional[int] = None
+    llm_daily_token_budget_advice: Optional[int] = None
+    llm_daily_call_budget_classify: Optional[int] = None
+    llm_daily_call_budget_advice: Optional[int] = None
+    
+    # Speculative advice generation right after /api/analyze
+    enable_speculative_advice: bool = False
+    speculative_advice_ttl: int = 600  # seconds an unclaimed result is kept
+    speculative_advice_max_entries: int = 500
+    
+    # Share one upstream call between concurrent identical prompts
+    enable_request_coalescing: bool = True
+    
+    # Classification cache settings
+    classification_cache_backend: str = "memory"  # memory, sqlite, redis, none
+    classification_cache_max_entries: int = 10000
+    classification_cache_ttl: int = 3600  # seconds
+    classification_cache_path: str = "./classification_cache.db"
+    classification_cache_evict_interval: float = 60.0  # seconds between sqlite eviction sweeps
+    classification_cache_redis_dedicated: bool = False  # REDIS_URL's database holds only this cache
+    redis_url: str = "redis://localhost:6379/0"
+    
+    # Fast-path classifier settings (answer obvious cases without the LLM)
+    enable_fast_classifier: bool = False  # opt-in: keyword matches can misroute discrimination cases
+    fast_classifier_threshold: float = 0.85
+    fast_classifier_train_on_history: bool = False
+    fast_classifier_training_limit: int = 5000
+    
+    # Near-duplicate issue detection (MinHash/LSH over stored descriptions, same location)
+    enable_issue_dedup: bool = False
+    issue_dedup_threshold: float = 0.8  # estimated Jaccard similarity of word bigrams
+    issue_dedup_num_perm: int = 64
+    issue_dedup_bands: int = 16  # num_perm must be 1, 2 or 4 times this
+    issue_dedup_load_limit: int = 1000000  # stored issues indexed at startup
+    
+    # Batch intake (/api/analyze/batch)
+    batch_analyze_max_items: int = 1000
+    batch_analyze_concurrency: int = 8  # analyses in flight per batch
+    batch_analyze_write_size: int = 50  # categories saved per commit
     
     # Security settings
     secret_key: str = "your-secret-key-change-in-production"
@@ -38,6 +160,17 @@ class Settings(BaseSettings):
     
     # PDF generation settings
     pdf_output_dir: str = "./generated_documents"
+    template_cache_size: int = 256  # compiled document templates kept in memory
+    template_bytecode_cache_dir: Optional[str] = None  # persist compiled templates across restarts
+    template_index_check_interval: float = 30.0  # seconds between checks for template changes by other processes
+    pdf_render_workers: int = 2  # worker processes for PDF layout; 0 renders in a thread instead
+    pdf_render_max_queue: int = 32  # renders waiting for a worker beyond this get 503
+    pdf_render_timeout: float = 30.0  # seconds from submission, including the queue wait
+    lazy_pdf_rendering: bool = False  # render PDFs on first download instead of on generate
+    
+    # Bulk document generation (/api/generate/bulk)
+    bulk_generate_max_items: int = 500
+    bulk_generate_concurrency: int = 4  # documents in the render pool per request
     
     # Legal resources settings
     default_jurisdiction: str = "US"
@@ -0,0 +1,21 @@
+from fastapi import Request
+
+from app.services.llm_service import LLMService
+from app.services.legal_analyzer import LegalAnalyzer
+from app.services.document_generator import DocumentGenerator
+
+
+# Services are created once in the application lifespan (see main.py) and
+# shared by every request; these dependencies hand them to the routers.
+
+def get_llm_service(request: Request) -> LLMService:
+    """Dependency to get the shared LLM service."""
+    return request.app.state.llm_service
+
+def get_legal_analyzer(request: Request) -> LegalAnalyzer:
+    """Dependency to get the shared legal analyzer."""
+    return request.app.state.legal_analyzer
+
+def get_document_generator(request: Request) -> DocumentGenerator:
+    """Dependency to get the shared document generator."""
+    return request.app.state.document_generator
@@ -0,0 +1,35 @@
+from collections import deque
+from typing import Dict, Any
+
+
+class LatencyStats:
+    """Rolling window of latency samples (milliseconds) with summary percentiles."""
+
+    def __init__(self, window: int = 1000):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, value_ms: float):
+        self._samples.append(value_ms)
+        self.count += 1
+
+    def percentile(self, pct: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        samples = list(self._samples)
+        return {
+            "count": self.count,
+            "mean_ms": round(sum(samples) / len(samples), 2) if samples else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "max_ms": round(max(samples), 2) if samples else 0.0
+        }
+
+
+# Time from request start to the first streamed advice token (POST /api/advice/stream)
+advice_stream_ttfb = LatencyStats()
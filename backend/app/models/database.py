@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -10,6 +10,7 @@ class LegalIssue(Base):
     id = Column(Integer, primary_key=True, index=True)
     description = Column(Text, nullable=False)
     category = Column(String(100), nullable=True)
+    classification_source = Column(String(30), nullable=True)  # llm, cache, fast_path, near_duplicate, error_fallback, ...
     urgency = Column(String(20), default="medium")  # low, medium, high
     location = Column(String(100), nullable=True)
     user_email = Column(String(255), nullable=True)
@@ -88,3 +89,44 @@ class LegalResource(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+
+class LLMCallLog(Base):
+    """Model for storing one row per LLM call (telemetry and daily budgets)."""
+    __tablename__ = "llm_call_log"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    task = Column(String(20), nullable=False)  # classify, advice
+    backend = Column(String(20), nullable=False)  # openai, local_llm
+    model = Column(String(100), nullable=True)
+    prompt_version = Column(String(100), nullable=True)  # e.g. classify/v2, advice/v2+repair
+    latency_ms = Column(Float, nullable=True)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    tokens_estimated = Column(Boolean, default=False)
+    outcome = Column(String(30), nullable=False)  # success, error, circuit_open, overloaded, budget_exceeded
+    cache_hit = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class LLMBudgetUsage(Base):
+    """Model for one task's LLM usage on one UTC day, shared by all worker processes."""
+    __tablename__ = "llm_budget_usage"
+    __table_args__ = (UniqueConstraint("day", "task"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(String(10), nullable=False)  # ISO date, UTC
+    task = Column(String(20), nullable=False)  # classify, advice
+    tokens = Column(Integer, nullable=False, default=0)
+    calls = Column(Integer, nullable=False, default=0)  # includes calls in flight
+
+
+class DocumentBlob(Base):
+    """Model for one stored PDF file, shared by every generated document with the same content."""
+    __tablename__ = "document_blobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, unique=True, index=True)  # template version + content + layout
+    file_path = Column(String(500), nullable=False, unique=True, index=True)  # matches GeneratedDocument.file_path
+    size_bytes = Column(Integer, nullable=True)  # None until first rendered (lazy mode)
+    ref_count = Column(Integer, nullable=False, default=0)  # generated documents using this file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -8,6 +8,11 @@ class UrgencyLevel(str, Enum):
     MEDIUM = "medium"
     HIGH = "high"
 
+class ComplexityLevel(str, Enum):
+    SIMPLE = "simple"
+    MODERATE = "moderate"
+    COMPLEX = "complex"
+
 class LegalCategory(str, Enum):
     TENANT_RIGHTS = "tenant_rights"
     CONSUMER_PROTECTION = "consumer_protection"
@@ -37,10 +42,12 @@ class LegalIssueCreate(BaseModel):
     location: Optional[str] = Field(None, max_length=100)
     user_email: Optional[EmailStr] = None
     urgency: UrgencyLevel = UrgencyLevel.MEDIUM
+    reuse_similar: bool = True  # answer from a near-duplicate issue when one exists
 
 class AdviceRequest(BaseModel):
     issue_id: int
     additional_context: Optional[str] = None
+    reuse_similar: bool = True  # reuse advice given for a near-duplicate issue
 
 class DocumentGenerationRequest(BaseModel):
     issue_id: int
@@ -48,6 +55,15 @@ class DocumentGenerationRequest(BaseModel):
     document_type: DocumentType
     custom_data: Optional[Dict[str, Any]] = None
 
+class BulkDocumentItem(BaseModel):
+    issue_id: int
+    custom_data: Optional[Dict[str, Any]] = None
+
+class BulkDocumentGenerationRequest(BaseModel):
+    template_id: int
+    document_type: DocumentType
+    items: List[BulkDocumentItem] = Field(..., min_length=1)
+
 class ResourceSearchRequest(BaseModel):
     jurisdiction: str = "US"
     categories: Optional[List[LegalCategory]] = None
@@ -74,6 +90,7 @@ class LegalAdviceResponse(BaseModel):
     confidence: float
     model_used: Optional[str]
     generated_at: datetime
+    reused_from_issue: Optional[int] = None  # set when copied from a near-duplicate issue
     
     class Config:
         from_attributes = True
@@ -96,6 +113,8 @@ class GeneratedDocumentResponse(BaseModel):
     file_name: str
     generated_at: datetime
     download_url: str
+    # Set on generation: True when an identical stored PDF was reused
+    reused: Optional[bool] = None
     
     class Config:
         from_attributes = True
@@ -121,7 +140,22 @@ class AnalysisResponse(BaseModel):
     urgency: UrgencyLevel
     suggested_actions: List[str]
     relevant_templates: List[DocumentTemplateResponse]
-    estimated_complexity: str  # simple, moderate, complex
+    estimated_complexity: ComplexityLevel
+    classification_source: Optional[str] = None  # fast_path, cache, llm, llm_combined, near_duplicate, error_fallback
+    duplicate_of: Optional[int] = None  # near-duplicate issue the category was taken from
+    duplicate_similarity: Optional[float] = None
+
+# One NDJSON line of an /api/analyze/batch response
+class BatchAnalysisResult(BaseModel):
+    index: int  # position of the item in the submitted batch
+    issue_id: Optional[int] = None  # None when the item was rejected before being stored
+    analysis: Optional[AnalysisResponse] = None
+    error: Optional[str] = None
+
+class AnalysisWithAdviceResponse(BaseModel):
+    issue_id: int
+    analysis: AnalysisResponse
+    advice: LegalAdviceResponse
 
 class HealthResponse(BaseModel):
     status: str
@@ -129,9 +163,36 @@ class HealthResponse(BaseModel):
     version: str
     database_connected: bool
     llm_available: bool
+    llm_circuit: Optional[Dict[str, Any]] = None  # breaker state per LLM backend
 
 class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
     timestamp: datetime
 
+# LLM Output Models
+# The parts of AnalysisResponse / LegalAdviceResponse the LLM fills in. Used as
+# JSON schemas for structured-output calls and to validate what comes back.
+class ClassificationOutput(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    category: LegalCategory
+    confidence: float = Field(..., ge=0, le=1)
+    urgency: UrgencyLevel
+    complexity: ComplexityLevel
+    reasoning: str
+
+class AdviceOutput(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    advice: str
+    next_steps: List[str]
+    relevant_laws: List[str]
+    confidence: float = Field(..., ge=0, le=1)
+    disclaimers: List[str]
+
+class AnalysisWithAdviceOutput(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    classification: ClassificationOutput
+    advice: AdviceOutput
@@ -1,19 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List
+from datetime import datetime
 import json
 import os
 
 from app.core.database import get_db
+from app.core.dependencies import get_document_generator
 from app.core.config import settings
 from app.models.database import DocumentTemplate, GeneratedDocument, LegalIssue
 from app.models.schemas import (
     DocumentTemplateResponse, DocumentGenerationRequest,
-    GeneratedDocumentResponse, DocumentType
+    GeneratedDocumentResponse, DocumentType, BulkDocumentGenerationRequest
 )
-from app.services.document_generator import DocumentGenerator
+from app.services.document_generator import DocumentGenerator, TemplateChangedError
+from app.services.template_renderer import MissingTemplateFieldsError
+from app.services.pdf_render import PDFRenderUnavailableError
+from app.services.document_store import document_store
+from app.services.bulk_generation import bulk_generation, BulkTooLargeError
 
 router = APIRouter()
 
@@ -74,7 +80,8 @@ async def get_document_template(
 @router.post("/generate", response_model=GeneratedDocumentResponse)
 async def generate_document(
     request: DocumentGenerationRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    doc_generator: DocumentGenerator = Depends(get_document_generator)
 ):
     """
     Generate a legal document based on a template and issue data.
@@ -100,11 +107,11 @@ async def generate_document(
             )
         
         # Generate the document
-        doc_generator = DocumentGenerator()
         document_data = await doc_generator.generate_document(
             template=template,
             issue=issue,
             document_type=request.document_type,
+            db=db,
             custom_data=request.custom_data
         )
         
@@ -128,11 +135,24 @@ async def generate_document(
             document_type=generated_doc.document_type,
             file_name=generated_doc.file_name,
             generated_at=generated_doc.generated_at,
-            download_url=f"/api/documents/{generated_doc.id}/download"
+            download_url=f"/api/documents/{generated_doc.id}/download",
+            reused=document_data["reused"]
         )
         
     except HTTPException:
         raise
+    except MissingTemplateFieldsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail={"message": str(e), "missing_fields": e.missing_fields}
+        )
+    except PDFRenderUnavailableError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -140,13 +160,52 @@ async def generate_document(
             detail=f"Error generating document: {str(e)}"
         )
 
+@router.post("/generate/bulk")
+async def generate_documents_bulk(
+    request: BulkDocumentGenerationRequest,
+    db: Session = Depends(get_db),
+    doc_generator: DocumentGenerator = Depends(get_document_generator)
+):
+    """
+    Generate one template for many issues (a mail merge) and stream the PDFs as a ZIP.
+    
+    Documents are rendered in parallel and added to the archive as they
+    finish. A ``manifest.json`` entry at the end lists the generated
+    document IDs and the items that failed.
+    """
+    try:
+        bulk_generation.check_size(request.items)
+    except BulkTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(e))
+    
+    template = db.query(DocumentTemplate).filter(
+        DocumentTemplate.id == request.template_id,
+        DocumentTemplate.is_active == True
+    ).first()
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document template not found"
+        )
+    
+    archive_name = f"{request.document_type.value}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(
+        bulk_generation.run(doc_generator, template, request.document_type, request.items),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{archive_name}"',
+            "X-Accel-Buffering": "no"  # disable proxy buffering (nginx)
+        }
+    )
+
 @router.get("/documents/{document_id}/download")
 async def download_document(
     document_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    doc_generator: DocumentGenerator = Depends(get_document_generator)
 ):
     """
-    Download a generated document by ID.
+    Download a generated document by ID, rendering it first if it has not been yet.
     """
     document = db.query(GeneratedDocument).filter(GeneratedDocument.id == document_id).first()
     if not document:
@@ -157,10 +216,37 @@ async def download_document(
     
     file_path = document.file_path
     if not os.path.exists(file_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document file not found"
-        )
+        # Not rendered yet (LAZY_PDF_RENDERING) or the file was lost: render it from the saved data
+        template = db.query(DocumentTemplate).filter(DocumentTemplate.id == document.template_id).first()
+        rendered = False
+        if template:
+            try:
+                rendered = await doc_generator.render_on_download(document, template, db)
+                db.commit()
+            except MissingTemplateFieldsError as e:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={"message": f"Template changed since the document was generated. {e}", "missing_fields": e.missing_fields}
+                )
+            except TemplateChangedError as e:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"{e}. Generate the document again."
+                )
+            except PDFRenderUnavailableError as e:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=str(e),
+                    headers={"Retry-After": str(e.retry_after)}
+                )
+        if not rendered:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document file not found"
+            )
     
     return FileResponse(
         path=file_path,
@@ -214,15 +300,19 @@ async def delete_document(
             detail="Document not found"
         )
     
-    # Delete the file if it exists
-    if os.path.exists(document.file_path):
-        try:
-            os.remove(document.file_path)
-        except Exception:
-            pass  # Continue even if file deletion fails
+    # Drop the record's reference to its (possibly shared) file
+    file_path = document.file_path
+    remove_file = document_store.release(db, file_path)
     
     # Delete the database record
     db.delete(document)
     db.commit()
     
+    # Delete the file once no other document uses it (and none has started to again)
+    if remove_file:
+        try:
+            document_store.remove_unused(db, file_path)
+        except Exception:
+            pass  # Continue even if file deletion fails
+    
     return {"message": "Document deleted successfully"}
\ No newline at end of file
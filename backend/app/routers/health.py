@@ -5,13 +5,37 @@ from datetime import datetime
 import os
 
 from app.core.database import get_db
+from app.core.dependencies import get_llm_service
 from app.core.config import settings
+from app.core.metrics import advice_stream_ttfb
 from app.models.schemas import HealthResponse
+from app.services.llm_clients import llm_clients
+from app.services.classification_cache import classification_cache
+from app.services.legal_analyzer import fast_classifier
+from app.services.llm_service import LLMService, llm_singleflight, classification_batcher
+from app.services.circuit_breaker import llm_breakers, OPEN
+from app.services.backend_router import local_llm_router
+from app.services.structured_output import output_validation
+from app.services.prompts import prompt_metrics
+from app.services.call_log import llm_call_log
+from app.services.llm_budget import llm_budget
+from app.services.template_index import template_index
+from app.services.template_renderer import template_renderer
+from app.services.pdf_render import pdf_render_pool
+from app.services.document_store import document_store
+from app.services.issue_dedup import issue_dedup
+from app.services.concurrency import llm_limiters
+from app.services.speculative import speculative_advice
+from app.services.batch_intake import batch_intake
+from app.services.bulk_generation import bulk_generation
 
 router = APIRouter()
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(
+    db: Session = Depends(get_db),
+    llm_service: LLMService = Depends(get_llm_service)
+):
     """
     Health check endpoint to verify system status.
     """
@@ -23,15 +47,17 @@ async def health_check(db: Session = Depends(get_db)):
         print(f"Database connection error: {e}")
         database_connected = False
     
-    # Test LLM availability
-    llm_available = bool(settings.openai_api_key) or settings.use_local_llm
+    # Test LLM availability; an open circuit breaker means the backend is failing
+    breaker = llm_breakers[llm_service.backend_name]
+    llm_available = (bool(settings.openai_api_key) or settings.use_local_llm) and breaker.state != OPEN
     
     return HealthResponse(
         status="healthy" if database_connected and llm_available else "degraded",
         timestamp=datetime.utcnow(),
         version=settings.app_version,
         database_connected=database_connected,
-        llm_available=llm_available
+        llm_available=llm_available,
+        llm_circuit={name: breaker.get_stats() for name, breaker in llm_breakers.items()}
     )
 
 @router.get("/info")
@@ -63,4 +89,34 @@ async def app_info():
             "healthcare"
         ],
         "api_docs": "/api/docs"
-    }
\ No newline at end of file
+    }
+
+@router.get("/metrics")
+async def get_metrics(llm_service: LLMService = Depends(get_llm_service)):
+    """
+    Get runtime metrics for capacity planning.
+    """
+    return {
+        "llm_pool": llm_clients.get_stats(),
+        "classification_cache": await classification_cache.get_stats(),
+        "fast_classifier": fast_classifier.get_stats(),
+        "template_index": template_index.get_stats(),
+        "template_renderer": template_renderer.get_stats(),
+        "pdf_render": pdf_render_pool.get_stats(),
+        "document_store": document_store.get_stats(),
+        "issue_dedup": issue_dedup.get_stats() if settings.enable_issue_dedup else None,
+        "request_coalescing": llm_singleflight.get_stats(),
+        "llm_output_validation": output_validation.get_stats(),
+        "prompts": prompt_metrics.get_stats(),
+        "model_routing": llm_service.get_routing_stats(),
+        "llm_call_log": llm_call_log.get_stats(),
+        "llm_budget": llm_budget.get_stats(),
+        "llm_concurrency": {task: limiter.get_stats() for task, limiter in llm_limiters.items()},
+        "llm_circuit": {name: breaker.get_stats() for name, breaker in llm_breakers.items()},
+        "speculative_advice": speculative_advice.get_stats(),
+        "batch_intake": batch_intake.get_stats(),
+        "bulk_generation": bulk_generation.get_stats(),
+        "classification_batching": classification_batcher.get_stats() if classification_batcher else None,
+        "local_llm_routing": local_llm_router.get_stats() if local_llm_router else None,
+        "advice_stream_ttfb": advice_stream_ttfb.snapshot()
+    }
@@ -1,25 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import List
+from typing import List, Dict, Any
 import json
+import time
 
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
+from app.core.dependencies import get_llm_service, get_legal_analyzer
+from app.core.metrics import advice_stream_ttfb
 from app.models.database import LegalIssue, LegalAdvice
 from app.models.schemas import (
     LegalIssueCreate, LegalIssueResponse, 
     AdviceRequest, LegalAdviceResponse,
-    AnalysisResponse, LegalCategory, UrgencyLevel
+    AnalysisResponse, AnalysisWithAdviceResponse, BatchAnalysisResult, LegalCategory, UrgencyLevel
 )
 from app.services.llm_service import LLMService
 from app.services.legal_analyzer import LegalAnalyzer
+from app.services.concurrency import LLMOverloadedError, llm_priority
+from app.services.speculative import speculative_advice
+from app.services.issue_dedup import issue_dedup, find_reusable_issue
+from app.services.batch_intake import batch_intake, BatchTooLargeError
+from app.core.config import settings
 
 router = APIRouter()
 
 @router.post("/analyze", response_model=AnalysisResponse)
 async def analyze_legal_issue(
     issue_data: LegalIssueCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    analyzer: LegalAnalyzer = Depends(get_legal_analyzer)
 ):
     """
     Analyze a legal issue and provide categorization and initial guidance.
@@ -36,23 +46,124 @@ async def analyze_legal_issue(
         db.commit()
         db.refresh(legal_issue)
         
+        # Reuse the category of a near-duplicate issue when there is one
+        duplicate = None
+        if issue_data.reuse_similar:
+            duplicate = find_reusable_issue(
+                db, issue_data.description, issue_data.location, user_email=issue_data.user_email
+            )
+        _index_issue(legal_issue)
+        
         # Analyze the issue using LLM
-        analyzer = LegalAnalyzer()
-        analysis = await analyzer.analyze_issue(issue_data.description, issue_data.location)
+        if duplicate:
+            analysis = analyzer.analysis_from_duplicate(duplicate)
+        else:
+            with llm_priority(issue_data.urgency.value):
+                analysis = await analyzer.analyze_issue(issue_data.description, issue_data.location)
         
         # Update the issue with analysis results
         legal_issue.category = analysis["category"]
+        legal_issue.classification_source = analysis["classification_source"]
         db.commit()
         
-        return AnalysisResponse(
-            category=LegalCategory(analysis["category"]),
-            confidence=analysis["confidence"],
-            urgency=UrgencyLevel(analysis["urgency"]),
-            suggested_actions=analysis["suggested_actions"],
-            relevant_templates=analysis["relevant_templates"],
-            estimated_complexity=analysis["complexity"]
+        # Most clients ask for advice next; start generating it now (unless
+        # the near-duplicate's advice can be reused)
+        if settings.enable_speculative_advice and not (duplicate and duplicate["advice"]):
+            speculative_advice.schedule(
+                legal_issue.id,
+                issue_data.description,
+                analysis["category"],
+                issue_data.location
+            )
+        
+        return _analysis_response(analysis)
+        
+    except LLMOverloadedError:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error analyzing legal issue: {str(e)}"
         )
+
+@router.post("/analyze/full", response_model=AnalysisWithAdviceResponse)
+async def analyze_legal_issue_with_advice(
+    issue_data: LegalIssueCreate,
+    db: Session = Depends(get_db),
+    analyzer: LegalAnalyzer = Depends(get_legal_analyzer)
+):
+    """
+    Analyze a legal issue and generate advice for it in one request.
+
+    Uses a single LLM prompt for both the classification and the advice,
+    so clients that always want both avoid a second round trip.
+    """
+    try:
+        # Create legal issue record
+        legal_issue = LegalIssue(
+            description=issue_data.description,
+            location=issue_data.location,
+            user_email=issue_data.user_email,
+            urgency=issue_data.urgency.value
+        )
+        db.add(legal_issue)
+        db.commit()
+        db.refresh(legal_issue)
+        
+        # A near-duplicate with advice answers both parts without the LLM
+        duplicate = None
+        if issue_data.reuse_similar:
+            duplicate = find_reusable_issue(
+                db, issue_data.description, issue_data.location,
+                require_advice=True, user_email=issue_data.user_email
+            )
+        _index_issue(legal_issue)
+        
+        if duplicate:
+            analysis = analyzer.analysis_from_duplicate(duplicate)
+            advice_data = _reused_advice(duplicate)
+        else:
+            with llm_priority(issue_data.urgency.value):
+                result = await analyzer.analyze_with_advice(issue_data.description, issue_data.location)
+            analysis = result["analysis"]
+            advice_data = result["advice"]
+        
+        # Store the category and the advice together
+        legal_issue.category = analysis["category"]
+        legal_issue.classification_source = analysis["classification_source"]
+        legal_advice = LegalAdvice(
+            issue_id=legal_issue.id,
+            advice=advice_data["advice"],
+            next_steps=json.dumps(advice_data["next_steps"]),
+            relevant_laws=json.dumps(advice_data["relevant_laws"]),
+            confidence=advice_data["confidence"],
+            model_used=advice_data["model_used"]
+        )
+        db.add(legal_advice)
+        db.commit()
+        db.refresh(legal_advice)
         
+        return AnalysisWithAdviceResponse(
+            issue_id=legal_issue.id,
+            analysis=_analysis_response(analysis),
+            advice=LegalAdviceResponse(
+                id=legal_advice.id,
+                issue_id=legal_advice.issue_id,
+                advice=legal_advice.advice,
+                next_steps=advice_data["next_steps"],
+                relevant_laws=advice_data["relevant_laws"],
+                confidence=legal_advice.confidence,
+                model_used=legal_advice.model_used,
+                generated_at=legal_advice.generated_at,
+                reused_from_issue=advice_data.get("reused_from_issue")
+            )
+        )
+        
+    except LLMOverloadedError:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -60,10 +171,64 @@ async def analyze_legal_issue(
             detail=f"Error analyzing legal issue: {str(e)}"
         )
 
+@router.post("/analyze/batch")
+async def analyze_legal_issue_batch(
+    request: Request,
+    analyzer: LegalAnalyzer = Depends(get_legal_analyzer)
+):
+    """
+    Analyze many legal issues submitted in one request.
+
+    Accepts a JSON array of issues, or NDJSON (one issue per line) with
+    an ``application/x-ndjson`` content type. All issues are stored in one
+    transaction, then analyzed concurrently; results are streamed back as
+    NDJSON lines in completion order, followed by a summary line. Invalid
+    or failing items are reported in their own line.
+    """
+    started = time.perf_counter()
+    try:
+        items = await batch_intake.parse(request.stream(), request.headers.get("content-type"))
+    except BatchTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    async def result_lines():
+        succeeded = 0
+        unsaved_issue_ids = []
+        async for result in batch_intake.run(items, analyzer):
+            if "unsaved_issue_ids" in result:
+                unsaved_issue_ids = result["unsaved_issue_ids"]
+                continue
+            if "analysis" in result:
+                succeeded += 1
+                line = BatchAnalysisResult(
+                    index=result["index"],
+                    issue_id=result["issue_id"],
+                    analysis=_analysis_response(result["analysis"])
+                )
+            else:
+                line = BatchAnalysisResult(**result)
+            yield line.model_dump_json(exclude_none=True) + "\n"
+        yield json.dumps({"summary": {
+            "items": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "unsaved_issue_ids": unsaved_issue_ids,
+            "total_ms": round((time.perf_counter() - started) * 1000, 2)
+        }}) + "\n"
+    
+    return StreamingResponse(
+        result_lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"}  # disable proxy buffering (nginx)
+    )
+
 @router.post("/advice", response_model=LegalAdviceResponse)
 async def generate_legal_advice(
     advice_request: AdviceRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    llm_service: LLMService = Depends(get_llm_service)
 ):
     """
     Generate detailed legal advice for a specific issue.
@@ -77,14 +242,29 @@ async def generate_legal_advice(
                 detail="Legal issue not found"
             )
         
+        # Reuse advice given for a near-duplicate issue in the same category
+        advice_data = None
+        if advice_request.reuse_similar and not advice_request.additional_context:
+            duplicate = find_reusable_issue(
+                db, issue.description, issue.location, exclude_issue_id=issue.id,
+                require_advice=True, user_email=issue.user_email
+            )
+            if duplicate and duplicate["issue"].category == issue.category:
+                advice_data = _reused_advice(duplicate)
+        
+        # Use advice pre-generated after /analyze when no new context was given
+        if advice_data is None and not advice_request.additional_context:
+            advice_data = await speculative_advice.claim(issue.id)
+        
         # Generate advice using LLM
-        llm_service = LLMService()
-        advice_data = await llm_service.generate_advice(
-            issue.description,
-            issue.category,
-            issue.location,
-            advice_request.additional_context
-        )
+        if advice_data is None:
+            with llm_priority(issue.urgency):
+                advice_data = await llm_service.generate_advice(
+                    issue.description,
+                    issue.category,
+                    issue.location,
+                    advice_request.additional_context
+                )
         
         # Create advice record
         legal_advice = LegalAdvice(
@@ -107,10 +287,11 @@ async def generate_legal_advice(
             relevant_laws=json.loads(legal_advice.relevant_laws) if legal_advice.relevant_laws else [],
             confidence=legal_advice.confidence,
             model_used=legal_advice.model_used,
-            generated_at=legal_advice.generated_at
+            generated_at=legal_advice.generated_at,
+            reused_from_issue=advice_data.get("reused_from_issue")
         )
         
-    except HTTPException:
+    except (HTTPException, LLMOverloadedError):
         raise
     except Exception as e:
         db.rollback()
@@ -119,6 +300,144 @@ async def generate_legal_advice(
             detail=f"Error generating legal advice: {str(e)}"
         )
 
+@router.post("/advice/stream")
+async def stream_legal_advice(
+    advice_request: AdviceRequest,
+    db: Session = Depends(get_db),
+    llm_service: LLMService = Depends(get_llm_service)
+):
+    """
+    Stream legal advice for a specific issue as Server-Sent Events.
+
+    Emits ``token`` events while the advice is generated and a final ``done``
+    event with the persisted advice record and time-to-first-byte.
+    """
+    started = time.perf_counter()
+    
+    issue = db.query(LegalIssue).filter(LegalIssue.id == advice_request.issue_id).first()
+    if not issue:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Legal issue not found"
+        )
+    
+    # Copy what we need; the request session may be closed while streaming
+    issue_id = issue.id
+    advice_stream = llm_service.stream_advice(
+        issue.description,
+        issue.category,
+        issue.location,
+        advice_request.additional_context
+    )
+    
+    # Wait for the first event before answering so an overloaded advice
+    # pool still produces a 429 rather than a broken event stream
+    with llm_priority(issue.urgency):
+        first_event = await advice_stream.__anext__()
+    
+    async def events():
+        yield first_event
+        async for event in advice_stream:
+            yield event
+    
+    async def event_stream():
+        ttfb_ms = None
+        advice_data = None
+        
+        try:
+            async for event in events():
+                if event["type"] == "token":
+                    if ttfb_ms is None:
+                        ttfb_ms = (time.perf_counter() - started) * 1000
+                        advice_stream_ttfb.record(ttfb_ms)
+                    yield _sse_event("token", {"text": event["text"]})
+                else:
+                    advice_data = event["advice"]
+        finally:
+            # Releases the advice pool slot and breaker guard right away when
+            # the client disconnects, instead of whenever the generator is collected
+            await advice_stream.aclose()
+        
+        stream_db = SessionLocal()
+        try:
+            legal_advice = LegalAdvice(
+                issue_id=issue_id,
+                advice=advice_data["advice"],
+                next_steps=json.dumps(advice_data["next_steps"]),
+                relevant_laws=json.dumps(advice_data["relevant_laws"]),
+                confidence=advice_data["confidence"],
+                model_used=advice_data["model_used"]
+            )
+            stream_db.add(legal_advice)
+            stream_db.commit()
+            stream_db.refresh(legal_advice)
+            advice_response = LegalAdviceResponse(
+                id=legal_advice.id,
+                issue_id=legal_advice.issue_id,
+                advice=legal_advice.advice,
+                next_steps=json.loads(legal_advice.next_steps) if legal_advice.next_steps else [],
+                relevant_laws=json.loads(legal_advice.relevant_laws) if legal_advice.relevant_laws else [],
+                confidence=legal_advice.confidence,
+                model_used=legal_advice.model_used,
+                generated_at=legal_advice.generated_at
+            )
+        except Exception as e:
+            stream_db.rollback()
+            yield _sse_event("error", {"detail": f"Error saving legal advice: {str(e)}"})
+            return
+        finally:
+            stream_db.close()
+        
+        yield _sse_event("done", {
+            "advice": advice_response.model_dump(mode="json"),
+            "ttfb_ms": round(ttfb_ms, 2) if ttfb_ms is not None else None,
+            "total_ms": round((time.perf_counter() - started) * 1000, 2)
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # disable proxy buffering (nginx)
+        }
+    )
+
+def _analysis_response(analysis: Dict[str, Any]) -> AnalysisResponse:
+    """AnalysisResponse for a LegalAnalyzer result."""
+    return AnalysisResponse(
+        category=LegalCategory(analysis["category"]),
+        confidence=analysis["confidence"],
+        urgency=UrgencyLevel(analysis["urgency"]),
+        suggested_actions=analysis["suggested_actions"],
+        relevant_templates=analysis["relevant_templates"],
+        estimated_complexity=analysis["complexity"],
+        classification_source=analysis.get("classification_source"),
+        duplicate_of=analysis.get("duplicate_of"),
+        duplicate_similarity=analysis.get("duplicate_similarity")
+    )
+
+def _index_issue(issue: LegalIssue):
+    """Make a stored issue findable as a near-duplicate of later ones."""
+    if settings.enable_issue_dedup:
+        issue_dedup.add(issue.id, issue.description, issue.location)
+
+def _reused_advice(duplicate: Dict[str, Any]) -> Dict[str, Any]:
+    """Advice data copied from a near-duplicate issue's latest advice record."""
+    advice = duplicate["advice"]
+    return {
+        "advice": advice.advice,
+        "next_steps": json.loads(advice.next_steps) if advice.next_steps else [],
+        "relevant_laws": json.loads(advice.relevant_laws) if advice.relevant_laws else [],
+        "confidence": advice.confidence,
+        "model_used": advice.model_used,
+        "reused_from_issue": duplicate["issue"].id
+    }
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @router.get("/issues", response_model=List[LegalIssueResponse])
 async def get_legal_issues(
     skip: int = 0,
@@ -0,0 +1,198 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+from app.services.concurrency import ConcurrencyLimiter
+
+# Hedging waits for this many samples so the p95 delay means something
+MIN_HEDGE_SAMPLES = 20
+
+
+class LocalLLMBackend:
+    """One local LLM replica and its observed latency and load."""
+
+    def __init__(self, url: str, alpha: float):
+        self.url = url
+        self.alpha = alpha
+        self.ewma_ms: Optional[float] = None
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.hedges_won = 0
+        self.latency = LatencyStats()
+
+    def expected_ms(self) -> float:
+        """Rough time a new request would take: latency times queued work."""
+        # Untried replicas score 0 so each one gets measured early on
+        return (self.ewma_ms or 0.0) * (self.in_flight + 1)
+
+    def observe(self, elapsed_ms: float):
+        if self.ewma_ms is None:
+            self.ewma_ms = elapsed_ms
+        else:
+            self.ewma_ms = self.alpha * elapsed_ms + (1 - self.alpha) * self.ewma_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "ewma_ms": round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "hedges_won": self.hedges_won,
+            "latency": self.latency.snapshot()
+        }
+
+
+class BackendRouter:
+    """Spread local LLM calls across replicas by latency and load.
+
+    Each call goes to the replica with the lowest EWMA latency scaled by
+    its in-flight count. With hedging enabled, a call that has not
+    finished after the observed p95 latency (at least ``hedge_min_delay_ms``)
+    is duplicated to the next best replica; the first successful answer
+    wins and the other request is cancelled. A hedge takes its own slot in
+    the caller's concurrency limiter and is skipped when none is free, so
+    hedging never pushes a task past its concurrency cap.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        alpha: float,
+        hedging: bool,
+        hedge_percentile: float,
+        hedge_min_delay_ms: float
+    ):
+        self.backends = [LocalLLMBackend(url, alpha) for url in urls]
+        self.hedging = hedging and len(self.backends) > 1
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay_ms = hedge_min_delay_ms
+        self.latency = LatencyStats()
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.hedges_skipped = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional["BackendRouter"]:
+        """Router for the configured local LLM URLs, or None if there are none."""
+        urls = [url.strip() for url in (settings.local_llm_urls or "").split(",") if url.strip()]
+        if not urls and settings.local_llm_url:
+            urls = [settings.local_llm_url]
+        if not urls:
+            return None
+        return cls(
+            urls,
+            settings.llm_routing_ewma_alpha,
+            settings.enable_llm_hedging,
+            settings.llm_hedge_percentile,
+            settings.llm_hedge_min_delay_ms
+        )
+
+    def pick(self, exclude: Optional[LocalLLMBackend] = None) -> LocalLLMBackend:
+        """Replica expected to answer soonest."""
+        candidates = [backend for backend in self.backends if backend is not exclude]
+        return min(candidates, key=lambda backend: (backend.expected_ms(), backend.in_flight))
+
+    @asynccontextmanager
+    async def track(self, backend: LocalLLMBackend, record_latency: bool = True):
+        """Count a request against a replica and record how it went."""
+        backend.in_flight += 1
+        backend.requests += 1
+        started = asyncio.get_running_loop().time()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Cancelled hedge losers say nothing about the replica's speed
+            raise
+        except Exception:
+            backend.failures += 1
+            elapsed_ms = (asyncio.get_running_loop().time() - started) * 1000
+            # Steer traffic away from a failing replica
+            backend.observe(max(elapsed_ms, (backend.ewma_ms or elapsed_ms) * 2))
+            raise
+        else:
+            if record_latency:
+                elapsed_ms = (asyncio.get_running_loop().time() - started) * 1000
+                backend.observe(elapsed_ms)
+                backend.latency.record(elapsed_ms)
+                self.latency.record(elapsed_ms)
+        finally:
+            backend.in_flight -= 1
+
+    async def call(
+        self,
+        fn: Callable[[str], Awaitable[Any]],
+        limiter: Optional[ConcurrencyLimiter] = None
+    ) -> Any:
+        """Run ``fn(url)`` against the best replica, hedging if it is slow.
+
+        The caller already holds a slot in ``limiter`` for the primary
+        request; the hedge needs a second one and is not sent if the limiter
+        has no free slot.
+        """
+        primary = self.pick()
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._run(primary, fn)
+
+        primary_task = asyncio.ensure_future(self._run(primary, fn))
+        tasks = {primary_task}
+        async with AsyncExitStack() as slots:
+            try:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if done:
+                    return primary_task.result()
+
+                if limiter is not None:
+                    if not limiter.has_capacity():
+                        self.hedges_skipped += 1
+                        return await primary_task
+                    # Free, so this is admitted without waiting in the queue
+                    await slots.enter_async_context(limiter.slot())
+                hedge = self.pick(exclude=primary)
+                hedge_task = asyncio.ensure_future(self._run(hedge, fn))
+                tasks.add(hedge_task)
+                self.hedges_sent += 1
+
+                error = None
+                while tasks:
+                    done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            if task is hedge_task:
+                                self.hedges_won += 1
+                                hedge.hedges_won += 1
+                            return task.result()
+                        error = task.exception()
+                raise error
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def _run(self, backend: LocalLLMBackend, fn: Callable[[str], Awaitable[Any]]) -> Any:
+        async with self.track(backend):
+            return await fn(backend.url)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None when hedging is off."""
+        if not self.hedging or self.latency.count < MIN_HEDGE_SAMPLES:
+            return None
+        return max(self.hedge_min_delay_ms, self.latency.percentile(self.hedge_percentile)) / 1000.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        return {
+            "hedging": self.hedging,
+            "hedge_delay_ms": round(delay * 1000, 2) if delay is not None else None,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "hedges_skipped": self.hedges_skipped,
+            "backends": [backend.get_stats() for backend in self.backends]
+        }
+
+
+# Shared by every LLMService instance so load and latency are tracked globally
+local_llm_router = BackendRouter.from_settings()
@@ -0,0 +1,275 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+import asyncio
+import json
+import time
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import LatencyStats
+from app.models.database import LegalIssue
+from app.models.schemas import LegalIssueCreate
+from app.services.concurrency import LLMOverloadedError, llm_priority
+from app.services.issue_dedup import issue_dedup, find_reusable_issue
+
+# Content types read as one JSON object per line; anything else must be a JSON array
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+# A parsed batch entry: the validated issue, or why it was rejected
+BatchItem = Union[LegalIssueCreate, str]
+
+
+class BatchTooLargeError(ValueError):
+    """Raised while parsing a batch with more than the allowed number of items."""
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _parse_item(value: Any) -> BatchItem:
+    try:
+        return LegalIssueCreate.model_validate(value)
+    except ValidationError as e:
+        return _validation_message(e)
+
+
+class BatchIntake:
+    """Analyzes batches of issues submitted in one request.
+
+    All valid items are inserted in a single transaction, then classified
+    with at most ``concurrency`` analyses in flight. Results are yielded
+    as each item completes, so callers can stream them. No database
+    connection is held while waiting on the LLM: categories are written
+    back in groups of ``write_size`` from a worker thread. A failing item
+    is reported as an error and does not affect the rest of the batch.
+    Results are streamed before their group is written, so issues whose
+    categories could not be saved are listed once all items are done.
+    """
+
+    def __init__(self, max_items: int, concurrency: int, write_size: int):
+        self.max_items = max_items
+        self.concurrency = max(1, concurrency)
+        self.write_size = max(1, write_size)
+        self.batches = 0
+        self.items = 0
+        self.failed = 0
+        self.unsaved = 0
+        self.item_latency = LatencyStats()
+
+    async def parse(self, chunks: AsyncIterator[bytes], content_type: Optional[str]) -> List[BatchItem]:
+        """Read a JSON array or NDJSON body into validated items.
+
+        Raises ValueError when a JSON array body is malformed and
+        BatchTooLargeError when it holds more than ``max_items`` items.
+        Malformed NDJSON lines only reject that line.
+        """
+        if (content_type or "").split(";")[0].strip().lower() in NDJSON_CONTENT_TYPES:
+            return await self._parse_ndjson(chunks)
+
+        body = b"".join([chunk async for chunk in chunks])
+        try:
+            values = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e.msg}")
+        if not isinstance(values, list):
+            raise ValueError("Expected a JSON array of issues")
+        if len(values) > self.max_items:
+            raise BatchTooLargeError(f"Batch has more than {self.max_items} items")
+        return [_parse_item(value) for value in values]
+
+    async def _parse_ndjson(self, chunks: AsyncIterator[bytes]) -> List[BatchItem]:
+        items: List[BatchItem] = []
+        buffer = b""
+
+        def add_line(line: bytes):
+            if not line.strip():
+                return
+            if len(items) >= self.max_items:
+                raise BatchTooLargeError(f"Batch has more than {self.max_items} items")
+            try:
+                items.append(_parse_item(json.loads(line)))
+            except json.JSONDecodeError as e:
+                items.append(f"Invalid JSON: {e.msg}")
+
+        # Lines are parsed as they arrive, so an oversized batch is refused early
+        async for chunk in chunks:
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                add_line(line)
+        add_line(buffer)
+        return items
+
+    async def run(self, items: List[BatchItem], analyzer) -> AsyncIterator[Dict[str, Any]]:
+        """Store and analyze a parsed batch, yielding one result per item as it completes.
+
+        Each result is ``{"index", "issue_id", "analysis"}`` on success or
+        ``{"index", "issue_id", "error"}`` on failure; ``issue_id`` is None
+        for items that were rejected before being stored. The last entry is
+        ``{"unsaved_issue_ids": [...]}``: issues analyzed successfully whose
+        category and classification source failed to save.
+        """
+        self.batches += 1
+        self.items += len(items)
+
+        valid = [(index, item) for index, item in enumerate(items) if isinstance(item, LegalIssueCreate)]
+        for index, item in enumerate(items):
+            if isinstance(item, str):
+                self.failed += 1
+                yield {"index": index, "issue_id": None, "error": item}
+
+        try:
+            issue_ids = await asyncio.to_thread(self._insert, [item for _, item in valid])
+        except Exception as e:
+            print(f"Error storing issue batch: {str(e)}")
+            for index, _ in valid:
+                self.failed += 1
+                yield {"index": index, "issue_id": None, "error": f"Error storing legal issue: {str(e)}"}
+            yield {"unsaved_issue_ids": []}
+            return
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.ensure_future(self._analyze(semaphore, analyzer, index, issue_id, item))
+            for (index, item), issue_id in zip(valid, issue_ids)
+        ]
+        pending_categories: List[Tuple[int, str, str]] = []
+        unsaved: List[int] = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if "analysis" in result:
+                    analysis = result["analysis"]
+                    pending_categories.append(
+                        (result["issue_id"], analysis["category"], analysis["classification_source"])
+                    )
+                    if len(pending_categories) >= self.write_size:
+                        unsaved += await self._write_categories(pending_categories)
+                        pending_categories = []
+                else:
+                    self.failed += 1
+                yield result
+            unsaved += await self._write_categories(pending_categories)
+            pending_categories = []
+            yield {"unsaved_issue_ids": sorted(unsaved)}
+        finally:
+            # Reached on completion and when the client goes away mid-stream
+            for task in tasks:
+                task.cancel()
+            if pending_categories:
+                await self._write_categories(pending_categories)
+
+    async def _analyze(
+        self,
+        semaphore: asyncio.Semaphore,
+        analyzer,
+        index: int,
+        issue_id: int,
+        item: LegalIssueCreate
+    ) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                duplicate = None
+                if item.reuse_similar and settings.enable_issue_dedup:
+                    db = SessionLocal()
+                    try:
+                        duplicate = find_reusable_issue(
+                            db, item.description, item.location, exclude_issue_id=issue_id
+                        )
+                    finally:
+                        db.close()
+                if settings.enable_issue_dedup:
+                    issue_dedup.add(issue_id, item.description, item.location)
+
+                if duplicate:
+                    analysis = analyzer.analysis_from_duplicate(duplicate)
+                else:
+                    with llm_priority(item.urgency.value):
+                        analysis = await analyzer.analyze_issue(item.description, item.location)
+                return {"index": index, "issue_id": issue_id, "analysis": analysis}
+            except LLMOverloadedError as e:
+                return {"index": index, "issue_id": issue_id, "error": str(e)}
+            except Exception as e:
+                return {"index": index, "issue_id": issue_id, "error": f"Error analyzing legal issue: {str(e)}"}
+            finally:
+                self.item_latency.record((time.perf_counter() - started) * 1000)
+
+    def _insert(self, items: List[LegalIssueCreate]) -> List[int]:
+        """Insert the issues in one transaction and return their IDs in order."""
+        if not items:
+            return []
+        db = SessionLocal()
+        try:
+            issues = [
+                LegalIssue(
+                    description=item.description,
+                    location=item.location,
+                    user_email=item.user_email,
+                    urgency=item.urgency.value
+                )
+                for item in items
+            ]
+            db.add_all(issues)
+            # IDs are read after the flush; after commit they would be reloaded one by one
+            db.flush()
+            issue_ids = [issue.id for issue in issues]
+            db.commit()
+            return issue_ids
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _write_categories(self, categories: List[Tuple[int, str, str]]) -> List[int]:
+        """Save a group of categories; returns the issue IDs left unsaved."""
+        if not categories:
+            return []
+        try:
+            await asyncio.to_thread(self._update_categories, categories)
+            return []
+        except Exception as e:
+            print(f"Error saving batch categories: {str(e)}")
+            self.unsaved += len(categories)
+            return [issue_id for issue_id, _, _ in categories]
+
+    def _update_categories(self, categories: List[Tuple[int, str, str]]):
+        db = SessionLocal()
+        try:
+            db.bulk_update_mappings(
+                LegalIssue,
+                [
+                    {"id": issue_id, "category": category, "classification_source": source}
+                    for issue_id, category, source in categories
+                ]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "failed": self.failed,
+            "unsaved": self.unsaved,
+            "concurrency": self.concurrency,
+            "item_latency": self.item_latency.snapshot()
+        }
+
+
+# Shared by the /api/analyze/batch endpoint
+batch_intake = BatchIntake(
+    settings.batch_analyze_max_items,
+    settings.batch_analyze_concurrency,
+    settings.batch_analyze_write_size
+)
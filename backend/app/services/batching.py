@@ -0,0 +1,118 @@
+from typing import Dict, List, Optional, Any, Tuple
+import asyncio
+
+from app.services.llm_clients import llm_clients
+
+
+class MicroBatcher:
+    """Collect prompts for a short window and send them as one batch request.
+
+    Prompts are flushed when ``max_batch_size`` items are queued or
+    ``max_wait_ms`` has passed since the first queued item, whichever comes
+    first. The batch endpoint receives ``{"prompts": [...], ...}`` (plus
+    ``json_schema`` for structured output) and must answer
+    ``{"responses": [...]}`` in the same order; each response is handed
+    back to the caller that submitted the prompt.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        max_batch_size: int,
+        max_wait_ms: int,
+        max_tokens: int,
+        temperature: float = 0.1,
+        model: Optional[str] = None,
+        json_schema: Optional[Dict[str, Any]] = None
+    ):
+        self.url = url
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.model = model
+        self.json_schema = json_schema
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatches: set = set()
+        self.batches_sent = 0
+        self.items_sent = 0
+        self.size_flushes = 0
+        self.timer_flushes = 0
+        self.failed_batches = 0
+
+    async def submit(self, prompt: str) -> str:
+        """Queue a prompt and wait for its response."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((prompt, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self.size_flushes += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush_on_timer)
+
+        return await future
+
+    def _flush_on_timer(self):
+        self._timer = None
+        if self._pending:
+            self.timer_flushes += 1
+            self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Drop callers that gave up while waiting for the window to close
+        batch = [(prompt, future) for prompt, future in self._pending if not future.done()]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        self.batches_sent += 1
+        self.items_sent += len(batch)
+        try:
+            payload = {
+                "prompts": [prompt for prompt, _ in batch],
+                "max_tokens": self.max_tokens,
+                "temperature": self.temperature
+            }
+            if self.model:
+                payload["model"] = self.model
+            if self.json_schema:
+                payload["json_schema"] = self.json_schema
+            response = await llm_clients.local.post(self.url, json=payload)
+            response.raise_for_status()
+            responses = response.json().get("responses", [])
+            if len(responses) != len(batch):
+                raise ValueError(f"batch endpoint returned {len(responses)} responses for {len(batch)} prompts")
+        except Exception as e:
+            self.failed_batches += 1
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(Exception(f"Local LLM batch error: {str(e)}"))
+            return
+
+        for (_, future), text in zip(batch, responses):
+            if not future.done():
+                future.set_result(text)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": int(self.max_wait * 1000),
+            "batches_sent": self.batches_sent,
+            "items_sent": self.items_sent,
+            "avg_batch_size": round(self.items_sent / self.batches_sent, 2) if self.batches_sent else 0.0,
+            "size_flushes": self.size_flushes,
+            "timer_flushes": self.timer_flushes,
+            "failed_batches": self.failed_batches,
+            "pending": len(self._pending)
+        }
@@ -0,0 +1,271 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
+import time
+import zipfile
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import LatencyStats
+from app.models.database import DocumentTemplate, GeneratedDocument, LegalIssue
+from app.models.schemas import BulkDocumentItem, DocumentType
+from app.services.document_store import document_store
+from app.services.pdf_render import PDFRenderUnavailableError
+from app.services.template_renderer import MissingTemplateFieldsError
+
+MANIFEST_NAME = "manifest.json"
+
+
+class BulkTooLargeError(ValueError):
+    """Raised for a bulk request with more than the allowed number of items."""
+
+
+class _ChunkWriter:
+    """Write-only, unseekable file object that hands back what was written since the last take().
+
+    ZipFile writes to it like to a socket: local headers carry data
+    descriptors and nothing is rewritten, so the archive can be streamed.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class BulkGeneration:
+    """Generates one template for many issues and streams the PDFs as a ZIP.
+
+    Documents are rendered through the document store, so the PDF layout
+    runs in the render pool with at most ``concurrency`` documents per
+    request in flight, and identical documents are rendered once. Each
+    PDF is added to the archive as soon as it is ready, and the archive
+    is streamed as it is written; only the current entry is held in
+    memory. When all items are done, the GeneratedDocument rows and store
+    references are written in one transaction, and ``manifest.json``
+    (document IDs, or why an item failed) closes the archive. A failing
+    item, including one whose PDF is deleted by another request before
+    it is added, does not affect the rest and is not saved. PDFs this
+    request rendered but did not save (the client went away, or saving
+    failed) are deleted again unless another document uses them.
+    """
+
+    def __init__(self, max_items: int, concurrency: int):
+        self.max_items = max_items
+        self.concurrency = max(1, concurrency)
+        self.requests = 0
+        self.items = 0
+        self.failed = 0
+        self.discarded = 0
+        self.item_latency = LatencyStats()
+        # Cleanups of abandoned requests, kept referenced until they finish
+        self._cleanups = set()
+
+    def check_size(self, items: List[BulkDocumentItem]):
+        if len(items) > self.max_items:
+            raise BulkTooLargeError(f"Bulk request has more than {self.max_items} items")
+
+    async def run(
+        self,
+        generator,
+        template: DocumentTemplate,
+        document_type: DocumentType,
+        items: List[BulkDocumentItem]
+    ) -> AsyncIterator[bytes]:
+        """Yield the ZIP archive in chunks as the documents are rendered."""
+        self.requests += 1
+        self.items += len(items)
+        started = time.perf_counter()
+
+        issues = await asyncio.to_thread(self._load_issues, {item.issue_id for item in items})
+        semaphore = asyncio.Semaphore(self.concurrency)
+        abandoned = asyncio.Event()
+        tasks = [
+            asyncio.ensure_future(self._render(
+                semaphore, abandoned, generator, template, index, item, issues.get(item.issue_id)
+            ))
+            for index, item in enumerate(items)
+        ]
+
+        stream = _ChunkWriter()
+        archive = zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_DEFLATED)
+        results: List[Dict[str, Any]] = []
+        finished = False
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if "error" not in result:
+                    result["file_name"] = generator.file_name(document_type.value, result["issue_id"])
+                    entry = f"{result['index'] + 1:04d}_{result['file_name']}"
+                    try:
+                        await asyncio.to_thread(archive.write, document_store.path_for(result["digest"]), entry)
+                        result["entry"] = entry
+                    except OSError as e:
+                        # The file is opened before anything is written, so a failed
+                        # item (e.g. its PDF was just deleted elsewhere) leaves no partial entry
+                        result["error"] = f"Error adding document to archive: {str(e)}"
+                    yield stream.take()
+                if "error" in result:
+                    self.failed += 1
+                results.append(result)
+
+            if not await self._save(template, document_type, results):
+                await self._discard(results)
+            finished = True
+            manifest = {
+                "template_id": template.id,
+                "document_type": document_type.value,
+                "succeeded": sum(1 for result in results if "error" not in result),
+                "failed": sum(1 for result in results if "error" in result),
+                "total_ms": round((time.perf_counter() - started) * 1000, 2),
+                "items": [
+                    {key: result.get(key) for key in ("index", "issue_id", "document_id", "entry", "reused", "error")
+                     if result.get(key) is not None}
+                    for result in sorted(results, key=lambda result: result["index"])
+                ]
+            }
+            archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+            archive.close()
+            yield stream.take()
+        finally:
+            # Reached on completion and when the client goes away mid-stream
+            if not finished:
+                # Renders already running cannot be stopped (the store shields them), so
+                # let them end, skip the rest and delete what they wrote in the background
+                abandoned.set()
+                cleanup = asyncio.ensure_future(self._discard_when_done(tasks))
+                self._cleanups.add(cleanup)
+                cleanup.add_done_callback(self._cleanups.discard)
+
+    async def _render(
+        self,
+        semaphore: asyncio.Semaphore,
+        abandoned: asyncio.Event,
+        generator,
+        template: DocumentTemplate,
+        index: int,
+        item: BulkDocumentItem,
+        issue: Optional[LegalIssue]
+    ) -> Dict[str, Any]:
+        if issue is None:
+            return {"index": index, "issue_id": item.issue_id, "error": "Legal issue not found"}
+        async with semaphore:
+            if abandoned.is_set():
+                return {"index": index, "issue_id": item.issue_id, "error": "Request abandoned"}
+            started = time.perf_counter()
+            try:
+                rendered = await generator.render_file(template, issue, item.custom_data)
+                return {"index": index, "issue_id": item.issue_id, **rendered}
+            except (MissingTemplateFieldsError, PDFRenderUnavailableError) as e:
+                return {"index": index, "issue_id": item.issue_id, "error": str(e)}
+            except Exception as e:
+                return {"index": index, "issue_id": item.issue_id, "error": f"Error generating document: {str(e)}"}
+            finally:
+                self.item_latency.record((time.perf_counter() - started) * 1000)
+
+    def _load_issues(self, issue_ids) -> Dict[int, LegalIssue]:
+        db = SessionLocal()
+        try:
+            return {issue.id: issue for issue in db.query(LegalIssue).filter(LegalIssue.id.in_(issue_ids))}
+        finally:
+            db.close()
+
+    async def _save(
+        self,
+        template: DocumentTemplate,
+        document_type: DocumentType,
+        results: List[Dict[str, Any]]
+    ) -> bool:
+        """Record the rendered documents; returns False if that failed."""
+        done = [result for result in results if "error" not in result]
+        if not done:
+            return True
+        try:
+            document_ids = await asyncio.to_thread(self._insert, template.id, document_type, done)
+        except Exception as e:
+            print(f"Error saving bulk documents: {str(e)}")
+            for result in done:
+                self.failed += 1
+                result["error"] = f"Error saving document: {str(e)}"
+            return False
+        for result, document_id in zip(done, document_ids):
+            result["document_id"] = document_id
+        return True
+
+    async def _discard_when_done(self, tasks: List[asyncio.Future]):
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        await self._discard([result for result in results if isinstance(result, dict)])
+
+    async def _discard(self, results: List[Dict[str, Any]]):
+        """Delete the files this request rendered, unless another document uses them meanwhile."""
+        digests = {result["digest"] for result in results if "digest" in result and not result["reused"]}
+        if not digests:
+            return
+        try:
+            self.discarded += await asyncio.to_thread(self._remove_unused, digests)
+        except Exception as e:
+            print(f"Error removing unsaved bulk documents: {str(e)}")
+
+    def _remove_unused(self, digests) -> int:
+        db = SessionLocal()
+        try:
+            return sum(1 for digest in digests if document_store.remove_unused(db, document_store.path_for(digest)))
+        finally:
+            db.close()
+
+    def _insert(self, template_id: int, document_type: DocumentType, done: List[Dict[str, Any]]) -> List[int]:
+        """Record the store references and documents in one transaction; returns the IDs in order."""
+        references: Dict[str, Tuple[int, int]] = {}
+        for result in done:
+            _, count = references.get(result["digest"], (0, 0))
+            references[result["digest"]] = (result["size_bytes"], count + 1)
+
+        db = SessionLocal()
+        try:
+            blobs = document_store.add_references(db, references)
+            documents = [
+                GeneratedDocument(
+                    issue_id=result["issue_id"],
+                    template_id=template_id,
+                    document_type=document_type.value,
+                    file_path=blobs[result["digest"]].file_path,
+                    file_name=result["file_name"],
+                    content_data=json.dumps(result["content_data"])
+                )
+                for result in done
+            ]
+            db.add_all(documents)
+            # IDs are read after the flush; after commit they would be reloaded one by one
+            db.flush()
+            document_ids = [document.id for document in documents]
+            db.commit()
+            return document_ids
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "items": self.items,
+            "failed": self.failed,
+            "discarded": self.discarded,
+            "concurrency": self.concurrency,
+            "item_latency": self.item_latency.snapshot()
+        }
+
+
+# Shared by the /api/generate/bulk endpoint
+bulk_generation = BulkGeneration(settings.bulk_generate_max_items, settings.bulk_generate_concurrency)
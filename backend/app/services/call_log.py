@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import asyncio
+
+from app.core.config import settings
+
+
+class LLMCallLogWriter:
+    """Writes LLMCallLog rows in the background.
+
+    ``record`` only puts the row on a bounded in-memory queue, so logging
+    never waits on the database. A single writer task drains the queue
+    and inserts rows in batches of up to ``batch_size`` from a worker
+    thread. When the queue is full, records are dropped and counted.
+    """
+
+    def __init__(self, queue_size: int, batch_size: int):
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._session_factory = None
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+    def start(self, session_factory):
+        """Start the writer task; call from the application lifespan."""
+        self._session_factory = session_factory
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._writer = asyncio.create_task(self._run())
+
+    async def shutdown(self):
+        """Write what is still queued, then stop the writer task."""
+        if self._writer is None:
+            return
+        await self._queue.join()
+        self._writer.cancel()
+        self._writer = None
+
+    def record(
+        self,
+        task: str,
+        backend: str,
+        model: Optional[str],
+        prompt_version: Optional[str],
+        outcome: str,
+        latency_ms: Optional[float] = None,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        tokens_estimated: bool = False,
+        cache_hit: bool = False
+    ):
+        """Queue one call record without blocking; dropped when the queue is full."""
+        if self._writer is None:
+            return
+        row = {
+            "task": task,
+            "backend": backend,
+            "model": model,
+            "prompt_version": prompt_version,
+            "latency_ms": round(latency_ms, 2) if latency_ms is not None else None,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "tokens_estimated": tokens_estimated,
+            "outcome": outcome,
+            "cache_hit": cache_hit,
+            "created_at": datetime.now(timezone.utc)
+        }
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run(self):
+        while True:
+            rows = [await self._queue.get()]
+            while len(rows) < self.batch_size and not self._queue.empty():
+                rows.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write, rows)
+                self.written += len(rows)
+            except Exception as e:
+                self.write_errors += 1
+                print(f"Error writing LLM call log: {str(e)}")
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        from app.models.database import LLMCallLog
+
+        db = self._session_factory()
+        try:
+            db.bulk_insert_mappings(LLMCallLog, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self._writer is not None,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors
+        }
+
+
+# Started in the application lifespan when ENABLE_LLM_CALL_LOG is on
+llm_call_log = LLMCallLogWriter(settings.llm_call_log_queue_size, settings.llm_call_log_batch_size)
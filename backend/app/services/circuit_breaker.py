@@ -0,0 +1,162 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+import math
+import time
+
+from app.core.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit breaker is open."""
+
+    def __init__(self, backend: str, retry_after: int):
+        self.backend = backend
+        self.retry_after = retry_after
+        super().__init__(f"LLM backend {backend} unavailable (circuit open); retry after {retry_after}s")
+
+
+class CircuitBreaker:
+    """Stops calling an LLM backend while it is failing or too slow.
+
+    The outcomes of the last ``window`` calls are kept. Once at least
+    ``min_calls`` are recorded, the breaker opens when the share of failed
+    calls reaches ``error_rate`` or the share of calls slower than
+    ``slow_call_ms`` reaches ``slow_rate``. While open, calls fail
+    immediately with CircuitOpenError. After ``open_seconds`` a single probe
+    call is let through (half-open): success closes the breaker, failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int,
+        min_calls: int,
+        error_rate: float,
+        slow_call_ms: float,
+        slow_rate: float,
+        open_seconds: float
+    ):
+        self.name = name
+        self.min_calls = max(1, min_calls)
+        self.error_rate = error_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes: deque = deque(maxlen=max(1, window))  # (failed, slow) per call
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.times_opened = 0
+        self.last_trip_reason: Optional[str] = None
+
+    @asynccontextmanager
+    async def guard(self):
+        """Run the block as one call through the breaker, recording its outcome."""
+        probe = self._before_call()
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self._record(probe, failed=True, elapsed_ms=(time.perf_counter() - started) * 1000)
+            raise
+        except BaseException:
+            # Cancelled or closed by the caller; that says nothing about the backend
+            if probe:
+                self._probe_in_flight = False
+            raise
+        self._record(probe, failed=False, elapsed_ms=(time.perf_counter() - started) * 1000)
+
+    def _before_call(self) -> bool:
+        """Raise CircuitOpenError if the call may not proceed; return True for a probe."""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self.retry_after())
+            self.state = HALF_OPEN
+
+        if self.state == HALF_OPEN:
+            # Only one probe at a time; everyone else keeps failing fast
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self.retry_after())
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def _record(self, probe: bool, failed: bool, elapsed_ms: float):
+        slow = elapsed_ms >= self.slow_call_ms
+
+        if probe:
+            self._probe_in_flight = False
+            if failed or slow:
+                self._open("probe failed" if failed else "probe too slow")
+            else:
+                self.state = CLOSED
+                self._outcomes.clear()
+            return
+
+        # Calls that started before the breaker opened don't count any more
+        if self.state != CLOSED:
+            return
+
+        self._outcomes.append((failed, slow))
+        if len(self._outcomes) < self.min_calls:
+            return
+
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slow_calls = sum(1 for _, slow in self._outcomes if slow)
+        if failures / len(self._outcomes) >= self.error_rate:
+            self._open(f"error rate {failures}/{len(self._outcomes)}")
+        elif slow_calls / len(self._outcomes) >= self.slow_rate:
+            self._open(f"slow calls {slow_calls}/{len(self._outcomes)}")
+
+    def _open(self, reason: str):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.times_opened += 1
+        self.last_trip_reason = reason
+        print(f"Circuit breaker for {self.name} opened: {reason}")
+
+    def retry_after(self) -> int:
+        """Seconds until the breaker will next let a probe through."""
+        remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+        return max(1, math.ceil(remaining))
+
+    def get_stats(self) -> Dict[str, Any]:
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        return {
+            "state": self.state,
+            "recent_calls": len(self._outcomes),
+            "recent_failures": failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+            "last_trip_reason": self.last_trip_reason,
+            "retry_after": self.retry_after() if self.state == OPEN else 0
+        }
+
+
+def _build_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        settings.llm_circuit_window,
+        settings.llm_circuit_min_calls,
+        settings.llm_circuit_error_rate,
+        settings.llm_circuit_slow_call_ms,
+        settings.llm_circuit_slow_rate,
+        settings.llm_circuit_open_seconds
+    )
+
+
+# One breaker per backend so a failing local server does not block OpenAI
+llm_breakers = {
+    "openai": _build_breaker("openai"),
+    "local_llm": _build_breaker("local_llm")
+}
@@ -0,0 +1,287 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Any
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import time
+
+from app.core.config import settings
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(value)
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        self._entries[key] = (time.time() + self.ttl, dict(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self):
+        self._entries.clear()
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """SQLite file cache shared by every worker process on the host.
+
+    Entries carry an expiry timestamp and a last-access timestamp. At most
+    every ``evict_interval`` seconds a write also sweeps the table: expired
+    rows are deleted and, past ``max_entries``, the least recently used
+    ones. Between sweeps the table can briefly exceed ``max_entries``;
+    ``size()`` reports the row count from the last sweep.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int, ttl: int, evict_interval: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evict_interval = evict_interval
+        self._initialized = False
+        self._next_eviction = 0.0
+        self._count = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS classification_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_classification_cache_last_access "
+                "ON classification_cache (last_access)"
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value FROM classification_cache WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE classification_cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return json.loads(row[0])
+        finally:
+            conn.close()
+
+    def _set(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO classification_cache (key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl, now)
+            )
+            if now >= self._next_eviction:
+                self._next_eviction = now + self.evict_interval
+                self._evict(conn, now)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM classification_cache WHERE expires_at <= ?", (now,))
+        count = conn.execute("SELECT COUNT(*) FROM classification_cache").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM classification_cache WHERE key IN ("
+                "SELECT key FROM classification_cache ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+            count = self.max_entries
+        self._count = count
+
+    def _clear(self):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM classification_cache")
+            conn.commit()
+            self._count = 0
+        finally:
+            conn.close()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        await asyncio.to_thread(self._set, key, value)
+
+    async def clear(self):
+        await asyncio.to_thread(self._clear)
+
+    async def size(self) -> int:
+        return self._count
+
+
+class RedisCacheBackend:
+    """Cache stored in Redis (or any Redis-protocol server).
+
+    TTL is applied per key; LRU eviction is delegated to the server's
+    ``maxmemory-policy`` (e.g. ``allkeys-lru``). The entry count is only
+    reported when the database holds nothing but this cache (``dedicated``),
+    where DBSIZE is O(1); counting keys by prefix would scan the keyspace.
+    """
+
+    name = "redis"
+    prefix = "classification:"
+
+    def __init__(self, url: str, ttl: int, dedicated: bool = False):
+        import redis.asyncio as redis
+
+        self.ttl = ttl
+        self.dedicated = dedicated
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = await self._client.get(self.prefix + key)
+        return json.loads(value) if value else None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        await self._client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    async def clear(self):
+        if self.dedicated:
+            await self._client.flushdb()
+            return
+        async for key in self._client.scan_iter(match=self.prefix + "*"):
+            await self._client.delete(key)
+
+    async def size(self) -> Optional[int]:
+        if not self.dedicated:
+            return None
+        return await self._client.dbsize()
+
+
+class ClassificationCache:
+    """Cache for classification results keyed on normalized request inputs."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls) -> "ClassificationCache":
+        backend_name = settings.classification_cache_backend.lower()
+        if backend_name in ("none", "off", "disabled"):
+            backend = None
+        elif backend_name == "sqlite":
+            backend = SQLiteCacheBackend(
+                settings.classification_cache_path,
+                settings.classification_cache_max_entries,
+                settings.classification_cache_ttl,
+                settings.classification_cache_evict_interval
+            )
+        elif backend_name == "redis":
+            backend = RedisCacheBackend(
+                settings.redis_url,
+                settings.classification_cache_ttl,
+                settings.classification_cache_redis_dedicated
+            )
+        else:
+            backend = MemoryCacheBackend(
+                settings.classification_cache_max_entries,
+                settings.classification_cache_ttl
+            )
+        return cls(backend)
+
+    @staticmethod
+    def build_key(description: str, location: Optional[str], prompt_version: str, model: str) -> str:
+        """Build a cache key from normalized (description, location, prompt version, model)."""
+        normalized = [
+            _normalize_text(description),
+            _normalize_text(location or ""),
+            prompt_version,
+            model
+        ]
+        return hashlib.sha256(json.dumps(normalized).encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.backend is None:
+            return None
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            # A broken cache must never fail classification
+            print(f"Classification cache read error: {e}")
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        if self.backend is None:
+            return
+        try:
+            await self.backend.set(key, value)
+        except Exception as e:
+            print(f"Classification cache write error: {e}")
+            self.errors += 1
+
+    async def clear(self):
+        if self.backend is not None:
+            await self.backend.clear()
+
+    async def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        size = None
+        if self.backend is not None:
+            try:
+                size = await self.backend.size()
+            except Exception:
+                size = None
+        return {
+            "backend": self.backend.name if self.backend is not None else "disabled",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": size
+        }
+
+
+def _normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+# Global classification cache shared across requests
+classification_cache = ClassificationCache.from_settings()
@@ -0,0 +1,256 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Any, List, Optional
+import asyncio
+import heapq
+import itertools
+import math
+import time
+
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+
+# Priority lanes, most urgent first; the first three match UrgencyLevel
+LANES = ("high", "medium", "low", "background")
+DEFAULT_LANE = "medium"
+
+# Lane of the LLM calls made by the current request (copied into tasks it starts)
+_llm_lane: ContextVar[str] = ContextVar("llm_lane", default=DEFAULT_LANE)
+
+# Called when an LLM call made in the current context gets its slot
+_on_admit: ContextVar[Optional[Callable[[], None]]] = ContextVar("llm_on_admit", default=None)
+
+
+@contextmanager
+def llm_priority(lane: Optional[str]):
+    """Queue LLM calls made inside the block in ``lane`` (unknown lanes use medium)."""
+    token = _llm_lane.set(lane if lane in LANES else DEFAULT_LANE)
+    try:
+        yield
+    finally:
+        _llm_lane.reset(token)
+
+
+def current_llm_priority() -> str:
+    return _llm_lane.get()
+
+
+@contextmanager
+def on_llm_admit(callback: Callable[[], None]):
+    """Call ``callback`` whenever an LLM call made inside the block is admitted by a limiter."""
+    token = _on_admit.set(callback)
+    try:
+        yield
+    finally:
+        _on_admit.reset(token)
+
+
+def more_urgent(lane: Optional[str], other: Optional[str]) -> str:
+    """The more urgent of two lanes (unknown lanes count as medium)."""
+    lanes = [l if l in LANES else DEFAULT_LANE for l in (lane, other)]
+    return min(lanes, key=LANES.index)
+
+
+class LLMOverloadedError(Exception):
+    """Raised when an LLM call cannot get a concurrency slot in time."""
+
+    def __init__(self, task: str, retry_after: int, reason: str):
+        self.task = task
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"LLM {task} capacity exhausted ({reason}); retry after {retry_after}s")
+
+
+class ConcurrencyLimiter:
+    """Caps concurrent upstream calls for one task type.
+
+    Up to ``max_concurrency`` calls run at once. Further callers wait in a
+    queue of at most ``max_queue`` entries for up to ``max_wait`` seconds;
+    a full queue or an expired wait raises LLMOverloadedError so the API
+    can answer 429 immediately instead of timing out upstream.
+
+    Waiters are queued by priority lane (see ``llm_priority``). A waiter's
+    priority is its lane weight plus ``aging_rate`` per second waited, and
+    the freed slot goes to the highest priority; ties go to the earliest
+    arrival. Aging lets low lanes through behind a steady stream of urgent
+    calls. With ``aging_rate`` 0 lanes are strictly ordered, and with
+    equal weights the queue is FIFO.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        max_wait: float,
+        lane_weights: Optional[Dict[str, float]] = None,
+        aging_rate: float = 0.0
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+        self.lane_weights = {lane: (lane_weights or {}).get(lane, 0.0) for lane in LANES}
+        self.aging_rate = max(0.0, aging_rate)
+        self._active = 0
+        # Heap of [order key, arrival sequence, future, lane]; abandoned entries are skipped on pop
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._queued = {lane: 0 for lane in LANES}
+        self.max_queue_depth = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.aged_admissions = 0
+        self.wait_time = LatencyStats()
+        self.service_time = LatencyStats()
+        self.lane_admitted = {lane: 0 for lane in LANES}
+        self.lane_wait_time = {lane: LatencyStats() for lane in LANES}
+
+    @asynccontextmanager
+    async def slot(self, lane: Optional[str] = None):
+        """Hold one concurrency slot for the duration of the block.
+
+        ``lane`` defaults to the caller's ``llm_priority`` lane.
+        """
+        lane = lane if lane in LANES else current_llm_priority()
+        await self._acquire(lane)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.service_time.record((time.perf_counter() - started) * 1000)
+            self._release()
+
+    def _order_key(self, lane: str, queued_at: float) -> tuple:
+        # Priority weight + aging_rate * (now - queued_at) is highest for the
+        # smallest queued_at - weight / aging_rate, whatever "now" is
+        weight = self.lane_weights[lane]
+        if self.aging_rate > 0:
+            return (queued_at - weight / self.aging_rate,)
+        return (-weight, queued_at)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(self._queued.values())
+
+    async def _acquire(self, lane: str):
+        queued_at = time.perf_counter()
+        if self._active < self.max_concurrency and not self.queue_depth:
+            self._active += 1
+            self._admit(lane, queued_at)
+            return
+
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise LLMOverloadedError(self.name, self.retry_after(), "queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [self._order_key(lane, queued_at), next(self._sequence), future, lane])
+        self._queued[lane] += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait)
+        except asyncio.TimeoutError:
+            self._abandon(future, lane)
+            self.timed_out += 1
+            raise LLMOverloadedError(self.name, self.retry_after(), "queue wait timeout")
+        except asyncio.CancelledError:
+            self._abandon(future, lane)
+            raise
+        self._admit(lane, queued_at)
+
+    def _abandon(self, future: asyncio.Future, lane: str):
+        if future.done() and not future.cancelled():
+            # The slot was handed to us just as we gave up; pass it on
+            self._release()
+        else:
+            # Left in the heap; _release skips cancelled futures
+            future.cancel()
+            self._queued[lane] -= 1
+
+    def _admit(self, lane: str, queued_at: float):
+        wait_ms = (time.perf_counter() - queued_at) * 1000
+        self.admitted += 1
+        self.wait_time.record(wait_ms)
+        self.lane_admitted[lane] += 1
+        self.lane_wait_time[lane].record(wait_ms)
+        callback = _on_admit.get()
+        if callback is not None:
+            callback()
+
+    def _release(self):
+        # Hand the slot straight to the highest-priority live waiter
+        while self._waiters:
+            _, _, future, lane = heapq.heappop(self._waiters)
+            if not future.done():
+                self._queued[lane] -= 1
+                weight = self.lane_weights[lane]
+                if any(count and self.lane_weights[other] > weight for other, count in self._queued.items()):
+                    self.aged_admissions += 1
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def has_capacity(self) -> bool:
+        """True when a call would start immediately without queueing."""
+        return self._active < self.max_concurrency and not self.queue_depth
+
+    def retry_after(self) -> int:
+        """Seconds a rejected caller should wait, from queue depth and service time."""
+        mean_service = self.service_time.snapshot()["mean_ms"] / 1000.0 or 1.0
+        backlog = (self.queue_depth + self._active) / self.max_concurrency
+        return max(1, math.ceil(backlog * mean_service))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "aged_admissions": self.aged_admissions,
+            "wait_time": self.wait_time.snapshot(),
+            "service_time": self.service_time.snapshot(),
+            "lanes": {
+                lane: {
+                    "weight": self.lane_weights[lane],
+                    "queue_depth": self._queued[lane],
+                    "admitted": self.lane_admitted[lane],
+                    "wait_time": self.lane_wait_time[lane].snapshot()
+                }
+                for lane in LANES
+            }
+        }
+
+
+# Equal weights (FIFO) when priority scheduling is off
+_lane_weights = {
+    "high": settings.llm_priority_weight_high,
+    "medium": settings.llm_priority_weight_medium,
+    "low": settings.llm_priority_weight_low,
+    "background": settings.llm_priority_weight_background
+} if settings.enable_llm_priority else {}
+
+# Separate pools so long advice generations cannot starve quick classifications
+llm_limiters = {
+    "classify": ConcurrencyLimiter(
+        "classify",
+        settings.llm_max_concurrency_classify,
+        settings.llm_max_queue_classify,
+        settings.llm_max_queue_wait,
+        _lane_weights,
+        settings.llm_priority_aging_rate
+    ),
+    "advice": ConcurrencyLimiter(
+        "advice",
+        settings.llm_max_concurrency_advice,
+        settings.llm_max_queue_advice,
+        settings.llm_max_queue_wait,
+        _lane_weights,
+        settings.llm_priority_aging_rate
+    )
+}
@@ -1,112 +1,139 @@
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
 from datetime import datetime
 import os
 import json
 from typing import Dict, Any, Optional
-from jinja2 import Template
-
+from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.models.database import DocumentTemplate, LegalIssue
+from app.models.database import DocumentTemplate, GeneratedDocument, LegalIssue
+from app.models.schemas import DocumentType
+from app.services.template_renderer import template_renderer
+from app.services.document_store import document_store
+
+# content_data key holding the rendered text, so a later render matches the stored digest
+SNAPSHOT_KEY = "_snapshot"
+
+
+class TemplateChangedError(Exception):
+    """Raised when a document saved without a snapshot can no longer be rendered as generated."""
+
+    def __init__(self, template_name: str):
+        self.template_name = template_name
+        super().__init__(f"Template '{template_name}' changed since the document was generated")
+
 
 class DocumentGenerator:
     """Service for generating legal documents in PDF format."""
     
     def __init__(self):
         self.output_dir = settings.pdf_output_dir
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
         
         # Ensure output directory exists
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def _setup_custom_styles(self):
-        """Set up custom paragraph styles for legal documents."""
-        
-        # Header style
-        self.styles.add(ParagraphStyle(
-            name='LegalHeader',
-            parent=self.styles['Heading1'],
-            fontSize=16,
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            textColor=colors.black
-        ))
-        
-        # Subheader style
-        self.styles.add(ParagraphStyle(
-            name='LegalSubHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            spaceBefore=12,
-            alignment=TA_LEFT,
-            textColor=colors.black
-        ))
-        
-        # Body text style
-        self.styles.add(ParagraphStyle(
-            name='LegalBody',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=6,
-            alignment=TA_JUSTIFY,
-            leftIndent=0,
-            rightIndent=0
-        ))
-        
-        # Signature style
-        self.styles.add(ParagraphStyle(
-            name='Signature',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            spaceAfter=6,
-            alignment=TA_LEFT,
-            leftIndent=0
-        ))
-        
-        # Date style
-        self.styles.add(ParagraphStyle(
-            name='DateStyle',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            alignment=TA_RIGHT,
-            spaceAfter=12
-        ))
-    
     async def generate_document(
         self,
         template: DocumentTemplate,
         issue: LegalIssue,
         document_type: str,
+        db: Session,
         custom_data: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Generate a legal document based on template and issue data."""
+        """Generate a legal document based on template and issue data.
+        
+        The PDF comes from the content-addressed document store, so an
+        identical document reuses the stored file; the reference this adds
+        is committed by the caller along with the GeneratedDocument row.
+        With LAZY_PDF_RENDERING the PDF is only rendered on first download
+        (see render_on_download).
+        """
         
         # Prepare template data
         template_data = self._prepare_template_data(issue, custom_data)
+        self._fill_placeholders(template, template_data, custom_data)
         
-        # Render template content
-        content = self._render_template(template.template_content, template_data)
+        # Render template content (with custom_data, raises MissingTemplateFieldsError before any PDF work)
+        content = template_renderer.render(template, template_data)
         
-        # Generate filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{document_type}_{issue.id}_{timestamp}.pdf"
-        file_path = os.path.join(self.output_dir, filename)
+        # Render the PDF (in the render pool) unless an identical one is stored;
+        # the date is kept in content_data so a lazy render prints the same one
+        document_date = str(template_data["current_date"])
+        blob, reused = await document_store.store(
+            db, template, content, document_date, render=not settings.lazy_pdf_rendering
+        )
         
-        # Generate PDF
-        self._create_pdf(content, file_path, template.name)
+        return {
+            "file_path": blob.file_path,
+            "file_name": self.file_name(document_type, issue.id),
+            "content_data": self._with_snapshot(template_data, template, content),
+            "reused": reused
+        }
+    
+    async def render_file(
+        self,
+        template: DocumentTemplate,
+        issue: LegalIssue,
+        custom_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Render a document's PDF into the document store without touching the database.
         
+        Used by bulk generation, which records the store references and
+        GeneratedDocument rows for all documents at once.
+        """
+        template_data = self._prepare_template_data(issue, custom_data)
+        self._fill_placeholders(template, template_data, custom_data)
+        content = template_renderer.render(template, template_data)
+        digest, size_bytes, reused = await document_store.render_file(
+            template, content, str(template_data["current_date"])
+        )
         return {
-            "file_path": file_path,
-            "file_name": filename,
-            "content_data": template_data
+            "digest": digest,
+            "size_bytes": size_bytes,
+            "content_data": self._with_snapshot(template_data, template, content),
+            "reused": reused
         }
     
+    @staticmethod
+    def file_name(document_type: str, issue_id: int) -> str:
+        """Download filename; the stored file itself is named by its content hash."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"{DocumentType(document_type).value}_{issue_id}_{timestamp}.pdf"
+    
+    async def render_on_download(self, document: GeneratedDocument, template: DocumentTemplate, db: Session) -> bool:
+        """Render a generated document's PDF from its saved data if the file is missing.
+        
+        The PDF is rendered from the text saved when the document was
+        generated, so later template edits do not change it. Returns False
+        if the file cannot be rendered (documents from before the document
+        store); raises TemplateChangedError for documents saved without
+        that text whose template has changed since.
+        """
+        content_data = json.loads(document.content_data) if document.content_data else {}
+        snapshot = content_data.pop(SNAPSHOT_KEY, None)
+        document_date = str(content_data.get("current_date", ""))
+        if snapshot:
+            content, title = snapshot["content"], snapshot["title"]
+        else:
+            content, title = template_renderer.render(template, content_data), template.name
+            if document_store.path_for(document_store.digest(template, content, document_date)) != document.file_path:
+                raise TemplateChangedError(template.name)
+        return await document_store.render_pending(db, document.file_path, content, title, document_date)
+    
+    @staticmethod
+    def _with_snapshot(template_data: Dict[str, Any], template: DocumentTemplate, content: str) -> Dict[str, Any]:
+        """content_data to save: the template data plus the rendered text and title."""
+        return {**template_data, SNAPSHOT_KEY: {"title": template.name, "content": content}}
+    
+    @staticmethod
+    def _fill_placeholders(template: DocumentTemplate, data: Dict[str, Any], custom_data: Optional[Dict[str, Any]]):
+        """Without custom_data (e.g. from the web UI), fill missing fields with placeholders.
+        
+        The document is then a draft to complete by hand, like the
+        [YOUR NAME] defaults. Requests that send custom_data get a 422
+        for missing fields instead.
+        """
+        if not custom_data:
+            data.update(template_renderer.placeholders(template, data))
+    
     def _prepare_template_data(self, issue: LegalIssue, custom_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Prepare data for template rendering."""
         
@@ -138,81 +165,6 @@ class DocumentGenerator:
         
         return data
     
-    def _render_template(self, template_content: str, data: Dict[str, Any]) -> str:
-        """Render template content with provided data."""
-        
-        try:
-            template = Template(template_content)
-            return template.render(**data)
-        except Exception as e:
-            # Fallback to simple string replacement if Jinja2 fails
-            content = template_content
-            for key, value in data.items():
-                content = content.replace(f"{{{{{key}}}}}", str(value))
-            return content
-    
-    def _create_pdf(self, content: str, file_path: str, document_title: str):
-        """Create PDF document from rendered content."""
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            file_path,
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
-        
-        # Build document content
-        story = []
-        
-        # Add title
-        title = Paragraph(document_title, self.styles['LegalHeader'])
-        story.append(title)
-        story.append(Spacer(1, 12))
-        
-        # Add date
-        date_text = f"Date: {datetime.now().strftime('%B %d, %Y')}"
-        date_para = Paragraph(date_text, self.styles['DateStyle'])
-        story.append(date_para)
-        story.append(Spacer(1, 12))
-        
-        # Process content sections
-        sections = content.split('\n\n')
-        for section in sections:
-            if section.strip():
-                # Check if section is a header (starts with #)
-                if section.strip().startswith('#'):
-                    header_text = section.strip().lstrip('#').strip()
-                    header_para = Paragraph(header_text, self.styles['LegalSubHeader'])
-                    story.append(header_para)
-                else:
-                    # Regular paragraph
-                    para = Paragraph(section.strip(), self.styles['LegalBody'])
-                    story.append(para)
-                    story.append(Spacer(1, 6))
-        
-        # Add signature section
-        story.append(Spacer(1, 24))
-        signature_lines = [
-            "Sincerely,",
-            "",
-            "",
-            "_" * 30,
-            "[Your Name]",
-            "[Your Title/Relationship]"
-        ]
-        
-        for line in signature_lines:
-            sig_para = Paragraph(line, self.styles['Signature'])
-            story.append(sig_para)
-            if line == "":
-                story.append(Spacer(1, 12))
-        
-        # Build PDF
-        doc.build(story)
-    
     def get_available_templates(self) -> Dict[str, Dict[str, Any]]:
         """Get available document templates with their metadata."""
         
@@ -0,0 +1,267 @@
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.database import DocumentBlob, DocumentTemplate
+from app.services.pdf_render import LAYOUT_VERSION, pdf_render_pool
+
+
+class DocumentStore:
+    """Content-addressed store of rendered PDFs.
+
+    A PDF is identified by the SHA-256 of the template version (id and
+    ``updated_at``), the document title and date, the rendered content
+    and LAYOUT_VERSION, and lives at ``<root>/<hash[:2]>/<hash>.pdf``.
+    Generating an identical document again reuses the stored file without
+    rendering, and identical renders running at the same time share one
+    render. Each DocumentBlob row counts the GeneratedDocument rows that
+    point at its file, and the file is deleted with the last of them.
+
+    A reference is only added to a row that still has references, in the
+    same UPDATE, so it cannot land on a row a concurrent ``release`` is
+    deleting; otherwise a new row is inserted. Files are only unlinked
+    after the delete is committed and only while no row has come back
+    (``remove_unused``). A file unlinked just as another request stores
+    it again is rendered again from content_data on download.
+
+    With ``render=False`` a blob is only registered, and its file is
+    written by ``render_pending`` when it is first needed. Bulk callers
+    render with ``render_file``, which needs no session, and then record
+    all their references at once with ``add_references``.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.shared_renders = 0
+        self.deferred = 0
+        self.rendered_on_download = 0
+        self.released = 0
+        self.files_deleted = 0
+
+    @staticmethod
+    def digest(template: DocumentTemplate, content: str, document_date: str) -> str:
+        sha = hashlib.sha256()
+        for part in (LAYOUT_VERSION, template.id, template.updated_at, template.name, document_date, content):
+            sha.update(str(part).encode("utf-8"))
+            sha.update(b"\0")
+        return sha.hexdigest()
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.pdf")
+
+    async def store(
+        self,
+        db: Session,
+        template: DocumentTemplate,
+        content: str,
+        document_date: str,
+        render: bool = True
+    ) -> Tuple[DocumentBlob, bool]:
+        """Stored PDF for the content, rendering it if needed; returns ``(blob, reused)``.
+
+        With ``render=False`` a missing file is left for ``render_pending``.
+        Adds one reference to the blob in ``db``; the caller commits it
+        together with the GeneratedDocument that uses the file.
+        """
+        digest = self.digest(template, content, document_date)
+        path = self.path_for(digest)
+        size = None
+        # Rendered before the reference is taken, so no write lock is held while rendering
+        if render and not os.path.exists(path):
+            size = await self._render_once(digest, content, path, template.name, document_date)
+        referenced = self._reference(db, digest, 1)
+        if render and size is None and not os.path.exists(path):
+            # Deleted by a concurrent release since the check above
+            size = await self._render_once(digest, content, path, template.name, document_date)
+
+        reused = size is None and os.path.exists(path)
+        if reused:
+            self.hits += 1
+        elif size is None:
+            self.deferred += 1
+        else:
+            self.misses += 1
+
+        if not referenced:
+            if reused:
+                # A file without a row, e.g. from a bulk request that was abandoned mid-render
+                size = self._file_size(path)
+            return self._add(db, digest, size, 1), reused
+        if size is not None:
+            self._set_size(db, digest, size, only_if_missing=False)
+        return self._get(db, digest), reused
+
+    async def render_pending(
+        self,
+        db: Session,
+        file_path: str,
+        content: str,
+        title: str,
+        document_date: str
+    ) -> bool:
+        """Write a stored document's file if it is missing, e.g. on its first download.
+
+        Concurrent calls for the same file share one render. Returns False
+        for files the store does not know about; the caller commits.
+        """
+        blob = db.query(DocumentBlob).filter(DocumentBlob.file_path == file_path).first()
+        if blob is None:
+            return False
+        if not os.path.exists(blob.file_path):
+            self.rendered_on_download += 1
+            blob.size_bytes = await self._render_once(blob.sha256, content, blob.file_path, title, document_date)
+        return True
+
+    async def render_file(self, template: DocumentTemplate, content: str, document_date: str) -> Tuple[str, int, bool]:
+        """Make sure the PDF for the content is on disk; returns ``(digest, size_bytes, reused)``.
+
+        Touches no database; pass the digest to ``add_references``.
+        """
+        digest = self.digest(template, content, document_date)
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            self.hits += 1
+            return digest, os.path.getsize(path), True
+        self.misses += 1
+        return digest, await self._render_once(digest, content, path, template.name, document_date), False
+
+    def add_references(self, db: Session, references: Dict[str, Tuple[int, int]]) -> Dict[str, DocumentBlob]:
+        """Add references to files from ``render_file`` in one go.
+
+        ``references`` maps each digest to ``(size_bytes, count)``; returns
+        the blobs by digest. The caller commits.
+        """
+        blobs = {}
+        for digest, (size, count) in references.items():
+            if self._reference(db, digest, count):
+                self._set_size(db, digest, size, only_if_missing=True)
+                blobs[digest] = self._get(db, digest)
+            else:
+                blobs[digest] = self._add(db, digest, size, count)
+        return blobs
+
+    @staticmethod
+    def _reference(db: Session, digest: str, count: int) -> bool:
+        """Add references to a stored blob that still has some; False if there is none."""
+        # Checked and incremented in one statement, so a row that a concurrent
+        # release has taken to zero (and is deleting) is never revived
+        updated = db.query(DocumentBlob).filter(
+            DocumentBlob.sha256 == digest, DocumentBlob.ref_count > 0
+        ).update({DocumentBlob.ref_count: DocumentBlob.ref_count + count}, synchronize_session=False)
+        return updated > 0
+
+    @staticmethod
+    def _set_size(db: Session, digest: str, size: int, only_if_missing: bool):
+        query = db.query(DocumentBlob).filter(DocumentBlob.sha256 == digest)
+        if only_if_missing:
+            query = query.filter(DocumentBlob.size_bytes.is_(None))
+        query.update({DocumentBlob.size_bytes: size}, synchronize_session=False)
+
+    @staticmethod
+    def _file_size(path: str) -> Optional[int]:
+        try:
+            return os.path.getsize(path)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _get(db: Session, digest: str) -> DocumentBlob:
+        # Refreshed, as the counts were changed in SQL behind the session's back
+        return db.query(DocumentBlob).filter(DocumentBlob.sha256 == digest).populate_existing().one()
+
+    def _add(self, db: Session, digest: str, size: Optional[int], count: int) -> DocumentBlob:
+        blob = DocumentBlob(sha256=digest, file_path=self.path_for(digest), size_bytes=size, ref_count=count)
+        try:
+            # In a savepoint, so losing the race only undoes this insert
+            with db.begin_nested():
+                db.add(blob)
+        except IntegrityError:
+            # Stored by another request (or process) meanwhile
+            db.query(DocumentBlob).filter(DocumentBlob.sha256 == digest).update(
+                {DocumentBlob.ref_count: DocumentBlob.ref_count + count}, synchronize_session=False
+            )
+            if size is not None:
+                self._set_size(db, digest, size, only_if_missing=True)
+            blob = self._get(db, digest)
+        return blob
+
+    async def _render_once(self, digest: str, content: str, path: str, title: str, document_date: str) -> int:
+        future = self._in_flight.get(digest)
+        if future is None:
+            future = asyncio.ensure_future(self._render(content, path, title, document_date))
+            self._in_flight[digest] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(digest, None))
+        else:
+            self.shared_renders += 1
+        return await asyncio.shield(future)
+
+    async def _render(self, content: str, path: str, title: str, document_date: str) -> int:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Rendered under a temporary name so the final path only ever holds a complete file
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            await pdf_render_pool.render(content, temp_path, title, document_date)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return os.path.getsize(path)
+
+    def release(self, db: Session, file_path: str) -> bool:
+        """Drop one reference to a document's file.
+
+        Returns True when no other document uses the file any more (also
+        for files from before the store). The caller commits, then calls
+        ``remove_unused`` to delete the file.
+        """
+        blob = db.query(DocumentBlob).filter(DocumentBlob.file_path == file_path).first()
+        if blob is None:
+            return True
+        self.released += 1
+        db.query(DocumentBlob).filter(DocumentBlob.id == blob.id).update(
+            {DocumentBlob.ref_count: DocumentBlob.ref_count - 1}, synchronize_session=False
+        )
+        deleted = db.query(DocumentBlob).filter(
+            DocumentBlob.id == blob.id, DocumentBlob.ref_count <= 0
+        ).delete(synchronize_session="fetch")
+        return bool(deleted)
+
+    def remove_unused(self, db: Session, file_path: str) -> bool:
+        """Delete a released file, after the release is committed, unless it is stored again.
+
+        Returns True if the file was deleted.
+        """
+        if db.query(DocumentBlob.id).filter(DocumentBlob.file_path == file_path).first() is not None:
+            return False
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            return False
+        self.files_deleted += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "shared_renders": self.shared_renders,
+            "deferred": self.deferred,
+            "rendered_on_download": self.rendered_on_download,
+            "released": self.released,
+            "files_deleted": self.files_deleted
+        }
+
+
+# Shared by the document endpoints
+document_store = DocumentStore(os.path.join(settings.pdf_output_dir, "blobs"))
@@ -0,0 +1,236 @@
+from typing import Dict, List, Any, Iterable, Tuple
+import math
+import re
+
+import numpy as np
+
+from app.models.schemas import LegalCategory
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have he her his i if in
+into is it its me my no not of on or our she so that the their them they this to was we were what
+when which who will with would you your won t s don doesn didn isn only use any above issue truly
+fit involves
+""".split())
+
+# Phrases that signal time pressure (mirrors the urgency factors in the category templates)
+URGENT_TERMS = (
+    "urgent", "emergency", "immediately", "today", "tomorrow", "tonight", "deadline",
+    "evict", "lockout", "locked out", "deport", "detained", "detention", "arrested",
+    "garnish", "foreclos", "court date", "hearing", "unsafe", "violence"
+)
+
+# Phrases that signal there is no time pressure; urgent terms take precedence
+LOW_URGENCY_TERMS = (
+    "no rush", "not urgent", "no hurry", "general question", "just wondering", "curious",
+    "in the future", "planning to", "thinking about", "someday", "years ago", "last year"
+)
+
+# Discrimination cuts across categories ("landlord refuses to rent to me
+# because I am Black" is a fair housing case, not a tenant dispute). These
+# seeds pull such descriptions towards housing / civil_rights so the
+# tenant_rights centroid cannot claim them with high confidence.
+DISCRIMINATION_SEED_PHRASES = {
+    "housing": [
+        "refuses to rent to me because of my race",
+        "refused to rent because black",
+        "denied an apartment because of religion national origin or disability",
+        "will not rent to families with children",
+        "fair housing discrimination against applicants",
+    ],
+    "civil_rights": [
+        "discriminated against because black",
+        "treated differently because of race religion sex or disability",
+        "racial discrimination",
+        "refused service because of race",
+    ],
+}
+
+
+SUFFIXES = ("ations", "ation", "ings", "ing", "ures", "ure", "ers", "er", "ed", "ies", "s")
+
+
+def stem(word: str) -> str:
+    """Crude suffix stripping so "evicted", "eviction" and "evictions" share a feature."""
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            if suffix == "s" and word.endswith("ss"):
+                return word
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, stemmed word tokens with stopwords removed."""
+    return [
+        stem(word)
+        for word in re.findall(r"[a-z0-9]+", text.lower())
+        if word not in STOPWORDS and len(word) >= 2
+    ]
+
+
+def extract_features(text: str) -> List[str]:
+    """Unigram and bigram features for a piece of text."""
+    tokens = tokenize(text)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class FastPathClassifier:
+    """In-process TF-IDF classifier over the LegalCategory enum.
+
+    Each category is represented by a TF-IDF centroid built from seed
+    phrases (and optionally from historical issues). Scoring an issue is a
+    single sparse-row times dense-matrix product, so obvious cases can be
+    answered without an LLM round trip.
+    """
+
+    def __init__(self, seed_phrases: Dict[str, Iterable[str]], sharpness: float = 12.0):
+        self.categories = [c.value for c in LegalCategory if c != LegalCategory.OTHER]
+        self.sharpness = sharpness
+        self._seed_docs: Dict[str, List[str]] = {c: [] for c in self.categories}
+        for category, phrases in seed_phrases.items():
+            if category in self._seed_docs:
+                self._seed_docs[category].extend(phrases)
+        self._training_docs: Dict[str, List[str]] = {c: [] for c in self.categories}
+        self.fast_path_answers = 0
+        self.llm_fallbacks = 0
+        self._build()
+
+    def _build(self):
+        """(Re)compute vocabulary, IDF weights and the category centroid matrix."""
+        category_counts = []
+        vocabulary: Dict[str, int] = {}
+        for category in self.categories:
+            counts: Dict[str, float] = {}
+            for doc in self._seed_docs[category]:
+                for feature in extract_features(doc):
+                    counts[feature] = counts.get(feature, 0.0) + 1.0
+            # Historical issues are noisier than curated seeds; down-weight them
+            for doc in self._training_docs[category]:
+                for feature in set(extract_features(doc)):
+                    counts[feature] = counts.get(feature, 0.0) + 0.25
+            for feature in counts:
+                vocabulary.setdefault(feature, len(vocabulary))
+            category_counts.append(counts)
+
+        matrix = np.zeros((len(self.categories), len(vocabulary)), dtype=np.float32)
+        for row, counts in enumerate(category_counts):
+            for feature, count in counts.items():
+                matrix[row, vocabulary[feature]] = 1.0 + math.log(count)
+
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = np.log((1.0 + len(self.categories)) / (1.0 + document_frequency)) + 1.0
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+
+        self.vocabulary = vocabulary
+        self.idf = idf.astype(np.float32)
+        self.matrix = matrix / norms
+
+    def fit(self, labelled_texts: Iterable[Tuple[str, str]]):
+        """Add (description, category) training examples and rebuild the model."""
+        added = 0
+        for text, category in labelled_texts:
+            if category in self._training_docs and text:
+                self._training_docs[category].append(text)
+                added += 1
+        if added:
+            self._build()
+        return added
+
+    def train_from_db(self, session_factory, limit: int = 5000) -> int:
+        """Train on categorized LegalIssue rows already stored in the database."""
+        from app.models.database import LegalIssue
+
+        db = session_factory()
+        try:
+            rows = (
+                db.query(LegalIssue.description, LegalIssue.category)
+                .filter(LegalIssue.category.isnot(None), LegalIssue.category != "other")
+                .order_by(LegalIssue.id.desc())
+                .limit(limit)
+                .all()
+            )
+        finally:
+            db.close()
+        return self.fit((row.description, row.category) for row in rows)
+
+    def score(self, description: str) -> np.ndarray:
+        """Cosine similarity between the description and each category centroid."""
+        indices = [self.vocabulary[f] for f in extract_features(description) if f in self.vocabulary]
+        if not indices:
+            return np.zeros(len(self.categories), dtype=np.float32)
+        columns, counts = np.unique(np.asarray(indices), return_counts=True)
+        weights = (1.0 + np.log(counts)) * self.idf[columns]
+        query_norm = np.linalg.norm(weights)
+        return self.matrix[:, columns] @ (weights / query_norm)
+
+    def classify(self, description: str) -> Dict[str, Any]:
+        """Classify a description, returning the same shape as the LLM classifier."""
+        scores = self.score(description)
+        best = int(np.argmax(scores))
+        top_score = float(scores[best])
+
+        # Softmax over sharpened similarities; damp confidence when the
+        # best match itself is weak so sparse matches never look certain.
+        exp_scores = np.exp(self.sharpness * (scores - scores.max()))
+        probability = float(exp_scores[best] / exp_scores.sum())
+        confidence = probability * min(1.0, top_score / 0.25)
+
+        return {
+            "category": self.categories[best] if top_score > 0 else "other",
+            "confidence": round(confidence, 4),
+            "urgency": self._estimate_urgency(description),
+            "complexity": self._estimate_complexity(description),
+            "reasoning": f"Local keyword match (similarity {top_score:.2f})"
+        }
+
+    def _estimate_urgency(self, description: str) -> str:
+        text = description.lower()
+        if any(phrase in text for phrase in URGENT_TERMS):
+            return "high"
+        if any(phrase in text for phrase in LOW_URGENCY_TERMS):
+            return "low"
+        return "medium"
+
+    @staticmethod
+    def _estimate_complexity(description: str) -> str:
+        word_count = len(description.split())
+        if word_count < 25:
+            return "simple"
+        if word_count > 150:
+            return "complex"
+        return "moderate"
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.fast_path_answers + self.llm_fallbacks
+        return {
+            "vocabulary_size": len(self.vocabulary),
+            "training_examples": sum(len(docs) for docs in self._training_docs.values()),
+            "fast_path_answers": self.fast_path_answers,
+            "llm_fallbacks": self.llm_fallbacks,
+            "fast_path_rate": round(self.fast_path_answers / total, 4) if total else 0.0
+        }
+
+
+def build_seed_phrases(
+    glossary: Dict[str, str],
+    guidelines: Dict[str, str],
+    category_templates: Dict[str, Dict[str, Any]]
+) -> Dict[str, List[str]]:
+    """Collect seed phrases per category from the prompt glossary and category templates."""
+    seeds: Dict[str, List[str]] = {}
+    for category, text in glossary.items():
+        seeds.setdefault(category, []).extend(p.strip() for p in text.split(","))
+        seeds[category].append(category.replace("_", " "))
+    for category, text in guidelines.items():
+        seeds.setdefault(category, []).append(text)
+    for category, template in category_templates.items():
+        phrases = seeds.setdefault(category, [])
+        phrases.append(template.get("description", ""))
+        phrases.extend(template.get("common_issues", []))
+    for category, phrases in DISCRIMINATION_SEED_PHRASES.items():
+        seeds.setdefault(category, []).extend(phrases)
+    return seeds
+
@@ -0,0 +1,324 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import time
+import zlib
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+from app.services.fast_classifier import tokenize
+
+# Hash family (a * x + b) mod P over 32-bit shingle hashes; a < 2**32 keeps
+# a * x + b inside uint64
+_PRIME = np.uint64(4294967311)
+_MASK16 = np.uint64(0xFFFF)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+# A band of 1, 2 or 4 16-bit values is read as one unsigned integer
+_BAND_DTYPES = {1: np.uint16, 2: np.uint32, 4: np.uint64}
+
+# Shingles hashed per vectorized chunk when building in bulk
+_BULK_CHUNK = 2000
+
+# Near-duplicates loaded from the database at a time by find_reusable_issue
+_REUSE_BATCH = 20
+
+# Categories and advice produced without a usable LLM answer are never reused
+FALLBACK_CLASSIFICATION_SOURCES = ("error_fallback", "fast_path_fallback")
+FALLBACK_ADVICE_MODELS = ("error_fallback", "deterministic_fallback")
+
+
+def shingles(text: str) -> List[str]:
+    """Word bigrams of the normalized description (unigrams for very short text)."""
+    tokens = tokenize(text)
+    if len(tokens) < 2:
+        return tokens or [""]
+    return [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _normalize_location(location: Optional[str]) -> str:
+    return (location or "").strip().lower()
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of issue descriptions for near-duplicate lookup.
+
+    Each description becomes a MinHash signature of ``num_perm`` values
+    over its word bigrams; only the low 16 bits of each value are kept
+    (b-bit MinHash), which halves memory at a negligible accuracy cost.
+    The signature is split into ``bands`` bands. Two descriptions become
+    candidates when any band matches, and candidates are kept when their
+    estimated Jaccard similarity reaches ``threshold`` and their location
+    is the same.
+
+    Per band, band keys are kept in sorted NumPy arrays searched with
+    ``np.searchsorted``. New entries go to a small per-band dict and are
+    merged into the sorted arrays once it holds an eighth of the index,
+    so inserts stay cheap on average.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8, seed: int = 1):
+        if num_perm % bands or num_perm // bands not in _BAND_DTYPES:
+            raise ValueError("num_perm must be 1, 2 or 4 times bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2**32 - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2**32 - 1, size=num_perm, dtype=np.uint64)
+
+        self._size = 0
+        self._signatures = np.empty((0, num_perm), dtype=np.uint16)
+        self._issue_ids = np.empty(0, dtype=np.int64)
+        self._locations = np.empty(0, dtype=np.uint32)
+        self._location_ids: Dict[str, int] = {}
+
+        self._sorted_keys = [np.empty(0, dtype=np.uint32) for _ in range(bands)]
+        self._sorted_rows = [np.empty(0, dtype=np.uint32) for _ in range(bands)]
+        self._pending: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._pending_rows = 0
+
+        self.lookups = 0
+        self.matches = 0
+        self.latency = LatencyStats()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _hash_shingles(self, items: Sequence[str]) -> np.ndarray:
+        return np.fromiter((zlib.crc32(item.encode("utf-8")) for item in items), dtype=np.uint64, count=len(items))
+
+    def signature(self, text: str) -> np.ndarray:
+        """16-bit MinHash signature of a description."""
+        hashes = self._hash_shingles(shingles(text))
+        values = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return (values.min(axis=1) & _MASK16).astype(np.uint16)
+
+    def _signatures_for(self, texts: Sequence[str]) -> np.ndarray:
+        """Signatures for many descriptions, vectorized across descriptions."""
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint16)
+        for start in range(0, len(texts), _BULK_CHUNK):
+            chunk = [shingles(text) for text in texts[start:start + _BULK_CHUNK]]
+            offsets = np.cumsum([0] + [len(items) for items in chunk[:-1]])
+            hashes = self._hash_shingles([item for items in chunk for item in items])
+            values = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+            minima = np.minimum.reduceat(values, offsets, axis=1)
+            result[start:start + len(chunk)] = (minima.T & _MASK16).astype(np.uint16)
+        return result
+
+    def _band_keys(self, signatures: np.ndarray, band: int) -> np.ndarray:
+        """32-bit key of one band for each signature; equal bands give equal keys."""
+        columns = signatures[:, band * self.rows_per_band:(band + 1) * self.rows_per_band]
+        packed = np.ascontiguousarray(columns).view(_BAND_DTYPES[self.rows_per_band])[:, 0].astype(np.uint64)
+        return ((packed * _GOLDEN) >> np.uint64(32)).astype(np.uint32)
+
+    def _location_id(self, location: Optional[str]) -> int:
+        key = _normalize_location(location)
+        if key not in self._location_ids:
+            self._location_ids[key] = len(self._location_ids)
+        return self._location_ids[key]
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed <= len(self._issue_ids):
+            return
+        capacity = max(needed, 2 * len(self._issue_ids), 1024)
+        signatures = np.empty((capacity, self.num_perm), dtype=np.uint16)
+        signatures[:self._size] = self._signatures[:self._size]
+        self._signatures = signatures
+        self._issue_ids = np.resize(self._issue_ids, capacity)
+        self._locations = np.resize(self._locations, capacity)
+
+    def add(self, issue_id: int, text: str, location: Optional[str] = None):
+        """Index one description; it is searchable immediately."""
+        signature = self.signature(text)
+        self._reserve(1)
+        row = self._size
+        self._signatures[row] = signature
+        self._issue_ids[row] = issue_id
+        self._locations[row] = self._location_id(location)
+        self._size += 1
+
+        for band in range(self.bands):
+            key = int(self._band_keys(signature[None, :], band)[0])
+            self._pending[band].setdefault(key, []).append(row)
+        self._pending_rows += 1
+        if self._pending_rows >= max(1024, self._size // 8):
+            self._merge_pending()
+
+    def add_many(self, issue_ids: Sequence[int], texts: Sequence[str], locations: Sequence[Optional[str]]):
+        """Index many descriptions at once (much faster than repeated add)."""
+        if not issue_ids:
+            return
+        signatures = self._signatures_for(texts)
+        self._reserve(len(issue_ids))
+        start = self._size
+        end = start + len(issue_ids)
+        self._signatures[start:end] = signatures
+        self._issue_ids[start:end] = issue_ids
+        self._locations[start:end] = [self._location_id(location) for location in locations]
+        self._size = end
+        self._merge_pending()
+
+    def _merge_pending(self):
+        """Rebuild the sorted band arrays to include every indexed row."""
+        for band in range(self.bands):
+            keys = self._band_keys(self._signatures[:self._size], band)
+            order = np.argsort(keys, kind="stable").astype(np.uint32)
+            self._sorted_rows[band] = order
+            self._sorted_keys[band] = keys[order]
+            self._pending[band] = {}
+        self._pending_rows = 0
+
+    def find(
+        self,
+        text: str,
+        location: Optional[str] = None,
+        limit: Optional[int] = 5,
+        exclude_issue_id: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Near-duplicates in the same location as ``(issue_id, similarity)``, best first.
+
+        ``limit=None`` returns every match.
+        """
+        started = time.perf_counter()
+        self.lookups += 1
+        location_id = self._location_ids.get(_normalize_location(location))
+        if location_id is None:
+            self.latency.record((time.perf_counter() - started) * 1000)
+            return []
+
+        signature = self.signature(text)
+        candidates = []
+        for band in range(self.bands):
+            key = self._band_keys(signature[None, :], band)[0]
+            sorted_keys = self._sorted_keys[band]
+            lo = np.searchsorted(sorted_keys, key, side="left")
+            hi = np.searchsorted(sorted_keys, key, side="right")
+            if hi > lo:
+                candidates.append(self._sorted_rows[band][lo:hi])
+            pending = self._pending[band].get(int(key))
+            if pending:
+                candidates.append(np.asarray(pending, dtype=np.uint32))
+
+        results: List[Tuple[int, float]] = []
+        if candidates:
+            rows = np.unique(np.concatenate(candidates))
+            rows = rows[self._locations[rows] == location_id]
+            similarity = (self._signatures[rows] == signature).mean(axis=1)
+            keep = similarity >= self.threshold
+            rows, similarity = rows[keep], similarity[keep]
+            for index in np.argsort(-similarity, kind="stable"):
+                issue_id = int(self._issue_ids[rows[index]])
+                if issue_id != exclude_issue_id:
+                    results.append((issue_id, round(float(similarity[index]), 4)))
+                if limit is not None and len(results) >= limit:
+                    break
+
+        if results:
+            self.matches += 1
+        self.latency.record((time.perf_counter() - started) * 1000)
+        return results
+
+    def load_from_db(self, session_factory, limit: int) -> int:
+        """Index the most recent stored issues."""
+        from app.models.database import LegalIssue
+
+        db = session_factory()
+        try:
+            rows = (
+                db.query(LegalIssue.id, LegalIssue.description, LegalIssue.location)
+                .order_by(LegalIssue.id.desc())
+                .limit(limit)
+                .all()
+            )
+        finally:
+            db.close()
+        rows.reverse()
+        self.add_many([row.id for row in rows], [row.description for row in rows], [row.location for row in rows])
+        return len(rows)
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the index."""
+        arrays = [self._signatures, self._issue_ids, self._locations, *self._sorted_keys, *self._sorted_rows]
+        # Pending entries: dict slot plus a small list per key, roughly 100 bytes per row and band
+        return sum(array.nbytes for array in arrays) + self._pending_rows * self.bands * 100
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "issues": self._size,
+            "locations": len(self._location_ids),
+            "memory_mb": round(self.memory_bytes() / (1024 * 1024), 2),
+            "lookups": self.lookups,
+            "matches": self.matches,
+            "match_rate": round(self.matches / self.lookups, 4) if self.lookups else 0.0,
+            "lookup_latency": self.latency.snapshot()
+        }
+
+
+def find_reusable_issue(
+    db,
+    description: str,
+    location: Optional[str] = None,
+    exclude_issue_id: Optional[int] = None,
+    require_advice: bool = False,
+    user_email: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Closest categorized near-duplicate of a description, with its latest advice.
+
+    Categories from fallback classifications are never reused. Advice is
+    written for one person's situation, so it only comes from issues
+    submitted with the same ``user_email``; without one, only the category
+    is reused. Returns ``{"issue": LegalIssue, "similarity": float,
+    "advice": LegalAdvice or None}`` or None when there is no usable match
+    (or dedup is disabled).
+    """
+    from sqlalchemy import or_
+    from app.models.database import LegalIssue, LegalAdvice
+
+    if not settings.enable_issue_dedup or (require_advice and not user_email):
+        return None
+    # Every match is ranked; candidates are checked best first, a batch at a time
+    matches = issue_dedup.find(description, location, limit=None, exclude_issue_id=exclude_issue_id)
+
+    for start in range(0, len(matches), _REUSE_BATCH):
+        batch = matches[start:start + _REUSE_BATCH]
+        query = db.query(LegalIssue).filter(
+            LegalIssue.id.in_([issue_id for issue_id, _ in batch]),
+            LegalIssue.category.isnot(None),
+            or_(
+                LegalIssue.classification_source.is_(None),  # stored before sources were recorded
+                LegalIssue.classification_source.notin_(FALLBACK_CLASSIFICATION_SOURCES)
+            )
+        )
+        if require_advice:
+            query = query.filter(LegalIssue.user_email == user_email)
+        issues = {issue.id: issue for issue in query}
+
+        advice_by_issue = {}
+        own_issues = [issue.id for issue in issues.values() if user_email and issue.user_email == user_email]
+        if own_issues:
+            for advice in (
+                db.query(LegalAdvice)
+                .filter(
+                    LegalAdvice.issue_id.in_(own_issues),
+                    LegalAdvice.model_used.notin_(FALLBACK_ADVICE_MODELS)
+                )
+                .order_by(LegalAdvice.id)
+            ):
+                advice_by_issue[advice.issue_id] = advice  # latest wins
+
+        for issue_id, similarity in batch:
+            if issue_id not in issues or (require_advice and issue_id not in advice_by_issue):
+                continue
+            return {"issue": issues[issue_id], "similarity": similarity, "advice": advice_by_issue.get(issue_id)}
+    return None
+
+
+# Shared index; filled from stored issues at startup and updated on insert
+issue_dedup = NearDuplicateIndex(
+    settings.issue_dedup_num_perm,
+    settings.issue_dedup_bands,
+    settings.issue_dedup_threshold
+)
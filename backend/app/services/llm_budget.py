@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+import math
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import LLMBudgetUsage
+
+
+class BudgetExceededError(Exception):
+    """Raised instead of calling the LLM once a task's daily budget is used up."""
+
+    def __init__(self, task: str, retry_after: int, reason: str):
+        self.task = task
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"LLM {task} daily budget exhausted ({reason}); resets in {retry_after}s")
+
+
+class LLMBudget:
+    """Daily token and call caps per task.
+
+    Usage is counted per UTC day. ``reserve`` checks the caps and counts
+    the call in one step, so concurrent calls cannot all pass the call cap;
+    a call that fails is handed back with ``release``. Tokens are only
+    known once a call completes, so calls in flight when the token cap is
+    reached may overshoot it by their own size.
+
+    Tasks with a cap are counted in the ``llm_budget_usage`` table, one row
+    per day and task, with conditional UPDATEs; every worker process shares
+    those rows, so the caps hold for the deployment as a whole and survive
+    restarts. Tasks without a cap have nothing to enforce and are only
+    counted in memory, per process, to keep the database out of their path.
+    """
+
+    def __init__(
+        self,
+        token_limits: Dict[str, Optional[int]],
+        call_limits: Dict[str, Optional[int]],
+        session_factory=None
+    ):
+        self.token_limits = token_limits
+        self.call_limits = call_limits
+        self.session_factory = session_factory
+        self._day = self._today()
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self.rejected: Dict[str, int] = {}
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date()
+
+    def _shared(self, task: str) -> bool:
+        capped = self.token_limits.get(task) is not None or self.call_limits.get(task) is not None
+        return capped and self.session_factory is not None
+
+    def _current(self, task: str) -> Dict[str, int]:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._usage.clear()
+        return self._usage.setdefault(task, {"tokens": 0, "calls": 0})
+
+    def _row(self, db, task: str):
+        return db.query(LLMBudgetUsage).filter(
+            LLMBudgetUsage.day == self._today().isoformat(), LLMBudgetUsage.task == task
+        )
+
+    def _add_row(self, db, task: str):
+        try:
+            # In a savepoint, so losing the race to another worker only undoes this insert
+            with db.begin_nested():
+                db.add(LLMBudgetUsage(day=self._today().isoformat(), task=task, tokens=0, calls=0))
+        except IntegrityError:
+            pass
+
+    def _update(self, task: str, values: Dict[Any, Any], *conditions) -> bool:
+        """Apply ``values`` to today's row for the task if it meets ``conditions``."""
+        db = self.session_factory()
+        try:
+            updated = self._row(db, task).filter(*conditions).update(values, synchronize_session=False)
+            db.commit()
+            return updated > 0
+        finally:
+            db.close()
+
+    def usage(self, task: str) -> Dict[str, int]:
+        """Today's tokens and calls for the task (shared totals for capped tasks)."""
+        if not self._shared(task):
+            return dict(self._current(task))
+        db = self.session_factory()
+        try:
+            row = self._row(db, task).first()
+            return {"tokens": row.tokens, "calls": row.calls} if row else {"tokens": 0, "calls": 0}
+        finally:
+            db.close()
+
+    def reserve(self, task: str):
+        """Count a call against the task's budget, or raise BudgetExceededError if it is used up."""
+        if not self._shared(task):
+            self._current(task)["calls"] += 1
+            return
+
+        token_limit = self.token_limits.get(task)
+        call_limit = self.call_limits.get(task)
+        within_caps = []
+        if token_limit is not None:
+            within_caps.append(LLMBudgetUsage.tokens < token_limit)
+        if call_limit is not None:
+            within_caps.append(LLMBudgetUsage.calls < call_limit)
+        count_call = {LLMBudgetUsage.calls: LLMBudgetUsage.calls + 1}
+
+        # Checked and counted in one statement, so concurrent workers cannot all pass the cap
+        if self._update(task, count_call, *within_caps):
+            return
+        db = self.session_factory()
+        try:
+            if self._row(db, task).first() is None:
+                # First call of the day for this task
+                self._add_row(db, task)
+                db.commit()
+        finally:
+            db.close()
+        if self._update(task, count_call, *within_caps):
+            return
+
+        usage = self.usage(task)
+        if token_limit is not None and usage["tokens"] >= token_limit:
+            reason = f"{usage['tokens']}/{token_limit} tokens"
+        else:
+            reason = f"{usage['calls']}/{call_limit} calls"
+        self.rejected[task] = self.rejected.get(task, 0) + 1
+        raise BudgetExceededError(task, self.seconds_until_reset(), reason)
+
+    def release(self, task: str):
+        """Hand back a reserved call that did not complete."""
+        if not self._shared(task):
+            usage = self._current(task)
+            usage["calls"] = max(0, usage["calls"] - 1)
+            return
+        self._update(task, {LLMBudgetUsage.calls: LLMBudgetUsage.calls - 1}, LLMBudgetUsage.calls > 0)
+
+    def charge(self, task: str, tokens: int):
+        """Add the tokens of a reserved call that completed."""
+        if not self._shared(task):
+            self._current(task)["tokens"] += tokens
+            return
+        # Counted on the day the call finished, if a call has been reserved that day
+        self._update(task, {LLMBudgetUsage.tokens: LLMBudgetUsage.tokens + tokens})
+
+    def seconds_until_reset(self) -> int:
+        now = datetime.now(timezone.utc)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+        return max(1, math.ceil((midnight - now).total_seconds()))
+
+    def get_stats(self) -> Dict[str, Any]:
+        result = {"day": self._today().isoformat()}
+        for task in ("classify", "advice"):
+            usage = self.usage(task)
+            result[task] = {
+                "tokens": usage["tokens"],
+                "token_limit": self.token_limits.get(task),
+                "calls": usage["calls"],
+                "call_limit": self.call_limits.get(task),
+                "shared": self._shared(task),
+                "rejected": self.rejected.get(task, 0)
+            }
+        return result
+
+
+# Shared by every LLMService instance
+llm_budget = LLMBudget(
+    {"classify": settings.llm_daily_token_budget_classify, "advice": settings.llm_daily_token_budget_advice},
+    {"classify": settings.llm_daily_call_budget_classify, "advice": settings.llm_daily_call_budget_advice},
+    SessionLocal
+)
@@ -0,0 +1,137 @@
+from openai import AsyncOpenAI
+from importlib.util import find_spec
+from typing import Dict, Optional, Any
+import httpx
+
+from app.core.config import settings
+
+
+class LLMClientPool:
+    """Long-lived, pooled HTTP clients shared by every LLMService instance.
+
+    The clients are created once in the application lifespan and reused for
+    all OpenAI and local LLM calls, so requests share keep-alive connections
+    instead of paying TCP/TLS setup each time.
+    """
+
+    def __init__(self):
+        self._openai_http: Optional[httpx.AsyncClient] = None
+        self._local_http: Optional[httpx.AsyncClient] = None
+        self._openai: Optional[AsyncOpenAI] = None
+        self.requests_sent = {"openai": 0, "local_llm": 0}
+
+    async def startup(self):
+        """Create the pooled clients (idempotent)."""
+        self._ensure_clients()
+
+    async def shutdown(self):
+        """Close the pooled clients and release their connections."""
+        if self._openai is not None:
+            await self._openai.close()
+        if self._openai_http is not None:
+            await self._openai_http.aclose()
+        if self._local_http is not None:
+            await self._local_http.aclose()
+        self._openai = None
+        self._openai_http = None
+        self._local_http = None
+
+    @property
+    def openai(self) -> AsyncOpenAI:
+        """Shared AsyncOpenAI client backed by the pooled HTTP client."""
+        self._ensure_clients()
+        return self._openai
+
+    @property
+    def local(self) -> httpx.AsyncClient:
+        """Shared HTTP client for local LLM endpoints."""
+        self._ensure_clients()
+        return self._local_http
+
+    def _ensure_clients(self):
+        # Clients are created lazily as well so scripts that never run the
+        # FastAPI lifespan (init_db.py, benchmarks) still work.
+        if self._openai_http is None:
+            self._openai_http = self._build_http_client("openai")
+            self._openai = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                http_client=self._openai_http
+            )
+        if self._local_http is None:
+            self._local_http = self._build_http_client("local_llm")
+
+    def _build_http_client(self, name: str) -> httpx.AsyncClient:
+        """Build an httpx client with the configured limits and timeouts."""
+
+        limits = httpx.Limits(
+            max_connections=settings.llm_pool_max_connections,
+            max_keepalive_connections=settings.llm_pool_max_keepalive_connections,
+            keepalive_expiry=settings.llm_pool_keepalive_expiry
+        )
+        timeout = httpx.Timeout(
+            connect=settings.llm_connect_timeout,
+            read=settings.llm_read_timeout,
+            write=settings.llm_write_timeout,
+            pool=settings.llm_pool_timeout
+        )
+
+        http2 = settings.llm_http2
+        if http2 and find_spec("h2") is None:
+            print("LLM_HTTP2 is enabled but the 'h2' package is not installed, falling back to HTTP/1.1")
+            http2 = False
+
+        async def count_request(request: httpx.Request):
+            self.requests_sent[name] += 1
+
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=timeout,
+            http2=http2,
+            event_hooks={"request": [count_request]}
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return connection pool statistics for sizing the pool."""
+        return {
+            "config": {
+                "max_connections": settings.llm_pool_max_connections,
+                "max_keepalive_connections": settings.llm_pool_max_keepalive_connections,
+                "keepalive_expiry": settings.llm_pool_keepalive_expiry,
+                "http2": settings.llm_http2
+            },
+            "openai": self._client_stats("openai", self._openai_http),
+            "local_llm": self._client_stats("local_llm", self._local_http)
+        }
+
+    def _client_stats(self, name: str, client: Optional[httpx.AsyncClient]) -> Dict[str, Any]:
+        stats = {
+            "started": client is not None,
+            "requests_sent": self.requests_sent[name],
+            "connections": 0,
+            "active": 0,
+            "idle": 0,
+            "http2_connections": 0
+        }
+        if client is None:
+            return stats
+
+        # httpx does not expose pool state publicly; read it from the
+        # underlying httpcore pool when available.
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        stats["connections"] = len(connections)
+        for connection in connections:
+            try:
+                if connection.is_idle():
+                    stats["idle"] += 1
+                else:
+                    stats["active"] += 1
+                if "HTTP/2" in connection.info():
+                    stats["http2_connections"] += 1
+            except Exception:
+                continue
+        return stats
+
+
+# Global client pool shared across requests
+llm_clients = LLMClientPool()
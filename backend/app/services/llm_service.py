@@ -1,19 +1,69 @@
-from openai import AsyncOpenAI
 from app.core.config import settings
-aclient = AsyncOpenAI(api_key=settings.openai_api_key)
-import httpx
+from app.services.llm_clients import llm_clients
+from app.services.classification_cache import classification_cache
+from app.services.singleflight import SingleFlight
+from app.services.batching import MicroBatcher
+from app.services.concurrency import ConcurrencyLimiter, llm_limiters, LLMOverloadedError
+from app.services.circuit_breaker import llm_breakers, CircuitOpenError
+from app.services.backend_router import local_llm_router
+from app.services.structured_output import (
+    openai_response_format, local_schema_param, validation_error, output_validation
+)
+from app.services.prompts import RenderedPrompt, get_prompt, count_tokens, prompt_metrics
+from app.services.call_log import llm_call_log
+from app.services.llm_budget import llm_budget, BudgetExceededError
+from app.models.schemas import ClassificationOutput, AdviceOutput, AnalysisWithAdviceOutput
+from pydantic import BaseModel
+import contextlib
+import hashlib
 import json
 import re
-from typing import Dict, List, Optional, Any
+import time
+from typing import Dict, List, Optional, Any, AsyncIterator, Type
+
+
+class LLMResult:
+    """Text returned by one LLM call plus the model and token usage reported for it."""
+
+    def __init__(
+        self,
+        text: str,
+        model: str,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None
+    ):
+        self.text = text
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+# Shared across LLMService instances so identical concurrent prompts collapse
+llm_singleflight = SingleFlight()
+
+# Optional batching of classification prompts for batch-capable local LLM servers
+classification_batcher = None
+if settings.use_local_llm and settings.enable_local_llm_batching and settings.local_llm_batch_url:
+    classification_batcher = MicroBatcher(
+        settings.local_llm_batch_url,
+        settings.local_llm_batch_max_size,
+        settings.local_llm_batch_max_wait_ms,
+        settings.classify_max_tokens,
+        temperature=settings.classify_temperature,
+        model=settings.local_llm_classify_model,
+        json_schema=local_schema_param(ClassificationOutput)
+    )
+
+# Low-confidence classifications retried on the advice model (ENABLE_MODEL_ESCALATION)
+model_escalations = {"attempted": 0, "improved": 0}
 
 
 class LLMService:
     """Service for interacting with Language Learning Models (OpenAI or local)."""
 
     def __init__(self):
-        if settings.openai_api_key:
-            self.use_local = settings.use_local_llm
-            self.local_url = settings.local_llm_url
+        self.use_local = settings.use_local_llm
+        self.local_router = local_llm_router
 
     async def generate_advice(
         self, 
@@ -27,13 +77,14 @@ class LLMService:
         prompt = self._build_advice_prompt(description, category, location, additional_context)
 
         try:
-            if self.use_local and self.local_url:
-                response = await self._call_local_llm(prompt)
-            else:
-                response = await self._call_openai(prompt)
+            result = await self._call_llm_validated(prompt, "advice", AdviceOutput)
 
-            return self._parse_advice_response(response)
+            return self._parse_advice_response(result.text, result.model)
 
+        except LLMOverloadedError:
+            raise
+        except (CircuitOpenError, BudgetExceededError):
+            return self._fallback_advice(category, location)
         except Exception as e:
             return {
                 "advice": f"I apologize, but I'm unable to generate advice at this time due to a technical issue: {str(e)}",
@@ -43,27 +94,118 @@ class LLMService:
                 "model_used": "error_fallback"
             }
 
+    async def stream_advice(
+        self,
+        description: str,
+        category: str,
+        location: Optional[str] = None,
+        additional_context: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream legal advice as it is generated.
+
+        Yields ``{"type": "token", "text": ...}`` events while the model is
+        generating, followed by one ``{"type": "result", "advice": ...}``
+        event holding the parsed advice (same shape as generate_advice).
+        """
+
+        prompt = self._build_advice_prompt(description, category, location, additional_context)
+        chunks = []
+        # The stream fills in the model the backend reports for this response
+        reported: Dict[str, Any] = {}
+        started = time.perf_counter()
+
+        try:
+            if self.use_local and self.local_router:
+                stream = self._stream_local_llm(prompt, AdviceOutput, reported)
+            else:
+                stream = self._stream_openai(prompt, AdviceOutput, reported)
+
+            try:
+                llm_budget.reserve("advice")
+                try:
+                    async with llm_limiters["advice"].slot():
+                        async with self._breaker_guard():
+                            async for text in stream:
+                                chunks.append(text)
+                                yield {"type": "token", "text": text}
+                except BaseException:
+                    llm_budget.release("advice")
+                    raise
+            except Exception as e:
+                self._record_failure(prompt, "advice", "advice", e, started)
+                raise
+            finally:
+                # Closes the backend connection now, also when the client went away
+                await stream.aclose()
+
+            # Already streamed to the client, so invalid output is counted but not repaired
+            response = "".join(chunks)
+            model = reported.get("model") or self._model_name("advice")
+            self._record_usage(prompt, LLMResult(response, model), started, "advice")
+            output_validation.record(AdviceOutput.__name__, validation_error(AdviceOutput, response) is None)
+            yield {"type": "result", "advice": self._parse_advice_response(response, model)}
+
+        except LLMOverloadedError:
+            raise
+        except (CircuitOpenError, BudgetExceededError):
+            yield {"type": "result", "advice": self._fallback_advice(category, location)}
+        except Exception as e:
+            yield {
+                "type": "result",
+                "advice": {
+                    "advice": f"I apologize, but I'm unable to generate advice at this time due to a technical issue: {str(e)}",
+                    "next_steps": ["Contact a local legal aid organization for assistance"],
+                    "relevant_laws": [],
+                    "confidence": 0.0,
+                    "model_used": "error_fallback"
+                }
+            }
+
     async def classify_legal_domain(self, description: str, location: Optional[str] = None) -> Dict[str, Any]:
         """Classify the legal domain of an issue."""
 
         prompt = self._build_classification_prompt(description, location)
 
+        started = time.perf_counter()
+        cache_key = classification_cache.build_key(
+            description, location, prompt.key, self._model_name("classify")
+        )
+        cached = await classification_cache.get(cache_key)
+        if cached is not None:
+            llm_call_log.record(
+                "classify", self.backend_name, self._model_name("classify"), prompt.key, "success",
+                latency_ms=(time.perf_counter() - started) * 1000, cache_hit=True
+            )
+            return {**cached, "source": "cache"}
+
         try:
-            if self.use_local and self.local_url:
-                response = await self._call_local_llm(prompt)
-            else:
-                response = await self._call_openai(prompt)
+            response = await self._call_llm_validated(prompt, "classify", ClassificationOutput)
 
             # Debug logging
-            print(f"LLM Response for classification: {response}")
+            print(f"LLM Response for classification: {response.text}")
             
-            result = self._parse_classification_response(response)
+            result = self._parse_classification_response(response.text)
+            source = "llm"
             
             # Debug logging
             print(f"Parsed classification result: {result}")
+
+            if self._should_escalate(result):
+                escalated = await self._escalate_classification(prompt)
+                if escalated and escalated["confidence"] > result["confidence"]:
+                    result = escalated
+                    source = "llm_escalated"
+
+            # Parse fallbacks report confidence <= 0.3; don't pin those in the cache
+            if result["confidence"] > 0.3:
+                await classification_cache.set(cache_key, result)
             
-            return result
+            return {**result, "source": source}
 
+        except LLMOverloadedError:
+            raise
+        except (CircuitOpenError, BudgetExceededError):
+            return self._fallback_classification(description)
         except Exception as e:
             print(f"Error in classify_legal_domain: {str(e)}")
             return {
@@ -71,133 +213,494 @@ class LLMService:
                 "confidence": 0.0,
                 "urgency": "medium",
                 "complexity": "moderate",
-                "reasoning": f"Classification error: {str(e)}"
+                "reasoning": f"Classification error: {str(e)}",
+                "source": "error_fallback"
+            }
+
+    async def analyze_and_advise(self, description: str, location: Optional[str] = None) -> Dict[str, Any]:
+        """Classify an issue and generate advice for it with a single prompt.
+
+        Returns ``{"classification": ..., "advice": ...}`` where each part has
+        the same shape as classify_legal_domain and generate_advice return.
+        """
+
+        prompt = self._build_combined_prompt(description, location)
+
+        try:
+            response = await self._call_llm_validated(prompt, "advice", AnalysisWithAdviceOutput)
+            result = self._parse_combined_response(response.text, response.model)
+            result["classification"]["source"] = "llm_combined"
+            return result
+
+        except LLMOverloadedError:
+            raise
+        except (CircuitOpenError, BudgetExceededError):
+            classification = self._fallback_classification(description)
+            return {
+                "classification": classification,
+                "advice": self._fallback_advice(classification["category"], location)
+            }
+        except Exception as e:
+            print(f"Error in analyze_and_advise: {str(e)}")
+            return {
+                "classification": {
+                    "category": "other",
+                    "confidence": 0.0,
+                    "urgency": "medium",
+                    "complexity": "moderate",
+                    "reasoning": f"Classification error: {str(e)}",
+                    "source": "error_fallback"
+                },
+                "advice": {
+                    "advice": f"I apologize, but I'm unable to generate advice at this time due to a technical issue: {str(e)}",
+                    "next_steps": ["Contact a local legal aid organization for assistance"],
+                    "relevant_laws": [],
+                    "confidence": 0.0,
+                    "model_used": "error_fallback"
+                }
             }
 
-    async def _call_openai(self, prompt: str) -> str:
+    def _model_name(self, profile: str) -> str:
+        """Name of the model answering a task ("classify" or "advice") on this backend."""
+        model = self._task_settings(profile)["model"]
+        if self.use_local and self.local_router:
+            return model or "local_llm"
+        return model
+
+    def _task_settings(self, profile: str) -> Dict[str, Any]:
+        """Model, max_tokens and temperature for a task on the configured backend.
+
+        The local model is None when not configured; the server then uses
+        whatever model it has loaded.
+        """
+        local = self.use_local and self.local_router
+        if profile == "classify":
+            return {
+                "model": settings.local_llm_classify_model if local else settings.classify_model or settings.openai_model,
+                "max_tokens": settings.classify_max_tokens,
+                "temperature": settings.classify_temperature
+            }
+        return {
+            "model": settings.local_llm_advice_model if local else settings.advice_model or settings.openai_model,
+            "max_tokens": settings.advice_max_tokens or settings.openai_max_tokens,
+            "temperature": settings.advice_temperature
+        }
+
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """Models in use per task and how model escalation is doing."""
+        return {
+            "classify_model": self._model_name("classify"),
+            "advice_model": self._model_name("advice"),
+            "escalation_enabled": settings.enable_model_escalation,
+            "escalation_threshold": settings.model_escalation_threshold,
+            "escalations_attempted": model_escalations["attempted"],
+            "escalations_improved": model_escalations["improved"]
+        }
+
+    def _should_escalate(self, classification: Dict[str, Any]) -> bool:
+        """True when a low-confidence classification may do better on the advice model."""
+        return (
+            settings.enable_model_escalation
+            and classification["confidence"] < settings.model_escalation_threshold
+            and self._model_name("advice") != self._model_name("classify")
+        )
+
+    async def _escalate_classification(self, prompt: RenderedPrompt) -> Optional[Dict[str, Any]]:
+        """Re-run a classification prompt on the advice model; None if that call fails."""
+        model_escalations["attempted"] += 1
+        print(f"Low-confidence classification, retrying on {self._model_name('advice')}")
+        try:
+            response = await self._call_llm_validated(prompt, "classify", ClassificationOutput, profile="advice")
+        except Exception as e:
+            # The first answer is still usable
+            print(f"Escalated classification failed: {str(e)}")
+            return None
+        result = self._parse_classification_response(response.text)
+        if result["confidence"] > settings.model_escalation_threshold:
+            model_escalations["improved"] += 1
+        return result
+
+    @property
+    def backend_name(self) -> str:
+        """Backend answering requests for this service ("openai" or "local_llm")."""
+        if self.use_local and self.local_router:
+            return "local_llm"
+        return "openai"
+
+    def _breaker_guard(self):
+        """Circuit breaker guard for the configured backend (no-op when disabled)."""
+        if not settings.enable_llm_circuit_breaker:
+            return contextlib.nullcontext()
+        return llm_breakers[self.backend_name].guard()
+
+    def _fallback_advice(self, category: str, location: Optional[str] = None) -> Dict[str, Any]:
+        """Structured advice built from category knowledge, used while the LLM is unavailable."""
+        # Imported here: legal_analyzer imports this module
+        from app.services.legal_analyzer import LegalAnalyzer
+
+        template = LegalAnalyzer._load_category_templates().get(category, {})
+        location_text = f" in {location}" if location else ""
+
+        advice = (
+            "Our AI advice service is temporarily unavailable, so this is general guidance "
+            f"for {category.replace('_', ' ')} issues{location_text}."
+        )
+        if template:
+            advice += (
+                f" This area covers {template['description'].lower()}."
+                f" Common issues include {', '.join(template['common_issues']).lower()}."
+                f" Act quickly if any of these apply: {', '.join(template['urgency_factors']).lower()}."
+            )
+        advice += (
+            " This is general information only, not legal advice. Please consult a qualified"
+            " attorney or a local legal aid organization about your specific situation."
+        )
+
+        return {
+            "advice": advice,
+            "next_steps": LegalAnalyzer._get_suggested_actions(category),
+            "relevant_laws": list(template.get("key_laws", [])),
+            "confidence": 0.3,
+            "model_used": "deterministic_fallback"
+        }
+
+    def _fallback_classification(self, description: str) -> Dict[str, Any]:
+        """Local classifier answer, used while the LLM is unavailable."""
+        from app.services.legal_analyzer import fast_classifier
+
+        return {**fast_classifier.classify(description), "source": "fast_path_fallback"}
+
+    async def _call_llm_validated(
+        self,
+        prompt: RenderedPrompt,
+        task: str,
+        output_model: Type[BaseModel],
+        profile: Optional[str] = None
+    ) -> LLMResult:
+        """Call the LLM and re-ask, a bounded number of times, while the output is invalid.
+
+        Re-asking is part of structured output and only happens when
+        LLM_STRUCTURED_OUTPUT is not "off". The last response is returned
+        even if it is still invalid; the lenient parsers then salvage what
+        they can.
+        """
+
+        kind = output_model.__name__
+        response = await self._call_llm(prompt, task, output_model, profile)
+        error = validation_error(output_model, response.text)
+        output_validation.record(kind, error is None)
+
+        repair_attempts = settings.llm_repair_attempts if settings.llm_structured_output != "off" else 0
+        attempts = 0
+        while error is not None and attempts < repair_attempts:
+            attempts += 1
+            print(f"Invalid {kind} from LLM ({error}), asking for a repair")
+            repair_prompt = self._build_repair_prompt(prompt, response.text, error)
+            response = await self._call_llm(repair_prompt, task, output_model, profile)
+            error = validation_error(output_model, response.text)
+            output_validation.record_repair(kind, error is None)
+
+        return response
+
+    async def _call_llm(
+        self,
+        prompt: RenderedPrompt,
+        task: str,
+        output_model: Optional[Type[BaseModel]] = None,
+        profile: Optional[str] = None
+    ) -> LLMResult:
+        """Call the configured backend, coalescing identical in-flight prompts.
+
+        ``task`` picks the concurrency pool and budget; ``profile`` picks the
+        model settings and defaults to the task. Raises CircuitOpenError or
+        BudgetExceededError without calling out while the backend's circuit
+        breaker is open or the task's daily budget is used up.
+        """
+
+        profile = profile or task
+        if self.use_local and self.local_router:
+            if profile == "classify" and classification_batcher is not None:
+                call = lambda: self._call_batched(prompt)
+            else:
+                call = lambda: self._call_local_llm(prompt, profile, output_model, llm_limiters[task])
+        else:
+            call = lambda: self._call_openai(prompt, profile, output_model)
+
+        async def limited_call():
+            started = time.perf_counter()
+            try:
+                llm_budget.reserve(task)
+                try:
+                    async with llm_limiters[task].slot():
+                        async with self._breaker_guard():
+                            started = time.perf_counter()
+                            result = await call()
+                except BaseException:
+                    llm_budget.release(task)
+                    raise
+            except Exception as e:
+                self._record_failure(prompt, task, profile, e, started)
+                raise
+            self._record_usage(prompt, result, started, task)
+            return result
+
+        if not settings.enable_request_coalescing:
+            return await limited_call()
+
+        # Collapsed callers share the leader's slot instead of taking their own
+        key = hashlib.sha256(
+            f"{self._model_name(profile)}\n{prompt.system}\n{prompt.user}".encode("utf-8")
+        ).hexdigest()
+        return await llm_singleflight.do(key, limited_call)
+
+    def _record_usage(self, prompt: RenderedPrompt, result: LLMResult, started: float, task: str):
+        """Record a completed call's tokens and latency, estimating unreported usage.
+
+        Feeds the per-prompt metrics, the task's daily budget and the call log.
+        """
+        latency_ms = (time.perf_counter() - started) * 1000
+        estimated = result.prompt_tokens is None or result.completion_tokens is None
+        prompt_tokens = result.prompt_tokens
+        if prompt_tokens is None:
+            prompt_tokens = count_tokens(f"{prompt.system}\n\n{prompt.user}", result.model)
+        completion_tokens = result.completion_tokens
+        if completion_tokens is None:
+            completion_tokens = count_tokens(result.text, result.model)
+        prompt_metrics.record(
+            f"{prompt.key}@{result.model}", prompt_tokens, completion_tokens, latency_ms, estimated
+        )
+        llm_budget.charge(task, prompt_tokens + completion_tokens)
+        llm_call_log.record(
+            task, self.backend_name, result.model, prompt.key, "success",
+            latency_ms=latency_ms,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            tokens_estimated=estimated
+        )
+
+    def _record_failure(self, prompt: RenderedPrompt, task: str, profile: str, error: Exception, started: float):
+        """Log a call that did not produce a response, and why."""
+        if isinstance(error, BudgetExceededError):
+            outcome = "budget_exceeded"
+        elif isinstance(error, CircuitOpenError):
+            outcome = "circuit_open"
+        elif isinstance(error, LLMOverloadedError):
+            outcome = "overloaded"
+        else:
+            outcome = "error"
+        llm_call_log.record(
+            task, self.backend_name, self._model_name(profile), prompt.key, outcome,
+            latency_ms=(time.perf_counter() - started) * 1000
+        )
+
+    async def _call_openai(
+        self,
+        prompt: RenderedPrompt,
+        profile: str,
+        output_model: Optional[Type[BaseModel]] = None
+    ) -> LLMResult:
         """Call OpenAI API."""
+        task_settings = self._task_settings(profile)
+        extra = {}
+        response_format = openai_response_format(output_model) if output_model is not None else None
+        if response_format:
+            extra["response_format"] = response_format
         try:
-            response = await aclient.chat.completions.create(
-                model=settings.openai_model,
+            response = await llm_clients.openai.chat.completions.create(
+                model=task_settings["model"],
                 messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a legal classification expert. You must respond with valid JSON only. Do not include any text outside the JSON response."
-                    },
-                    {"role": "user", "content": prompt}
+                    {"role": "system", "content": prompt.system},
+                    {"role": "user", "content": prompt.user}
                 ],
-                max_tokens=settings.openai_max_tokens,
-                temperature=0.1  # Lower temperature for more consistent classification
+                max_tokens=task_settings["max_tokens"],
+                temperature=task_settings["temperature"],
+                **extra
+            )
+            usage = response.usage
+            return LLMResult(
+                response.choices[0].message.content,
+                response.model or task_settings["model"],
+                usage.prompt_tokens if usage else None,
+                usage.completion_tokens if usage else None
             )
-            return response.choices[0].message.content
         except Exception as e:
             raise Exception(f"OpenAI API error: {str(e)}")
 
-    async def _call_local_llm(self, prompt: str) -> str:
-        """Call local LLM endpoint."""
+    async def _call_local_llm(
+        self,
+        prompt: RenderedPrompt,
+        profile: str,
+        output_model: Optional[Type[BaseModel]] = None,
+        limiter: Optional[ConcurrencyLimiter] = None
+    ) -> LLMResult:
+        """Call the best local LLM replica (hedged when enabled, within ``limiter``)."""
+        return await self.local_router.call(
+            lambda url: self._post_local_llm(url, prompt, profile, output_model), limiter
+        )
+
+    async def _post_local_llm(
+        self,
+        url: str,
+        prompt: RenderedPrompt,
+        profile: str,
+        output_model: Optional[Type[BaseModel]] = None
+    ) -> LLMResult:
+        """Call one local LLM endpoint."""
+        payload = self._local_payload(prompt, profile, output_model)
+        try:
+            response = await llm_clients.local.post(url, json=payload)
+            response.raise_for_status()
+            data = response.json()
+            # Token counts if the server reports them (top level or OpenAI-style "usage")
+            usage = data.get("usage") or data
+            return LLMResult(
+                data.get("response", ""),
+                data.get("model") or self._model_name(profile),
+                usage.get("prompt_tokens"),
+                usage.get("completion_tokens")
+            )
+        except Exception as e:
+            raise Exception(f"Local LLM error: {str(e)}")
+
+    async def _call_batched(self, prompt: RenderedPrompt) -> LLMResult:
+        """Send a classification prompt through the local micro-batcher."""
+        return LLMResult(await classification_batcher.submit(prompt.as_text()), self._model_name("classify"))
+
+    def _local_payload(
+        self,
+        prompt: RenderedPrompt,
+        profile: str,
+        output_model: Optional[Type[BaseModel]] = None
+    ) -> Dict[str, Any]:
+        """Request body for a local LLM endpoint."""
+        task_settings = self._task_settings(profile)
+        payload = {
+            "prompt": prompt.as_text(),
+            "max_tokens": task_settings["max_tokens"],
+            "temperature": task_settings["temperature"]
+        }
+        if task_settings["model"]:
+            payload["model"] = task_settings["model"]
+        json_schema = local_schema_param(output_model) if output_model is not None else None
+        if json_schema:
+            payload["json_schema"] = json_schema
+        return payload
+
+    async def _stream_openai(
+        self,
+        prompt: RenderedPrompt,
+        output_model: Optional[Type[BaseModel]] = None,
+        reported: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream completion text from the OpenAI API.
+
+        The model named in the chunks is stored under ``reported["model"]``.
+        """
+        task_settings = self._task_settings("advice")
+        extra = {}
+        response_format = openai_response_format(output_model) if output_model is not None else None
+        if response_format:
+            extra["response_format"] = response_format
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.local_url,
-                    json={
-                        "prompt": prompt,
-                        "max_tokens": settings.openai_max_tokens,
-                        "temperature": 0.1
-                    },
-                    timeout=30.0
-                )
+            stream = await llm_clients.openai.chat.completions.create(
+                model=task_settings["model"],
+                messages=[
+                    {"role": "system", "content": prompt.system},
+                    {"role": "user", "content": prompt.user}
+                ],
+                max_tokens=task_settings["max_tokens"],
+                temperature=task_settings["temperature"],
+                stream=True,
+                **extra
+            )
+            async for chunk in stream:
+                if reported is not None and getattr(chunk, "model", None):
+                    reported["model"] = chunk.model
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise Exception(f"OpenAI API error: {str(e)}")
+
+    async def _stream_local_llm(
+        self,
+        prompt: RenderedPrompt,
+        output_model: Optional[Type[BaseModel]] = None,
+        reported: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Stream completion text from a local LLM endpoint.
+
+        Expects newline-delimited JSON objects with a ``response`` field
+        (optionally prefixed with ``data:``); a server that ignores the
+        ``stream`` flag and returns a single JSON body also works. A
+        ``model`` field is stored under ``reported["model"]``.
+        """
+        payload = self._local_payload(prompt, "advice", output_model)
+        payload["stream"] = True
+
+        backend = self.local_router.pick()
+        try:
+            # Streams are not hedged and their duration says little about
+            # queueing, so they only count towards the replica's load
+            async with self.local_router.track(backend, record_latency=False), llm_clients.local.stream(
+                "POST",
+                backend.url,
+                json=payload
+            ) as response:
                 response.raise_for_status()
-                return response.json().get("response", "")
+                async for line in response.aiter_lines():
+                    line = line.strip()
+                    if line.startswith("data:"):
+                        line = line[len("data:"):].strip()
+                    if not line or line == "[DONE]":
+                        continue
+                    data = json.loads(line)
+                    if reported is not None and data.get("model"):
+                        reported["model"] = data["model"]
+                    if data.get("response"):
+                        yield data["response"]
+                    if data.get("done"):
+                        break
         except Exception as e:
             raise Exception(f"Local LLM error: {str(e)}")
 
+    def _build_repair_prompt(self, prompt: RenderedPrompt, response: str, error: str) -> RenderedPrompt:
+        """Ask the model to fix a response that failed validation."""
+
+        return RenderedPrompt(f"{prompt.key}+repair", prompt.system, f"""{prompt.user}
+Your previous response was not valid:
+{response}
+
+Problems: {error}
+
+Respond again with ONLY the corrected JSON in the format above (no additional text).
+""")
+
     def _build_advice_prompt(
         self, 
         description: str, 
         category: str, 
         location: Optional[str] = None,
         additional_context: Optional[str] = None
-    ) -> str:
+    ) -> RenderedPrompt:
         """Build prompt for legal advice generation."""
-
-        location_text = f" in {location}" if location else ""
-        context_text = f"\n\nAdditional context: {additional_context}" if additional_context else ""
-
-        prompt = f"""
-You are a legal aid assistant helping someone with a {category} issue{location_text}. 
-
-Issue description: {description}{context_text}
-
-Please provide helpful guidance in the following JSON format:
-{{
-    "advice": "Detailed advice and explanation of the situation",
-    "next_steps": ["Step 1", "Step 2", "Step 3"],
-    "relevant_laws": ["Law or regulation 1", "Law or regulation 2"],
-    "confidence": 0.85,
-    "disclaimers": ["This is not legal advice", "Consult with a qualified attorney"]
-}}
-
-Focus on:
-1. Explaining the person's rights and options
-2. Providing practical next steps they can take
-3. Mentioning relevant laws or regulations
-4. Being empathetic and supportive
-5. Always including appropriate disclaimers
-
-Remember: This is general information only, not legal advice. The person should consult with a qualified attorney for their specific situation.
-"""
-        return prompt
-
-    def _build_classification_prompt(self, description: str, location: Optional[str] = None) -> str:
+        return get_prompt("advice").render(
+            description=description,
+            category=category,
+            location=location,
+            additional_context=additional_context
+        )
+
+    def _build_classification_prompt(self, description: str, location: Optional[str] = None) -> RenderedPrompt:
         """Build prompt for legal domain classification."""
+        return get_prompt("classify").render(description=description, location=location)
 
-        location_text = f" in {location}" if location else ""
+    def _build_combined_prompt(self, description: str, location: Optional[str] = None) -> RenderedPrompt:
+        """Build one prompt asking for both the classification and the advice."""
+        return get_prompt("combined").render(description=description, location=location)
 
-        prompt = f"""You are a legal classification expert. Analyze this legal issue{location_text} and classify it into the most appropriate category.
-
-Issue description: {description}
-
-IMPORTANT: You must choose from one of these exact categories:
-- tenant_rights: Landlord-tenant disputes, evictions, housing conditions, rent issues, lease problems, security deposits, repairs, habitability
-- consumer_protection: Fraud, scams, unfair business practices, defective products, billing disputes, warranty issues, identity theft
-- employment: Workplace discrimination, harassment, wrongful termination, wage theft, workplace safety, labor violations, FMLA
-- family_law: Divorce, child custody, child support, domestic violence, adoption, paternity, marriage, separation
-- immigration: Immigration status, deportation, asylum, visas, green cards, citizenship, work permits, family reunification
-- criminal: Criminal charges, arrest, bail, plea bargains, expungement, criminal defense, probation, parole
-- civil_rights: Discrimination based on race/gender/religion/disability, police misconduct, voting rights, accessibility
-- debt_collection: Debt disputes, bankruptcy, creditor harassment, wage garnishment, foreclosure, debt validation
-- housing: Housing discrimination, fair housing violations, accessibility issues, public housing, Section 8
-- healthcare: Medical bills, insurance disputes, patient rights, HIPAA violations, medical malpractice, insurance denials
-- other: Only use this if the issue truly doesn't fit any of the above categories
-
-Classification Guidelines:
-- If it involves a landlord and tenant relationship, use "tenant_rights"
-- If it involves workplace issues, use "employment"
-- If it involves buying/selling goods or services, use "consumer_protection"
-- If it involves family relationships, use "family_law"
-- If it involves immigration status, use "immigration"
-- If it involves criminal charges, use "criminal"
-- If it involves discrimination, use "civil_rights"
-- If it involves debt or money owed, use "debt_collection"
-- If it involves housing discrimination, use "housing"
-- If it involves medical/health insurance, use "healthcare"
-
-Respond with ONLY this JSON format (no additional text):
-{{
-    "category": "exact_category_name",
-    "confidence": 0.85,
-    "urgency": "low",
-    "complexity": "moderate",
-    "reasoning": "Brief explanation of why this category was chosen"
-}}
-
-Urgency levels: low, medium, high
-Complexity levels: simple, moderate, complex
-"""
-        return prompt
-
-    def _parse_advice_response(self, response: str) -> Dict[str, Any]:
+    def _parse_advice_response(self, response: str, model_used: Optional[str] = None) -> Dict[str, Any]:
         """Parse and validate advice response."""
+        model_used = model_used or self._model_name("advice")
         try:
             # Try to extract JSON from response
             start_idx = response.find('{')
@@ -211,7 +714,7 @@ Complexity levels: simple, moderate, complex
                     "next_steps": data.get("next_steps", []),
                     "relevant_laws": data.get("relevant_laws", []),
                     "confidence": float(data.get("confidence", 0.5)),
-                    "model_used": settings.openai_model if not self.use_local else "local_llm"
+                    "model_used": model_used
                 }
             else:
                 # Fallback if JSON parsing fails
@@ -220,7 +723,7 @@ Complexity levels: simple, moderate, complex
                     "next_steps": ["Contact a local legal aid organization"],
                     "relevant_laws": [],
                     "confidence": 0.5,
-                    "model_used": settings.openai_model if not self.use_local else "local_llm"
+                    "model_used": model_used
                 }
         except Exception:
             return {
@@ -228,7 +731,7 @@ Complexity levels: simple, moderate, complex
                 "next_steps": ["Contact a local legal aid organization"],
                 "relevant_laws": [],
                 "confidence": 0.3,
-                "model_used": settings.openai_model if not self.use_local else "local_llm"
+                "model_used": model_used
             }
 
     def _parse_classification_response(self, response: str) -> Dict[str, Any]:
@@ -303,4 +806,32 @@ Complexity levels: simple, moderate, complex
                 "urgency": "medium",
                 "complexity": "moderate",
                 "reasoning": f"Classification error: {str(e)}"
-            }
\ No newline at end of file
+            }
+
+    def _parse_combined_response(self, response: str, model_used: Optional[str] = None) -> Dict[str, Any]:
+        """Split a combined response and validate each half with the single-task parsers."""
+        try:
+            start_idx = response.find('{')
+            end_idx = response.rfind('}') + 1
+            data = json.loads(response[start_idx:end_idx]) if start_idx != -1 and end_idx != 0 else None
+        except json.JSONDecodeError:
+            data = None
+
+        if not isinstance(data, dict):
+            return {
+                "classification": self._parse_classification_response(response),
+                "advice": self._parse_advice_response(response, model_used)
+            }
+
+        # Tolerate models that flatten both halves into one object
+        classification = data.get("classification")
+        advice = data.get("advice")
+        if not isinstance(classification, dict):
+            classification = data
+        if not isinstance(advice, dict):
+            advice = data
+
+        return {
+            "classification": self._parse_classification_response(json.dumps(classification)),
+            "advice": self._parse_advice_response(json.dumps(advice), model_used)
+        }
@@ -0,0 +1,352 @@
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from io import BytesIO
+from typing import Any, Dict, Optional
+import asyncio
+import math
+import os
+import time
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
+
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+
+# Part of every stored PDF's content hash; bump when build_pdf or the styles
+# change how the same content is laid out
+LAYOUT_VERSION = "1"
+
+
+def build_styles() -> StyleSheet1:
+    """Paragraph styles for legal documents."""
+    styles = getSampleStyleSheet()
+
+    # Header style
+    styles.add(ParagraphStyle(
+        name='LegalHeader',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=20,
+        alignment=TA_CENTER,
+        textColor=colors.black
+    ))
+
+    # Subheader style
+    styles.add(ParagraphStyle(
+        name='LegalSubHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12,
+        spaceBefore=12,
+        alignment=TA_LEFT,
+        textColor=colors.black
+    ))
+
+    # Body text style
+    styles.add(ParagraphStyle(
+        name='LegalBody',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=6,
+        alignment=TA_JUSTIFY,
+        leftIndent=0,
+        rightIndent=0
+    ))
+
+    # Signature style
+    styles.add(ParagraphStyle(
+        name='Signature',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=6,
+        alignment=TA_LEFT,
+        leftIndent=0
+    ))
+
+    # Date style
+    styles.add(ParagraphStyle(
+        name='DateStyle',
+        parent=styles['Normal'],
+        fontSize=11,
+        alignment=TA_RIGHT,
+        spaceAfter=12
+    ))
+
+    return styles
+
+
+def build_pdf(
+    content: str,
+    file_path,
+    document_title: str,
+    styles: StyleSheet1,
+    document_date: Optional[str] = None
+):
+    """Lay out rendered template content and write it as a PDF.
+
+    ``file_path`` may also be a file-like object. ``document_date`` is
+    printed under the title and defaults to today.
+    """
+    # Create PDF document
+    doc = SimpleDocTemplate(
+        file_path,
+        pagesize=letter,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=18
+    )
+
+    # Build document content
+    story = []
+
+    # Add title
+    title = Paragraph(document_title, styles['LegalHeader'])
+    story.append(title)
+    story.append(Spacer(1, 12))
+
+    # Add date
+    date_text = f"Date: {document_date or datetime.now().strftime('%B %d, %Y')}"
+    date_para = Paragraph(date_text, styles['DateStyle'])
+    story.append(date_para)
+    story.append(Spacer(1, 12))
+
+    # Process content sections
+    sections = content.split('\n\n')
+    for section in sections:
+        if section.strip():
+            # Check if section is a header (starts with #)
+            if section.strip().startswith('#'):
+                header_text = section.strip().lstrip('#').strip()
+                header_para = Paragraph(header_text, styles['LegalSubHeader'])
+                story.append(header_para)
+            else:
+                # Regular paragraph
+                para = Paragraph(section.strip(), styles['LegalBody'])
+                story.append(para)
+                story.append(Spacer(1, 6))
+
+    # Add signature section
+    story.append(Spacer(1, 24))
+    signature_lines = [
+        "Sincerely,",
+        "",
+        "",
+        "_" * 30,
+        "[Your Name]",
+        "[Your Title/Relationship]"
+    ]
+
+    for line in signature_lines:
+        sig_para = Paragraph(line, styles['Signature'])
+        story.append(sig_para)
+        if line == "":
+            story.append(Spacer(1, 12))
+
+    # Build PDF
+    doc.build(story)
+
+
+# Built once per worker process (or once per process when rendering in threads)
+_styles: Optional[StyleSheet1] = None
+
+
+def _worker_styles() -> StyleSheet1:
+    global _styles
+    if _styles is None:
+        _styles = build_styles()
+    return _styles
+
+
+def _init_worker():
+    """Worker initializer: build the styles and load the standard font metrics once."""
+    build_pdf("Warm-up", BytesIO(), "Warm-up", _worker_styles())
+
+
+def _warm_up() -> None:
+    """No-op task; submitting one per worker makes the pool start them all."""
+
+
+def _render(content: str, file_path: str, document_title: str, document_date: Optional[str]) -> float:
+    """Write one PDF; returns the layout and write time in milliseconds."""
+    started = time.perf_counter()
+    build_pdf(content, file_path, document_title, _worker_styles(), document_date)
+    return (time.perf_counter() - started) * 1000
+
+
+def _remove_file(file_path: str):
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error removing abandoned PDF {file_path}: {str(e)}")
+
+
+class PDFRenderUnavailableError(Exception):
+    """Raised when a PDF cannot be rendered in time (queue full, timeout or crashed worker)."""
+
+    def __init__(self, retry_after: int, reason: str):
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"PDF rendering unavailable ({reason}); retry after {retry_after}s")
+
+
+class PDFRenderPool:
+    """Renders PDFs in a bounded pool of worker processes.
+
+    ReportLab layout is CPU-bound and would block the event loop, so each
+    PDF is built in one of ``workers`` processes. Workers are started and
+    warmed up (styles built, font metrics loaded) when the pool starts.
+    At most ``workers`` renders run at once. Up to ``max_queue`` more wait
+    for a worker, and a render that has not finished within ``timeout``
+    seconds of being submitted raises PDFRenderUnavailableError, as does
+    a full queue. With ``workers`` 0, PDFs are rendered in a thread of
+    this process instead; that keeps the event loop free but shares the GIL.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float):
+        self.workers = max(0, workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._active = 0
+        self._queued = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.restarts = 0
+        self.queue_wait = LatencyStats()
+        self.render_time = LatencyStats()
+        self.total_time = LatencyStats()
+
+    def start(self):
+        """Start and warm up the worker processes; call from the application lifespan."""
+        self._slots = asyncio.Semaphore(max(1, self.workers))
+        if self.workers and self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+            wait([self._executor.submit(_warm_up) for _ in range(self.workers)])
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        # A crashed worker breaks the whole executor; replace it for later renders
+        if self._executor is broken:
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.restarts += 1
+
+    async def render(
+        self,
+        content: str,
+        file_path: str,
+        document_title: str,
+        document_date: Optional[str] = None
+    ) -> float:
+        """Render one PDF to ``file_path``; returns the render time in milliseconds.
+
+        A render the caller stops waiting for (timeout or cancellation)
+        keeps its worker until it ends, and then ``file_path`` is removed.
+        """
+        started = time.perf_counter()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.workers))
+        if self._slots.locked() and self._queued >= self.max_queue:
+            self.rejected += 1
+            raise PDFRenderUnavailableError(self.retry_after(), "queue full")
+
+        self._queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queued)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise PDFRenderUnavailableError(self.retry_after(), "queue wait timeout")
+        finally:
+            self._queued -= 1
+        self.queue_wait.record((time.perf_counter() - started) * 1000)
+
+        self._active += 1
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        if self.workers and executor is not None:
+            future = loop.run_in_executor(executor, _render, content, file_path, document_title, document_date)
+        else:
+            future = asyncio.ensure_future(
+                asyncio.to_thread(_render, content, file_path, document_title, document_date)
+            )
+        # The slot is held until the render really ends, even if the caller stops waiting
+        future.add_done_callback(self._render_done)
+
+        remaining = max(0.0, self.timeout - (time.perf_counter() - started))
+        try:
+            render_ms = await asyncio.wait_for(asyncio.shield(future), remaining)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            # Nobody will use the file; removing it now would race the worker still writing it
+            future.add_done_callback(lambda _: _remove_file(file_path))
+            raise PDFRenderUnavailableError(self.retry_after(), "render timeout")
+        except asyncio.CancelledError:
+            future.add_done_callback(lambda _: _remove_file(file_path))
+            raise
+        except BrokenProcessPool:
+            self.failed += 1
+            self._restart(executor)
+            raise PDFRenderUnavailableError(self.retry_after(), "worker crashed")
+        except Exception:
+            self.failed += 1
+            raise
+
+        self.completed += 1
+        self.render_time.record(render_ms)
+        self.total_time.record((time.perf_counter() - started) * 1000)
+        return render_ms
+
+    def _render_done(self, future: asyncio.Future):
+        self._active -= 1
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()  # retrieved here so abandoned failures are not logged as unhandled
+
+    def retry_after(self) -> int:
+        """Seconds a rejected caller should wait, from the backlog and mean render time."""
+        mean_render = self.render_time.snapshot()["mean_ms"] / 1000.0 or 1.0
+        backlog = (self._queued + self._active) / max(1, self.workers)
+        return max(1, math.ceil(backlog * mean_render))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "process" if self.workers else "thread",
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "restarts": self.restarts,
+            "queue_wait": self.queue_wait.snapshot(),
+            "render_time": self.render_time.snapshot(),
+            "total_time": self.total_time.snapshot()
+        }
+
+
+# Started in the application lifespan
+pdf_render_pool = PDFRenderPool(
+    settings.pdf_render_workers,
+    settings.pdf_render_max_queue,
+    settings.pdf_render_timeout
+)
@@ -0,0 +1,329 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+import math
+
+from app.core.config import settings
+from app.core.metrics import LatencyStats
+
+# Category glossary sent with every classification prompt. Also used to seed
+# the local fast-path classifier, so keep the two in sync by editing it here.
+CATEGORY_GLOSSARY = {
+    "tenant_rights": "Landlord-tenant disputes, evictions, housing conditions, rent issues, lease problems, security deposits, repairs, habitability",
+    "consumer_protection": "Fraud, scams, unfair business practices, defective products, billing disputes, warranty issues, identity theft",
+    "employment": "Workplace discrimination, harassment, wrongful termination, wage theft, workplace safety, labor violations, FMLA",
+    "family_law": "Divorce, child custody, child support, domestic violence, adoption, paternity, marriage, separation",
+    "immigration": "Immigration status, deportation, asylum, visas, green cards, citizenship, work permits, family reunification",
+    "criminal": "Criminal charges, arrest, bail, plea bargains, expungement, criminal defense, probation, parole",
+    "civil_rights": "Discrimination based on race/gender/religion/disability, police misconduct, voting rights, accessibility",
+    "debt_collection": "Debt disputes, bankruptcy, creditor harassment, wage garnishment, foreclosure, debt validation",
+    "housing": "Housing discrimination, fair housing violations, accessibility issues, public housing, Section 8",
+    "healthcare": "Medical bills, insurance disputes, patient rights, HIPAA violations, medical malpractice, insurance denials",
+    "other": "Only use this if the issue truly doesn't fit any of the above categories"
+}
+
+CLASSIFICATION_GUIDELINES = {
+    "tenant_rights": "a landlord and tenant relationship",
+    "employment": "workplace issues",
+    "consumer_protection": "buying/selling goods or services",
+    "family_law": "family relationships",
+    "immigration": "immigration status",
+    "criminal": "criminal charges",
+    "civil_rights": "discrimination",
+    "debt_collection": "debt or money owed",
+    "housing": "housing discrimination",
+    "healthcare": "medical/health insurance"
+}
+
+CLASSIFICATION_SYSTEM = "You are a legal classification expert. You must respond with valid JSON only. Do not include any text outside the JSON response."
+
+ADVICE_SYSTEM = "You are a legal aid assistant who explains people's rights and options in plain language. You must respond with valid JSON only. Do not include any text outside the JSON response."
+
+_GLOSSARY_TEXT = "\n".join(f"- {name}: {text}" for name, text in CATEGORY_GLOSSARY.items())
+_GUIDELINES_TEXT = "\n".join(
+    f'- If it involves {text}, use "{name}"' for name, text in CLASSIFICATION_GUIDELINES.items()
+)
+
+_CLASSIFICATION_FORMAT = """{
+    "category": "exact_category_name",
+    "confidence": 0.85,
+    "urgency": "low",
+    "complexity": "moderate",
+    "reasoning": "Brief explanation of why this category was chosen"
+}"""
+
+_ADVICE_FORMAT = """{
+    "advice": "Detailed advice and explanation of the situation",
+    "next_steps": ["Step 1", "Step 2", "Step 3"],
+    "relevant_laws": ["Law or regulation 1", "Law or regulation 2"],
+    "confidence": 0.85,
+    "disclaimers": ["This is not legal advice", "Consult with a qualified attorney"]
+}"""
+
+_ADVICE_FOCUS = """Focus on:
+1. Explaining the person's rights and options
+2. Providing practical next steps they can take
+3. Mentioning relevant laws or regulations
+4. Being empathetic and supportive
+5. Always including appropriate disclaimers
+
+Remember: This is general information only, not legal advice. The person should consult with a qualified attorney for their specific situation."""
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Number of tokens in ``text``; estimated from its length without tiktoken."""
+    encoding = _encoding(model or settings.openai_model)
+    if encoding is None:
+        # Roughly four characters per token for English text
+        return max(1, math.ceil(len(text) / 4))
+    return len(encoding.encode(text))
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # tiktoken downloads its tables on first use; fall back when offline
+        print(f"tiktoken unavailable ({str(e)}), estimating token counts")
+        return None
+
+
+class RenderedPrompt:
+    """A prompt ready to send: a system message and a user message."""
+
+    def __init__(self, key: str, system: str, user: str):
+        self.key = key
+        self.system = system
+        self.user = user
+
+    def as_text(self) -> str:
+        """Single prompt string for completion-style local LLM servers."""
+        return f"{self.system}\n\n{self.user}"
+
+
+class PromptTemplate:
+    """One version of a prompt.
+
+    ``static_prefix`` is identical for every call and comes first, so
+    provider-side prompt caching can reuse it; ``render_suffix`` adds the
+    per-request part (issue description, location, ...).
+    """
+
+    def __init__(self, name: str, version: str, system: str, static_prefix: str, render_suffix: Callable[..., str]):
+        self.name = name
+        self.version = version
+        self.system = system
+        self.static_prefix = static_prefix
+        self.render_suffix = render_suffix
+        self.key = f"{name}/{version}"
+
+    def render(self, **kwargs) -> RenderedPrompt:
+        return RenderedPrompt(self.key, self.system, self.static_prefix + self.render_suffix(**kwargs))
+
+    def static_tokens(self) -> int:
+        """Tokens in the part of the prompt that is the same on every call."""
+        return count_tokens(f"{self.system}\n\n{self.static_prefix}")
+
+
+@lru_cache(maxsize=None)
+def _category_context(category: str) -> str:
+    """Compact description of a category for advice prompts."""
+    # Imported here: legal_analyzer imports llm_service, which imports this module
+    from app.services.legal_analyzer import LegalAnalyzer
+
+    template = LegalAnalyzer._load_category_templates().get(category)
+    if not template:
+        return f"Category: {category.replace('_', ' ')}\n"
+    return (
+        f"Category: {category.replace('_', ' ')} ({template['description']})\n"
+        f"Key laws: {', '.join(template['key_laws'])}\n"
+        f"Common issues: {', '.join(template['common_issues'])}\n"
+        f"Urgency factors: {', '.join(template['urgency_factors'])}\n"
+    )
+
+
+def _issue_text(description: str, location: Optional[str] = None, additional_context: Optional[str] = None) -> str:
+    text = f"Location: {location}\n" if location else ""
+    text += f"Issue description: {description}\n"
+    if additional_context:
+        text += f"Additional context: {additional_context}\n"
+    return text
+
+
+# classify/v1: the original prompt, with the issue description near the top
+def _classify_v1(description: str, location: Optional[str] = None) -> str:
+    location_text = f" in {location}" if location else ""
+    return f"""You are a legal classification expert. Analyze this legal issue{location_text} and classify it into the most appropriate category.
+
+Issue description: {description}
+
+IMPORTANT: You must choose from one of these exact categories:
+{_GLOSSARY_TEXT}
+
+Classification Guidelines:
+{_GUIDELINES_TEXT}
+
+Respond with ONLY this JSON format (no additional text):
+{_CLASSIFICATION_FORMAT}
+
+Urgency levels: low, medium, high
+Complexity levels: simple, moderate, complex
+"""
+
+
+# advice/v1: the original generic advice prompt
+def _advice_v1(
+    description: str,
+    category: str,
+    location: Optional[str] = None,
+    additional_context: Optional[str] = None
+) -> str:
+    location_text = f" in {location}" if location else ""
+    context_text = f"\n\nAdditional context: {additional_context}" if additional_context else ""
+    return f"""
+You are a legal aid assistant helping someone with a {category} issue{location_text}. 
+
+Issue description: {description}{context_text}
+
+Please provide helpful guidance in the following JSON format:
+{_ADVICE_FORMAT}
+
+{_ADVICE_FOCUS}
+"""
+
+
+_CLASSIFY_V2_PREFIX = f"""Classify the legal issue below into the most appropriate category.
+
+You must choose from one of these exact categories:
+{_GLOSSARY_TEXT}
+
+Classification Guidelines:
+{_GUIDELINES_TEXT}
+
+Respond with ONLY this JSON format (no additional text):
+{_CLASSIFICATION_FORMAT}
+
+Urgency levels: low, medium, high
+Complexity levels: simple, moderate, complex
+
+"""
+
+_ADVICE_V2_PREFIX = f"""Provide helpful guidance for the legal issue below in the following JSON format:
+{_ADVICE_FORMAT}
+
+{_ADVICE_FOCUS}
+
+"""
+
+_COMBINED_V1_PREFIX = f"""Classify the legal issue below into the most appropriate category, then provide helpful guidance for it.
+
+You must choose the category from one of these exact categories:
+{_GLOSSARY_TEXT}
+
+Classification Guidelines:
+{_GUIDELINES_TEXT}
+
+Respond with ONLY this JSON format (no additional text):
+{{
+    "classification": {_CLASSIFICATION_FORMAT.replace(chr(10), chr(10) + "    ")},
+    "advice": {_ADVICE_FORMAT.replace(chr(10), chr(10) + "    ")}
+}}
+
+Urgency levels: low, medium, high
+Complexity levels: simple, moderate, complex
+
+In the advice, {_ADVICE_FOCUS[0].lower()}{_ADVICE_FOCUS[1:]}
+
+"""
+
+# Register a new version whenever a prompt changes; cached classifications
+# are keyed by the prompt version, so old results are not reused.
+PROMPT_REGISTRY: Dict[str, Dict[str, PromptTemplate]] = {}
+
+
+def register_prompt(template: PromptTemplate):
+    PROMPT_REGISTRY.setdefault(template.name, {})[template.version] = template
+
+
+register_prompt(PromptTemplate("classify", "v1", CLASSIFICATION_SYSTEM, "", _classify_v1))
+register_prompt(PromptTemplate(
+    "classify", "v2", CLASSIFICATION_SYSTEM, _CLASSIFY_V2_PREFIX,
+    lambda description, location=None: _issue_text(description, location)
+))
+# v1 kept the "classification expert" system prompt the original code sent for advice too
+register_prompt(PromptTemplate("advice", "v1", CLASSIFICATION_SYSTEM, "", _advice_v1))
+register_prompt(PromptTemplate(
+    "advice", "v2", ADVICE_SYSTEM, _ADVICE_V2_PREFIX,
+    lambda description, category, location=None, additional_context=None: (
+        _category_context(category) + _issue_text(description, location, additional_context)
+    )
+))
+register_prompt(PromptTemplate(
+    "combined", "v1", ADVICE_SYSTEM, _COMBINED_V1_PREFIX,
+    lambda description, location=None: _issue_text(description, location)
+))
+
+
+def get_prompt(name: str) -> PromptTemplate:
+    """The configured version of a prompt, or its newest version."""
+    versions = PROMPT_REGISTRY[name]
+    configured = {
+        "classify": settings.classify_prompt_version,
+        "advice": settings.advice_prompt_version,
+        "combined": settings.combined_prompt_version
+    }.get(name)
+    if configured in versions:
+        return versions[configured]
+    if configured:
+        print(f"Unknown {name} prompt version '{configured}', using the newest")
+    return versions[max(versions, key=lambda version: int(version.lstrip("v")))]
+
+
+class PromptMetrics:
+    """Token usage and latency per prompt version and model, to compare cost and speed."""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, key: str, prompt_tokens: int, completion_tokens: int, latency_ms: float, estimated: bool):
+        stats = self._stats.setdefault(key, {
+            "calls": 0,
+            "estimated_calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "latency": LatencyStats()
+        })
+        stats["calls"] += 1
+        stats["estimated_calls"] += int(estimated)
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        stats["latency"].record(latency_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        result = {}
+        for key, stats in sorted(self._stats.items()):
+            # Keys look like "classify/v2+repair@gpt-4o-mini"
+            name, _, version = key.split("@")[0].partition("/")
+            template = PROMPT_REGISTRY.get(name, {}).get(version.split("+")[0])
+            result[key] = {
+                "calls": stats["calls"],
+                "estimated_calls": stats["estimated_calls"],
+                "static_prefix_tokens": template.static_tokens() if template else None,
+                "prompt_tokens": stats["prompt_tokens"],
+                "completion_tokens": stats["completion_tokens"],
+                "avg_prompt_tokens": round(stats["prompt_tokens"] / stats["calls"], 1),
+                "avg_completion_tokens": round(stats["completion_tokens"] / stats["calls"], 1),
+                "latency": stats["latency"].snapshot()
+            }
+        return result
+
+
+# Shared by every LLMService instance
+prompt_metrics = PromptMetrics()
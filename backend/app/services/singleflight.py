@@ -0,0 +1,68 @@
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+
+
+class _InFlightCall:
+    """A shared upstream call and the number of callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task. Results and exceptions are delivered
+    to every waiter. A cancelled caller only stops waiting; the shared task is
+    cancelled once the last waiter has gone away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _InFlightCall] = {}
+        self.calls = 0
+        self.upstream_calls = 0
+        self.collapsed = 0
+        self.cancelled = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        call = self._calls.get(key)
+        if call is None:
+            call = _InFlightCall(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _task, key=key, call=call: self._forget(key, call))
+            self.upstream_calls += 1
+        else:
+            self.collapsed += 1
+
+        call.waiters += 1
+        try:
+            # shield() keeps one caller's cancellation from cancelling the shared task
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Detach first so a caller arriving meanwhile starts a fresh call
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+                self.cancelled += 1
+
+    def _forget(self, key: str, call: _InFlightCall):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved when every waiter was cancelled
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.upstream_calls,
+            "collapsed": self.collapsed,
+            "cancelled": self.cancelled,
+            "in_flight": len(self._calls),
+            "collapse_rate": round(self.collapsed / self.calls, 4) if self.calls else 0.0
+        }
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Any
+import asyncio
+import time
+
+from app.core.config import settings
+from app.services.concurrency import llm_limiters, llm_priority, on_llm_admit, LLMOverloadedError
+from app.services.llm_service import LLMService
+
+
+class _SpeculativeEntry:
+    def __init__(self, expires_at: float):
+        self.task: Optional[asyncio.Task] = None
+        self.expires_at = expires_at
+        # Set once the generation holds an advice slot (it is no longer queued)
+        self.admitted = False
+
+    def mark_admitted(self):
+        self.admitted = True
+
+
+class SpeculativeAdviceStore:
+    """Advice generated in the background right after an issue is analyzed.
+
+    Most clients call /api/advice right after /api/analyze, so the analyze
+    handler can start advice generation early. Results live in memory only
+    until claimed; unclaimed entries expire after ``ttl`` seconds and the
+    store never holds more than ``max_entries`` (oldest are dropped, and
+    their generation cancelled if still running). Speculation is skipped
+    when the advice pool has no idle capacity, so it never queues ahead of
+    real requests.
+
+    Speculative calls run in the ``background`` lane. A request that
+    claims one still waiting in that queue cancels it and makes its own
+    call in its own lane, instead of inheriting background priority.
+    Generation uses the application's shared LLMService (see ``start``).
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.llm_service: Optional[LLMService] = None
+        self._entries: "OrderedDict[int, _SpeculativeEntry]" = OrderedDict()
+        self.scheduled = 0
+        self.preempted = 0
+        self.skipped = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def start(self, llm_service: LLMService):
+        """Generate with the application's shared LLMService (pooled clients, breakers, limiters)."""
+        self.llm_service = llm_service
+
+    def schedule(self, issue_id: int, description: str, category: str, location: Optional[str] = None):
+        """Start generating advice for an issue in the background."""
+        self._evict_expired()
+        limiter = llm_limiters["advice"]
+        if self.llm_service is None or issue_id in self._entries or not limiter.has_capacity():
+            self.skipped += 1
+            return
+
+        entry = _SpeculativeEntry(time.monotonic() + self.ttl)
+        entry.task = asyncio.ensure_future(self._generate(entry, description, category, location))
+        self._entries[issue_id] = entry
+        self.scheduled += 1
+
+        while len(self._entries) > self.max_entries:
+            _, oldest = self._entries.popitem(last=False)
+            oldest.task.cancel()
+            self.evicted += 1
+
+    async def claim(self, issue_id: int) -> Optional[Dict[str, Any]]:
+        """Take the precomputed advice for an issue, waiting if it is still running."""
+        self._evict_expired()
+        entry = self._entries.pop(issue_id, None)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        # Still queued in the background lane: the caller is better off
+        # making the call in its own lane than waiting behind other requests
+        if not entry.task.done() and not entry.admitted:
+            entry.task.cancel()
+            self.preempted += 1
+            self.misses += 1
+            return None
+
+        try:
+            advice = await entry.task
+        except (asyncio.CancelledError, Exception):
+            advice = None
+
+        # Fallbacks produced while the LLM was unavailable are worth retrying
+        if advice is None or advice.get("model_used") in ("error_fallback", "deterministic_fallback"):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return advice
+
+    async def shutdown(self):
+        for entry in self._entries.values():
+            entry.task.cancel()
+        self._entries.clear()
+
+    async def _generate(
+        self,
+        entry: _SpeculativeEntry,
+        description: str,
+        category: str,
+        location: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            # Queued behind every real request if the advice pool fills up meanwhile
+            with llm_priority("background"), on_llm_admit(entry.mark_admitted):
+                return await self.llm_service.generate_advice(description, category, location)
+        except LLMOverloadedError:
+            return None
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for issue_id in [i for i, entry in self._entries.items() if entry.expires_at <= now]:
+            self._entries.pop(issue_id).task.cancel()
+            self.expired += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        claims = self.hits + self.misses
+        return {
+            "enabled": settings.enable_speculative_advice,
+            "pending": len(self._entries),
+            "scheduled": self.scheduled,
+            "skipped": self.skipped,
+            "preempted": self.preempted,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "hit_rate": round(self.hits / claims, 4) if claims else 0.0
+        }
+
+
+# Global store shared by the analyze and advice handlers
+speculative_advice = SpeculativeAdviceStore(
+    settings.speculative_advice_ttl,
+    settings.speculative_advice_max_entries
+)
@@ -0,0 +1,109 @@
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+
+# Keywords OpenAI's strict json_schema mode rejects; range checks still
+# happen when the response is validated against the pydantic model.
+_UNSUPPORTED_SCHEMA_KEYS = {"minimum", "maximum", "title"}
+
+
+def schema_for(output_model: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON schema for an LLM output model, in the subset LLM backends accept."""
+
+    def strip(node):
+        if isinstance(node, dict):
+            return {
+                key: strip(value) for key, value in node.items()
+                # Keep properties that happen to be named like a keyword
+                if key not in _UNSUPPORTED_SCHEMA_KEYS or isinstance(value, dict)
+            }
+        if isinstance(node, list):
+            return [strip(item) for item in node]
+        return node
+
+    return strip(output_model.model_json_schema())
+
+
+def openai_response_format(output_model: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """``response_format`` argument for the configured structured-output mode."""
+    if settings.llm_structured_output == "json_object":
+        return {"type": "json_object"}
+    if settings.llm_structured_output == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": output_model.__name__,
+                "schema": schema_for(output_model),
+                "strict": True
+            }
+        }
+    return None
+
+
+def local_schema_param(output_model: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """``json_schema`` request field for local servers that constrain output with it."""
+    if settings.llm_structured_output in ("json_object", "json_schema"):
+        return schema_for(output_model)
+    return None
+
+
+def validation_error(output_model: Type[BaseModel], response: str) -> Optional[str]:
+    """Why a response does not match the output model, or None when it does."""
+    start_idx = response.find('{')
+    end_idx = response.rfind('}') + 1
+    if start_idx == -1 or end_idx == 0:
+        return "the response did not contain a JSON object"
+    try:
+        output_model.model_validate_json(response[start_idx:end_idx])
+    except ValidationError as e:
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'response'}: {error['msg']}"
+            for error in e.errors()
+        )
+    return None
+
+
+class OutputValidationStats:
+    """How often LLM output fails validation, per output kind, and how repairs fare."""
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def _kind(self, kind: str) -> Dict[str, int]:
+        return self._counts.setdefault(kind, {
+            "responses": 0,
+            "invalid": 0,
+            "repairs_attempted": 0,
+            "repairs_succeeded": 0
+        })
+
+    def record(self, kind: str, valid: bool):
+        counts = self._kind(kind)
+        counts["responses"] += 1
+        if not valid:
+            counts["invalid"] += 1
+
+    def record_repair(self, kind: str, valid: bool):
+        counts = self._kind(kind)
+        counts["repairs_attempted"] += 1
+        if valid:
+            counts["repairs_succeeded"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": settings.llm_structured_output,
+            "repair_attempts": settings.llm_repair_attempts,
+            **{
+                kind: {
+                    **counts,
+                    "invalid_rate": round(counts["invalid"] / counts["responses"], 4) if counts["responses"] else 0.0
+                }
+                for kind, counts in self._counts.items()
+            }
+        }
+
+
+# Shared by every LLMService instance
+output_validation = OutputValidationStats()
@@ -0,0 +1,169 @@
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import json
+import time
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import DocumentTemplate
+
+# Categories without templates of their own are offered these
+FALLBACK_CATEGORY = "other"
+
+
+class TemplateIndex:
+    """Active document templates grouped by category, kept in memory.
+
+    Loaded from the document_templates table on startup (or first use) so
+    template recommendations need no database round trip. Any insert,
+    update or delete of a DocumentTemplate committed in this process marks
+    the index stale; it is reloaded on the next lookup.
+
+    Other processes (``init_db.py``, other workers) are not seen by those
+    events, so at most every ``check_interval`` seconds a lookup also
+    compares the table's row count, highest id and latest timestamps with
+    those at the last load, and reloads when they differ.
+    """
+
+    def __init__(self, session_factory, check_interval: float):
+        self.session_factory = session_factory
+        self.check_interval = check_interval
+        self._by_category: Mapping[str, Tuple[Mapping[str, Any], ...]] = MappingProxyType({})
+        self._stale = True
+        self._version: Optional[tuple] = None
+        self._checked_at = 0.0
+        self.loads = 0
+        self.invalidations = 0
+        self.checks = 0
+        self.external_changes = 0
+
+    @staticmethod
+    def _table_version(db) -> tuple:
+        # Changes whenever a template is added, removed, re-seeded or updated through the ORM
+        return tuple(db.query(
+            func.count(DocumentTemplate.id),
+            func.max(DocumentTemplate.id),
+            func.max(DocumentTemplate.created_at),
+            func.max(DocumentTemplate.updated_at)
+        ).one())
+
+    def refresh(self) -> int:
+        """Reload the index from the database; returns the number of templates."""
+        # Cleared first so a change committed while loading triggers another reload
+        self._stale = False
+        self._checked_at = time.monotonic()
+        db = self.session_factory()
+        try:
+            version = self._table_version(db)
+            rows = (
+                db.query(DocumentTemplate)
+                .filter(DocumentTemplate.is_active == True)
+                .order_by(DocumentTemplate.id)
+                .all()
+            )
+            by_category: Dict[str, List[Mapping[str, Any]]] = {}
+            for row in rows:
+                by_category.setdefault(row.category, []).append(MappingProxyType({
+                    "id": row.id,
+                    "name": row.name,
+                    "category": row.category,
+                    "description": row.description,
+                    "required_fields": tuple(json.loads(row.required_fields) if row.required_fields else [])
+                }))
+        except Exception:
+            self._stale = True
+            raise
+        finally:
+            db.close()
+
+        self._by_category = MappingProxyType({
+            category: tuple(templates) for category, templates in by_category.items()
+        })
+        self._version = version
+        self.loads += 1
+        return len(rows)
+
+    def invalidate(self):
+        self._stale = True
+        self.invalidations += 1
+
+    def _check_for_changes(self):
+        """Mark the index stale if another process changed the templates since the last load."""
+        self._checked_at = time.monotonic()
+        self.checks += 1
+        db = self.session_factory()
+        try:
+            version = self._table_version(db)
+        finally:
+            db.close()
+        if version != self._version:
+            self.external_changes += 1
+            self.invalidate()
+
+    def get(self, category: str) -> List[Dict[str, Any]]:
+        """Templates recommended for a category, in the AnalysisResponse shape."""
+        if (
+            not self._stale
+            and self.check_interval > 0
+            and time.monotonic() - self._checked_at >= self.check_interval
+        ):
+            try:
+                self._check_for_changes()
+            except Exception as e:
+                print(f"Error checking document templates for changes: {str(e)}")
+        if self._stale:
+            try:
+                self.refresh()
+            except Exception as e:
+                # Serve the last loaded index rather than failing the analysis
+                print(f"Error loading document templates: {str(e)}")
+        templates = self._by_category.get(category) or self._by_category.get(FALLBACK_CATEGORY, ())
+        return [{**template, "required_fields": list(template["required_fields"])} for template in templates]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "categories": len(self._by_category),
+            "templates": sum(len(templates) for templates in self._by_category.values()),
+            "stale": self._stale,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+            "checks": self.checks,
+            "external_changes": self.external_changes
+        }
+
+
+# Shared index; loaded in the application lifespan
+template_index = TemplateIndex(SessionLocal, settings.template_index_check_interval)
+
+
+def _mark_template_change(mapper, connection, target):
+    # Flagged on the session and acted on at commit, so rolled-back changes are ignored
+    session = Session.object_session(target)
+    if session is not None:
+        session.info["document_templates_changed"] = True
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(DocumentTemplate, _event_name, _mark_template_change)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_template_change(orm_execute_state):
+    # query(...).update() / delete() and update()/delete() statements skip the mapper events
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper is not None:
+        if orm_execute_state.bind_mapper.class_ is DocumentTemplate:
+            orm_execute_state.session.info["document_templates_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("document_templates_changed", False):
+        template_index.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("document_templates_changed", None)
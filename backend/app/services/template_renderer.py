@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import os
+
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, StrictUndefined, Template, meta, nodes
+
+from app.core.config import settings
+
+# Tests and filters that make a variable optional: {% if x is defined %}, {{ x | default("") }}
+_OPTIONAL_TESTS = {"defined", "undefined"}
+_OPTIONAL_FILTERS = {"default", "d"}
+
+
+class MissingTemplateFieldsError(ValueError):
+    """Raised before rendering when the data lacks variables the template uses."""
+
+    def __init__(self, template_name: str, missing_fields: List[str]):
+        self.template_name = template_name
+        self.missing_fields = missing_fields
+        super().__init__(f"Template '{template_name}' needs fields: {', '.join(missing_fields)}")
+
+
+class _SourceLoader(BaseLoader):
+    """Loads one template from a string, so compiling goes through the bytecode cache."""
+
+    def __init__(self, source: str):
+        self.source = source
+
+    def get_source(self, environment: Environment, template: str):
+        return self.source, None, lambda: True
+
+
+class _CompiledTemplate:
+    def __init__(self, source: str, template: Template, required: FrozenSet[str]):
+        self.source = source
+        self.template = template
+        self.required = required
+
+
+def required_variables(environment: Environment, source: str) -> FrozenSet[str]:
+    """Variables a template reads from its context, minus ones it treats as optional."""
+    ast = environment.parse(source)
+    optional = set()
+    for node in ast.find_all((nodes.Test, nodes.Filter)):
+        names = _OPTIONAL_TESTS if isinstance(node, nodes.Test) else _OPTIONAL_FILTERS
+        if node.name in names and isinstance(node.node, nodes.Name):
+            optional.add(node.node.name)
+    return frozenset(meta.find_undeclared_variables(ast) - optional)
+
+
+class TemplateRenderer:
+    """Renders document templates from a cache of compiled Jinja templates.
+
+    One Environment is shared by all renders. Compiled templates are kept
+    in an LRU of ``cache_size`` entries keyed by template ID and
+    ``updated_at``; an entry is only reused while its source is unchanged,
+    so edits take effect even within the same timestamp. With
+    ``bytecode_cache_dir`` set, compiled code is also written to disk so a
+    restarted process skips the Jinja compile step.
+
+    Undefined variables raise instead of rendering as blanks, and the
+    variables a template needs are found from its AST when it is compiled,
+    so missing fields are reported before anything is rendered.
+    """
+
+    def __init__(self, cache_size: int, bytecode_cache_dir: Optional[str] = None):
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+        self.environment = Environment(
+            undefined=StrictUndefined,
+            bytecode_cache=bytecode_cache,
+            auto_reload=False
+        )
+        self.cache_size = max(1, cache_size)
+        self._compiled: "OrderedDict[Tuple[Any, Any], _CompiledTemplate]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def _get(self, template_id: Any, updated_at: Any, source: str) -> _CompiledTemplate:
+        key = (template_id, updated_at)
+        compiled = self._compiled.get(key)
+        if compiled is not None and compiled.source == source:
+            self._compiled.move_to_end(key)
+            self.hits += 1
+            return compiled
+
+        self.misses += 1
+        name = f"document_template_{template_id}"
+        compiled = _CompiledTemplate(
+            source,
+            _SourceLoader(source).load(self.environment, name),
+            required_variables(self.environment, source)
+        )
+        self._compiled[key] = compiled
+        while len(self._compiled) > self.cache_size:
+            self._compiled.popitem(last=False)
+        return compiled
+
+    def placeholders(self, template, data: Dict[str, Any]) -> Dict[str, str]:
+        """Placeholders such as ``[PROPERTY ADDRESS]`` for the fields the data lacks."""
+        compiled = self._get(template.id, template.updated_at, template.template_content)
+        return {field: f"[{field.replace('_', ' ').upper()}]" for field in sorted(compiled.required - data.keys())}
+
+    def render(self, template, data: Dict[str, Any]) -> str:
+        """Render a DocumentTemplate; raises MissingTemplateFieldsError if fields are missing."""
+        compiled = self._get(template.id, template.updated_at, template.template_content)
+        missing = sorted(compiled.required - data.keys())
+        if missing:
+            self.rejected += 1
+            raise MissingTemplateFieldsError(template.name, missing)
+        return compiled.template.render(**data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cached": len(self._compiled),
+            "cache_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "rejected": self.rejected,
+            "bytecode_cache": self.environment.bytecode_cache is not None
+        }
+
+
+# Shared by every DocumentGenerator
+template_renderer = TemplateRenderer(settings.template_cache_size, settings.template_bytecode_cache_dir)
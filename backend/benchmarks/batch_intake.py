@@ -0,0 +1,84 @@
+"""
+Benchmark batch intake against looping over /api/analyze.
+
+Submits the same synthetic issues once as N sequential POST /api/analyze
+calls and once as a single POST /api/analyze/batch, against a throwaway
+SQLite database. The LLM is replaced by an analyzer that sleeps for
+--llm-ms and returns a fixed classification, so the numbers show request,
+database and scheduling overhead rather than model speed.
+
+Usage (from the backend directory):
+    python benchmarks/batch_intake.py [--issues 500] [--llm-ms 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/batch_benchmark.db"
+os.environ["ENABLE_LLM_CALL_LOG"] = "false"
+os.environ["ENABLE_SPECULATIVE_ADVICE"] = "false"
+
+from fastapi.testclient import TestClient
+
+import main
+from app.core.database import Base, engine
+from app.services.legal_analyzer import LegalAnalyzer
+
+
+class SimulatedAnalyzer(LegalAnalyzer):
+    """Analyzer whose classification takes a fixed time and never calls an LLM."""
+
+    def __init__(self, delay_s: float):
+        super().__init__()
+        self.delay_s = delay_s
+
+    async def analyze_issue(self, description, location=None):
+        await asyncio.sleep(self.delay_s)
+        return self._build_analysis({"category": "tenant_rights", "confidence": 0.9, "source": "llm"})
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=500)
+    parser.add_argument("--llm-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    issues = [
+        {"description": f"My landlord has not returned my security deposit, case {i}", "location": "CA"}
+        for i in range(args.issues)
+    ]
+
+    with TestClient(main.app) as client:
+        main.app.state.legal_analyzer = SimulatedAnalyzer(args.llm_ms / 1000)
+
+        started = time.perf_counter()
+        for issue in issues:
+            client.post("/api/analyze", json=issue).raise_for_status()
+        loop_s = time.perf_counter() - started
+        print(f"Sequential /api/analyze: {loop_s:.2f}s ({loop_s / args.issues * 1000:.1f} ms/issue)")
+
+        started = time.perf_counter()
+        with client.stream("POST", "/api/analyze/batch", json=issues) as response:
+            for line in response.iter_lines():
+                if line and "summary" in json.loads(line):
+                    summary = json.loads(line)["summary"]
+        batch_s = time.perf_counter() - started
+        print(
+            f"/api/analyze/batch: {batch_s:.2f}s ({batch_s / args.issues * 1000:.1f} ms/issue), "
+            f"{summary['succeeded']} succeeded, {summary['failed']} failed"
+        )
+        print(f"Speedup: {loop_s / batch_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,129 @@
+"""
+Benchmark regenerating identical documents through the document store.
+
+Generates the same letter --documents times, one after another and then
+all at once, against a temporary SQLite database. The first request
+renders the PDF; the rest reuse the stored file, or share the render
+already running. Compares with rendering every request (the old
+behaviour) and reports the files left on disk.
+
+Usage (from the backend directory):
+    python benchmarks/document_store.py [--documents 20] [--paragraphs 100]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.database import Base, DocumentBlob
+from app.services.document_store import DocumentStore
+from app.services.pdf_render import PDFRenderPool
+import app.services.document_store as document_store_module
+
+DOCUMENT_DATE = "January 01, 2024"
+
+
+def letter(paragraphs: int) -> str:
+    body = "The heating system has not worked since the start of the month despite repeated requests. " * 4
+    return "\n\n".join(body for _ in range(paragraphs))
+
+
+def count_files(root: str) -> int:
+    return sum(len(files) for _, _, files in os.walk(root))
+
+
+async def sequential(store, Session, template, content, documents):
+    timings = []
+    for _ in range(documents):
+        db = Session()
+        started = time.perf_counter()
+        await store.store(db, template, content, DOCUMENT_DATE)
+        db.commit()
+        timings.append((time.perf_counter() - started) * 1000)
+        db.close()
+    return timings
+
+
+async def concurrent(store, Session, template, content, documents):
+    async def one():
+        db = Session()
+        try:
+            await store.store(db, template, content, DOCUMENT_DATE)
+            db.commit()
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(documents)))
+    return (time.perf_counter() - started) * 1000
+
+
+async def render_each(pool, out_dir, title, content, documents):
+    started = time.perf_counter()
+    for i in range(documents):
+        await pool.render(content, os.path.join(out_dir, f"letter_{i}.pdf"), title, DOCUMENT_DATE)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=100)
+    args = parser.parse_args()
+
+    content = letter(args.paragraphs)
+    pool = PDFRenderPool(0, args.documents, 600)
+    document_store_module.pdf_render_pool = pool
+    pool.start()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(work_dir, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+
+        old_dir = os.path.join(work_dir, "old")
+        os.makedirs(old_dir)
+        old_ms = asyncio.run(render_each(pool, old_dir, "Benchmark Letter", content, args.documents))
+        print(
+            f"Render every request:    {old_ms / args.documents:8.1f} ms/document, "
+            f"{count_files(old_dir)} files on disk"
+        )
+
+        store = DocumentStore(os.path.join(work_dir, "blobs"))
+        template = SimpleNamespace(id=1, name="Benchmark Letter", updated_at=datetime(2024, 1, 1))
+        timings = asyncio.run(sequential(store, Session, template, content, args.documents))
+        reused = timings[1:]
+        print(f"Store, first request:    {timings[0]:8.1f} ms")
+        print(
+            f"Store, identical repeat: {sum(reused) / len(reused):8.1f} ms/document "
+            f"({timings[0] / (sum(reused) / len(reused)):.0f}x faster)"
+        )
+
+        template.id = 2
+        concurrent_ms = asyncio.run(concurrent(store, Session, template, content, args.documents))
+        print(
+            f"Store, {args.documents} identical at once: {concurrent_ms:8.1f} ms total, "
+            f"{store.shared_renders} shared the first render"
+        )
+
+        db = Session()
+        refs = [blob.ref_count for blob in db.query(DocumentBlob).order_by(DocumentBlob.id)]
+        db.close()
+        print(f"Stored files: {count_files(store.root)}, references per file: {refs}")
+
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark the near-duplicate issue index on synthetic issues.
+
+Builds a NearDuplicateIndex over N synthetic descriptions spread across
+50 locations, then reports its memory footprint, lookup latency for
+reworded copies of indexed issues and for unrelated text, recall on the
+reworded copies, and the cost of incremental inserts.
+
+Usage (from the backend directory):
+    python benchmarks/issue_dedup.py [--issues 1000000] [--queries 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.issue_dedup import NearDuplicateIndex
+
+LOCATIONS = [f"County {i}" for i in range(50)]
+
+
+def make_vocabulary(rng: random.Random, size: int = 20000):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(size)]
+
+
+def make_issue(rng: random.Random, vocabulary, words: int = 30) -> str:
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def reword(rng: random.Random, text: str, vocabulary) -> str:
+    """Replace one word and append one, like a lightly edited resubmission."""
+    words = text.split()
+    words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    return " ".join(words + [rng.choice(vocabulary)])
+
+
+def percentiles(samples_ms):
+    ordered = np.sort(np.asarray(samples_ms))
+    return (
+        f"p50 {np.percentile(ordered, 50):.3f} ms, "
+        f"p95 {np.percentile(ordered, 95):.3f} ms, "
+        f"p99 {np.percentile(ordered, 99):.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--issues", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--inserts", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+
+    started = time.perf_counter()
+    texts = [make_issue(rng, vocabulary) for _ in range(args.issues)]
+    locations = [rng.choice(LOCATIONS) for _ in range(args.issues)]
+    print(f"Generated {args.issues} issues in {time.perf_counter() - started:.1f}s")
+
+    index = NearDuplicateIndex()
+    started = time.perf_counter()
+    index.add_many(list(range(1, args.issues + 1)), texts, locations)
+    build_s = time.perf_counter() - started
+    print(f"Bulk build: {build_s:.1f}s ({build_s / args.issues * 1e6:.1f} us/issue)")
+    print(f"Index memory: {index.memory_bytes() / (1024 * 1024):.1f} MiB ({index.memory_bytes() / args.issues:.0f} bytes/issue)")
+
+    # Reworded copies of indexed issues should find their original
+    found = 0
+    latencies = []
+    for _ in range(args.queries):
+        row = rng.randrange(args.issues)
+        query = reword(rng, texts[row], vocabulary)
+        started = time.perf_counter()
+        matches = index.find(query, locations[row])
+        latencies.append((time.perf_counter() - started) * 1000)
+        found += any(issue_id == row + 1 for issue_id, _ in matches)
+    print(f"Near-duplicate lookups: {percentiles(latencies)}; recall {found / args.queries:.3f}")
+
+    false_matches = 0
+    latencies = []
+    for _ in range(args.queries):
+        query = make_issue(rng, vocabulary)
+        started = time.perf_counter()
+        false_matches += bool(index.find(query, rng.choice(LOCATIONS)))
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"Unrelated lookups: {percentiles(latencies)}; false matches {false_matches}")
+
+    latencies = []
+    for i in range(args.inserts):
+        started = time.perf_counter()
+        index.add(args.issues + i + 1, make_issue(rng, vocabulary), rng.choice(LOCATIONS))
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"Incremental inserts: {percentiles(latencies)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark eager vs lazy PDF rendering.
+
+Replays users tweaking custom_data: for each of --letters letters the
+document is generated --drafts times with a different recipient, and only
+the last draft is downloaded. Runs once with PDFs rendered on generate
+and once with LAZY_PDF_RENDERING, against a temporary SQLite database,
+and reports generate and download latency and how many PDFs were written.
+
+Usage (from the backend directory):
+    python benchmarks/lazy_rendering.py [--letters 5] [--drafts 4] [--workers 0]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.models.database import Base, DocumentTemplate, GeneratedDocument, LegalIssue
+from app.services.document_generator import DocumentGenerator
+from app.services.document_store import DocumentStore
+from app.services.pdf_render import PDFRenderPool
+import app.services.document_generator as document_generator_module
+import app.services.document_store as document_store_module
+
+
+def count_files(root: str) -> int:
+    return sum(len(files) for _, _, files in os.walk(root))
+
+
+async def replay(generator, Session, template_id, issue_id, letters, drafts):
+    generate_ms, download_ms = [], []
+    for letter in range(letters):
+        for draft in range(drafts):
+            db = Session()
+            template = db.get(DocumentTemplate, template_id)
+            started = time.perf_counter()
+            data = await generator.generate_document(
+                template=template,
+                issue=db.get(LegalIssue, issue_id),
+                document_type="demand_letter",
+                db=db,
+                custom_data={"recipient_name": f"Recipient {letter}.{draft}", "amount": "$1,200", "deadline": "14 days"}
+            )
+            document = GeneratedDocument(
+                issue_id=issue_id,
+                template_id=template_id,
+                document_type="demand_letter",
+                file_path=data["file_path"],
+                file_name=data["file_name"],
+                content_data=json.dumps(data["content_data"])
+            )
+            db.add(document)
+            db.commit()
+            generate_ms.append((time.perf_counter() - started) * 1000)
+            document_id = document.id
+            db.close()
+
+        # Download the final draft, as the router does
+        db = Session()
+        document = db.get(GeneratedDocument, document_id)
+        started = time.perf_counter()
+        if not os.path.exists(document.file_path):
+            await generator.render_on_download(document, db.get(DocumentTemplate, template_id), db)
+            db.commit()
+        with open(document.file_path, "rb") as f:
+            f.read()
+        download_ms.append((time.perf_counter() - started) * 1000)
+        db.close()
+    return np.asarray(generate_ms), np.asarray(download_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--letters", type=int, default=5)
+    parser.add_argument("--drafts", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    pool = PDFRenderPool(args.workers, 32, 600)
+    document_store_module.pdf_render_pool = pool
+    pool.start()
+    generator = DocumentGenerator()
+    info = generator.get_available_templates()["demand_letter"]
+
+    for lazy in (False, True):
+        with tempfile.TemporaryDirectory() as work_dir:
+            engine = create_engine(f"sqlite:///{os.path.join(work_dir, 'bench.db')}")
+            Base.metadata.create_all(engine)
+            Session = sessionmaker(bind=engine)
+            db = Session()
+            issue = LegalIssue(description="My employer has not paid my final wages.", category="employment", urgency="high")
+            template = DocumentTemplate(name=info["name"], category="general", template_content=info["template"])
+            db.add_all([issue, template])
+            db.commit()
+            issue_id, template_id = issue.id, template.id
+            db.close()
+
+            store = DocumentStore(os.path.join(work_dir, "blobs"))
+            document_generator_module.document_store = store
+            settings.lazy_pdf_rendering = lazy
+            generate_ms, download_ms = asyncio.run(
+                replay(generator, Session, template_id, issue_id, args.letters, args.drafts)
+            )
+            print(
+                f"{'Lazy' if lazy else 'Eager'}: generate p50 {np.percentile(generate_ms, 50):6.1f} ms, "
+                f"mean {generate_ms.mean():6.1f} ms; first download mean {download_ms.mean():6.1f} ms; "
+                f"{count_files(store.root)} PDFs written for {len(generate_ms)} generates"
+            )
+
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark event-loop latency while PDFs are being generated.
+
+Runs --documents concurrent renders of a long letter while a probe task
+sleeps for 5 ms in a loop and records how late it wakes up, i.e. how
+long any other request on the same worker would have been stalled.
+Compares rendering on the event loop (the old behaviour), in a thread,
+and in the process pool.
+
+Usage (from the backend directory):
+    python benchmarks/pdf_rendering.py [--documents 16] [--paragraphs 200] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pdf_render import PDFRenderPool, build_pdf, build_styles
+
+PROBE_INTERVAL_S = 0.005
+
+
+def long_letter(paragraphs: int) -> str:
+    body = (
+        "This letter serves as formal notice regarding the conditions at the rental property. "
+        "The heating system has not worked since the start of the month despite repeated requests. "
+    ) * 4
+    sections = []
+    for i in range(paragraphs):
+        if i % 20 == 0:
+            sections.append(f"# SECTION {i // 20 + 1}")
+        sections.append(body)
+    return "\n\n".join(sections)
+
+
+async def probe(stop: asyncio.Event, lags_ms: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL_S)
+        lags_ms.append((time.perf_counter() - started - PROBE_INTERVAL_S) * 1000)
+
+
+async def run(render, documents: int, content: str, out_dir: str):
+    stop = asyncio.Event()
+    lags_ms = []
+    probe_task = asyncio.create_task(probe(stop, lags_ms))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        render(content, os.path.join(out_dir, f"letter_{i}.pdf"), "Benchmark Letter") for i in range(documents)
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    return elapsed, np.asarray(lags_ms)
+
+
+def report(label: str, documents: int, elapsed: float, lags_ms: np.ndarray):
+    print(
+        f"{label:<24} {elapsed:6.2f}s total ({documents / elapsed:5.1f} docs/s); event-loop lag "
+        f"p50 {np.percentile(lags_ms, 50):7.1f} ms, p99 {np.percentile(lags_ms, 99):7.1f} ms, "
+        f"max {lags_ms.max():7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=16)
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    content = long_letter(args.paragraphs)
+    styles = build_styles()
+
+    async def inline(content, file_path, title):
+        build_pdf(content, file_path, title, styles)
+
+    async def with_pool(pool: PDFRenderPool):
+        pool.start()
+        try:
+            return await run(pool.render, args.documents, content, out_dir)
+        finally:
+            pool.shutdown()
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        report("On the event loop", args.documents, *asyncio.run(run(inline, args.documents, content, out_dir)))
+        report("Thread (workers=0)", args.documents, *asyncio.run(with_pool(PDFRenderPool(0, args.documents, 600))))
+        report(
+            f"Process pool ({args.workers})", args.documents,
+            *asyncio.run(with_pool(PDFRenderPool(args.workers, args.documents, 600)))
+        )
+
+
+if __name__ == "__main__":
+    main()
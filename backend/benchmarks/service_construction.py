@@ -0,0 +1,78 @@
+"""
+Benchmark the per-request cost of the analysis and document services.
+
+Compares building LegalAnalyzer and DocumentGenerator for every request
+(what the routers used to do) with reusing the instances created once in
+the application lifespan. Each "request" also builds an analysis result,
+which looks up suggested actions and document templates.
+
+Usage (from the backend directory):
+    python benchmarks/service_construction.py [--requests 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.legal_analyzer import LegalAnalyzer
+from app.services.document_generator import DocumentGenerator
+
+CATEGORIES = [
+    "tenant_rights", "consumer_protection", "employment", "family_law", "immigration",
+    "criminal", "civil_rights", "debt_collection", "housing", "healthcare", "other"
+]
+
+
+def per_request(i: int, shared):
+    analyzer = LegalAnalyzer()
+    DocumentGenerator()
+    analyzer._build_analysis({"category": CATEGORIES[i % len(CATEGORIES)], "confidence": 0.9})
+
+
+def shared_instances(i: int, shared):
+    analyzer, _ = shared
+    analyzer._build_analysis({"category": CATEGORIES[i % len(CATEGORIES)], "confidence": 0.9})
+
+
+def measure(name: str, fn, requests: int, shared):
+    # Warm up imports and caches outside the measurement
+    for i in range(50):
+        fn(i, shared)
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    for i in range(requests):
+        fn(i, shared)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    tracemalloc.start()
+    for i in range(min(requests, 500)):
+        fn(i, shared)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<24} {elapsed / requests * 1e6:10.1f} us/request"
+        f" {cpu / requests * 1e6:10.1f} us CPU/request"
+        f" {peak / 1024:10.1f} KiB peak allocation"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    shared = (LegalAnalyzer(), DocumentGenerator())
+    measure("per-request services", per_request, args.requests, shared)
+    measure("shared services", shared_instances, args.requests, shared)
+
+
+if __name__ == "__main__":
+    main()
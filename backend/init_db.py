@@ -10,8 +10,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal, engine
-from app.models.database import Base, DocumentTemplate, LegalResource, LegalIssue, LegalAdvice, GeneratedDocument
+from app.core.database import SessionLocal, engine, add_missing_columns
+from app.models.database import Base, DocumentTemplate, LegalResource, LegalIssue, LegalAdvice, GeneratedDocument, DocumentBlob
 
 def init_database(clear_data=False):
     """Initialize database with default data."""
@@ -20,6 +20,7 @@ def init_database(clear_data=False):
         # Create all tables
         print("Creating database tables...")
         Base.metadata.create_all(bind=engine)
+        add_missing_columns()
         print("Tables created successfully!")
         
         # Create session
@@ -68,6 +69,10 @@ def clear_table_data(db: Session):
     db.query(GeneratedDocument).delete()
     print("Cleared GeneratedDocument table")
     
+    # Stored PDF files are only referenced by GeneratedDocument
+    db.query(DocumentBlob).delete()
+    print("Cleared DocumentBlob table")
+    
     # 2. Clear LegalAdvice (has foreign key to LegalIssue)
     db.query(LegalAdvice).delete()
     print("Cleared LegalAdvice table")
@@ -0,0 +1,158 @@
+"""
+Stand-in local LLM server for development and load testing.
+
+Implements the endpoints LLMService expects from a local model server so the
+local-LLM code paths (single calls, streaming and batching) can be exercised
+without a real model:
+
+    POST /generate         {"prompt", "max_tokens", "temperature", "stream"?, "json_schema"?}
+    POST /generate/batch   {"prompts": [...], "max_tokens", "temperature", "json_schema"?}
+
+With --invalid-rate, that share of completions is malformed unless the
+request carries a json_schema, to exercise output validation and repair.
+With --error-rate, that share of requests fails with 503, to exercise the
+circuit breaker. Both (and the latencies) can be changed while running
+with PUT /config, e.g. {"error_rate": 1.0}; the backend tests do this.
+
+Run it with:
+
+    python local_llm_stub.py --port 8080 --latency-ms 200 --per-item-ms 20
+
+and point the app at it with USE_LOCAL_LLM=true,
+LOCAL_LLM_URL=http://localhost:8080/generate and (for batching)
+LOCAL_LLM_BATCH_URL=http://localhost:8080/generate/batch.
+"""
+
+import asyncio
+import json
+import os
+import random
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services.legal_analyzer import fast_classifier
+
+MODEL_NAME = "local-llm-stub"
+
+# Simulated cost model: a fixed per-request overhead plus a per-prompt cost,
+# so batching several prompts into one request is measurably cheaper.
+config = {
+    "latency_ms": float(os.getenv("STUB_LATENCY_MS", "200")),
+    "per_item_ms": float(os.getenv("STUB_PER_ITEM_MS", "20")),
+    "invalid_rate": float(os.getenv("STUB_INVALID_RATE", "0")),
+    "error_rate": float(os.getenv("STUB_ERROR_RATE", "0"))
+}
+
+app = FastAPI(title="Local LLM stand-in")
+stats = {"requests": 0, "batch_requests": 0, "prompts": 0, "invalid": 0, "errors": 0}
+
+
+def should_fail() -> bool:
+    if random.random() >= config["error_rate"]:
+        return False
+    stats["errors"] += 1
+    return True
+
+
+def unavailable() -> JSONResponse:
+    return JSONResponse(status_code=503, content={"error": "simulated backend failure"})
+
+
+def maybe_corrupt(text: str, constrained: bool) -> str:
+    """Turn a completion into the kind of almost-JSON small models produce."""
+    if constrained or random.random() >= config["invalid_rate"]:
+        return text
+    stats["invalid"] += 1
+    data = json.loads(text)
+    data.pop(next(iter(data)))
+    return "Sure! Here is the JSON you asked for:\n" + json.dumps(data)
+
+
+def fake_completion(prompt: str) -> str:
+    """Return a plausible JSON completion for a classification or advice prompt."""
+    advice = {
+        "advice": "This is stand-in advice generated by the local LLM stub.",
+        "next_steps": ["Document everything", "Contact a local legal aid organization"],
+        "relevant_laws": ["Applicable state and local law"],
+        "confidence": 0.5,
+        "disclaimers": ["This is not legal advice"]
+    }
+    if '"category"' in prompt:
+        description = prompt.split("Issue description:", 1)[-1].split("\n", 1)[0]
+        classification = fast_classifier.classify(description)
+        classification["confidence"] = max(classification["confidence"], 0.6)
+        if '"classification"' in prompt:
+            return json.dumps({"classification": classification, "advice": advice})
+        return json.dumps(classification)
+    return json.dumps(advice)
+
+
+@app.post("/generate")
+async def generate(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    stats["prompts"] += 1
+    if should_fail():
+        return unavailable()
+    text = maybe_corrupt(fake_completion(body.get("prompt", "")), bool(body.get("json_schema")))
+
+    if body.get("stream"):
+        async def chunks():
+            await asyncio.sleep(config["latency_ms"] / 1000.0)
+            for i in range(0, len(text), 16):
+                await asyncio.sleep(0.005)
+                yield json.dumps({"response": text[i:i + 16], "model": MODEL_NAME}) + "\n"
+            yield json.dumps({"response": "", "model": MODEL_NAME, "done": True}) + "\n"
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    await asyncio.sleep((config["latency_ms"] + config["per_item_ms"]) / 1000.0)
+    return {"response": text, "model": MODEL_NAME}
+
+
+@app.post("/generate/batch")
+async def generate_batch(request: Request):
+    body = await request.json()
+    prompts = body.get("prompts", [])
+    stats["batch_requests"] += 1
+    stats["prompts"] += len(prompts)
+    if should_fail():
+        return unavailable()
+    await asyncio.sleep((config["latency_ms"] + config["per_item_ms"] * len(prompts)) / 1000.0)
+    constrained = bool(body.get("json_schema"))
+    return {"responses": [maybe_corrupt(fake_completion(prompt), constrained) for prompt in prompts]}
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+@app.put("/config")
+async def update_config(request: Request):
+    """Change latencies and failure rates without a restart; unknown keys are ignored."""
+    body = await request.json()
+    config.update({key: float(value) for key, value in body.items() if key in config})
+    return config
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Run the stand-in local LLM server')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=config["latency_ms"], help='Fixed latency per request')
+    parser.add_argument('--per-item-ms', type=float, default=config["per_item_ms"], help='Extra latency per prompt')
+    parser.add_argument('--invalid-rate', type=float, default=config["invalid_rate"], help='Share of malformed completions')
+    parser.add_argument('--error-rate', type=float, default=config["error_rate"], help='Share of requests failing with 503')
+
+    args = parser.parse_args()
+    config.update({
+        "latency_ms": args.latency_ms,
+        "per_item_ms": args.per_item_ms,
+        "invalid_rate": args.invalid_rate,
+        "error_rate": args.error_rate
+    })
+
+    uvicorn.run(app, host="0.0.0.0", port=args.port)
@@ -1,20 +1,58 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
+from contextlib import asynccontextmanager
 import uvicorn
 import os
 from dotenv import load_dotenv
 
 from app.routers import legal, documents, resources, health
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, SessionLocal, add_missing_columns
+from app.services.llm_clients import llm_clients
+from app.services.legal_analyzer import fast_classifier
+from app.services.concurrency import LLMOverloadedError
+from app.services.speculative import speculative_advice
+from app.services.call_log import llm_call_log
+from app.services.llm_service import LLMService
+from app.services.legal_analyzer import LegalAnalyzer
+from app.services.document_generator import DocumentGenerator
+from app.services.template_index import template_index
+from app.services.issue_dedup import issue_dedup
+from app.services.pdf_render import pdf_render_pool
 
 # Load environment variables
 load_dotenv()
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared resources on startup and release them on shutdown."""
+    await llm_clients.startup()
+    # Stateless services shared by all requests (injected via app.core.dependencies)
+    app.state.llm_service = LLMService()
+    app.state.legal_analyzer = LegalAnalyzer(app.state.llm_service)
+    app.state.document_generator = DocumentGenerator()
+    speculative_advice.start(app.state.llm_service)
+    pdf_render_pool.start()
+    print(f"Template index loaded with {template_index.refresh()} document templates")
+    if settings.enable_fast_classifier and settings.fast_classifier_train_on_history:
+        trained = fast_classifier.train_from_db(SessionLocal, settings.fast_classifier_training_limit)
+        print(f"Fast-path classifier trained on {trained} stored issues")
+    if settings.enable_issue_dedup:
+        indexed = issue_dedup.load_from_db(SessionLocal, settings.issue_dedup_load_limit)
+        print(f"Near-duplicate index built over {indexed} stored issues")
+    if settings.enable_llm_call_log:
+        llm_call_log.start(SessionLocal)
+    yield
+    await speculative_advice.shutdown()
+    await llm_call_log.shutdown()
+    await llm_clients.shutdown()
+    pdf_render_pool.shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -22,7 +60,8 @@ app = FastAPI(
     description="A containerized web application that provides free, localized legal advice for common legal issues using AI/LLM technology.",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -34,6 +73,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(LLMOverloadedError)
+async def llm_overloaded_handler(request: Request, exc: LLMOverloadedError):
+    """Fail fast with 429 when the LLM concurrency queue is full."""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Ensure static directory exists and mount it
 static_dir = "static"
 if not os.path.exists(static_dir):
@@ -0,0 +1,125 @@
+"""
+Shared fixtures for the backend tests.
+
+The tests run the app against local_llm_stub.py, started as a real server
+on a free port, with a throwaway SQLite database and PDF directory. The
+environment is set here, before any app module is imported, because
+settings are read at import time.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+import pytest
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix="legal_aid_tests_")
+STUB_URL = f"http://127.0.0.1:{_free_port()}"
+
+# Short but non-zero latency, so concurrent calls overlap at the stub
+STUB_DEFAULTS = {"latency_ms": 100.0, "per_item_ms": 10.0, "invalid_rate": 0.0, "error_rate": 0.0}
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORK_DIR, 'test.db')}",
+    "PDF_OUTPUT_DIR": os.path.join(WORK_DIR, "pdfs"),
+    "PDF_RENDER_WORKERS": "0",
+    "USE_LOCAL_LLM": "true",
+    "LOCAL_LLM_URL": f"{STUB_URL}/generate",
+    "LOCAL_LLM_BATCH_URL": f"{STUB_URL}/generate/batch",
+    "ENABLE_LOCAL_LLM_BATCHING": "false",
+    "CLASSIFICATION_CACHE_BACKEND": "memory",
+    "ENABLE_FAST_CLASSIFIER": "false",
+    "ENABLE_ISSUE_DEDUP": "false",
+    "ENABLE_SPECULATIVE_ADVICE": "false",
+    "LAZY_PDF_RENDERING": "false",
+})
+os.environ.pop("LOCAL_LLM_URLS", None)  # would take precedence over LOCAL_LLM_URL
+
+
+class LLMStub:
+    """Handle on the running stub: its request counters and its config."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def stats(self) -> dict:
+        return httpx.get(f"{self.url}/stats").json()
+
+    def configure(self, **values):
+        httpx.put(f"{self.url}/config", json=values).raise_for_status()
+
+
+@pytest.fixture(scope="session")
+def llm_stub_server():
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "local_llm_stub:app",
+            "--host", "127.0.0.1", "--port", STUB_URL.rsplit(":", 1)[1], "--log-level", "warning"
+        ],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **{f"STUB_{key.upper()}": str(value) for key, value in STUB_DEFAULTS.items()}}
+    )
+    stub = LLMStub(STUB_URL)
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            stub.stats()
+            break
+        except httpx.TransportError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("local_llm_stub.py did not start")
+            time.sleep(0.1)
+    yield stub
+    process.terminate()
+    process.wait(timeout=10)
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def llm_stub(llm_stub_server):
+    """The stub, with its latency and failure rates restored after the test."""
+    yield llm_stub_server
+    llm_stub_server.configure(**STUB_DEFAULTS)
+
+
+@pytest.fixture(scope="session")
+async def app(llm_stub_server):
+    """The FastAPI app with its startup done, on a database seeded with templates."""
+    from init_db import init_database
+    from main import app, lifespan
+
+    init_database()
+    async with lifespan(app):
+        yield app
+
+
+@pytest.fixture
+async def client(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def llm_service(app):
+    return app.state.llm_service
+
+
+@pytest.fixture
+def unique():
+    """Makes descriptions no earlier test (or the classification cache) has seen."""
+    return lambda text: f"{text} (case {uuid.uuid4().hex[:8]})"
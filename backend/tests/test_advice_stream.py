@@ -0,0 +1,19 @@
+async def test_streamed_advice_reports_the_stub_model(llm_stub, llm_service, unique):
+    events = [
+        event async for event in llm_service.stream_advice(unique("My landlord will not fix the heating"), "housing", "CA")
+    ]
+
+    assert events[0]["type"] == "token"
+    assert events[-1]["type"] == "result"
+    assert events[-1]["advice"]["model_used"] == "local-llm-stub"
+
+
+async def test_closing_the_stream_early_releases_the_advice_slot(llm_stub, llm_service, unique):
+    from app.services.concurrency import llm_limiters
+
+    stream = llm_service.stream_advice(unique("My landlord will not fix the heating"), "housing", "CA")
+    first = await stream.__anext__()
+    await stream.aclose()
+
+    assert first["type"] == "token"
+    assert llm_limiters["advice"].get_stats()["active"] == 0
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app.services.backend_router import MIN_HEDGE_SAMPLES, BackendRouter
+from app.services.concurrency import ConcurrencyLimiter
+
+PRIMARY = "http://replica-1/generate"
+SECONDARY = "http://replica-2/generate"
+
+
+@pytest.fixture
+def router():
+    router = BackendRouter([PRIMARY, SECONDARY], alpha=0.3, hedging=True, hedge_percentile=95, hedge_min_delay_ms=20)
+    for _ in range(MIN_HEDGE_SAMPLES):
+        router.latency.record(20.0)
+    # Make replica-1 the first pick
+    router.backends[0].ewma_ms = 10.0
+    router.backends[1].ewma_ms = 50.0
+    return router
+
+
+class Replicas:
+    """Answers after a per-URL delay and records which calls were cancelled."""
+
+    def __init__(self, delays: dict):
+        self.delays = delays
+        self.started = []
+        self.cancelled = []
+
+    async def __call__(self, url: str) -> str:
+        self.started.append(url)
+        try:
+            await asyncio.sleep(self.delays[url])
+        except asyncio.CancelledError:
+            self.cancelled.append(url)
+            raise
+        return url
+
+
+async def settle():
+    # Lets cancelled calls run their except blocks
+    await asyncio.sleep(0.01)
+
+
+async def test_faster_hedge_wins_and_the_primary_is_cancelled(router):
+    replicas = Replicas({PRIMARY: 1.0, SECONDARY: 0.01})
+    limiter = ConcurrencyLimiter("classify", 2, 0, 1.0)
+
+    async with limiter.slot():
+        assert await router.call(replicas, limiter) == SECONDARY
+        await settle()
+        assert limiter.get_stats()["active"] == 1
+
+    assert replicas.cancelled == [PRIMARY]
+    assert (router.hedges_sent, router.hedges_won) == (1, 1)
+    assert router.backends[1].hedges_won == 1
+    assert limiter.admitted == 2
+
+
+async def test_primary_finishing_first_cancels_the_hedge(router):
+    replicas = Replicas({PRIMARY: 0.06, SECONDARY: 1.0})
+
+    assert await router.call(replicas, ConcurrencyLimiter("classify", 2, 0, 1.0)) == PRIMARY
+    await settle()
+
+    assert replicas.started == [PRIMARY, SECONDARY]
+    assert replicas.cancelled == [SECONDARY]
+    assert (router.hedges_sent, router.hedges_won) == (1, 0)
+
+
+async def test_hedge_is_skipped_without_a_free_slot(router):
+    replicas = Replicas({PRIMARY: 0.06, SECONDARY: 0.01})
+    limiter = ConcurrencyLimiter("classify", 1, 5, 1.0)
+
+    async with limiter.slot():
+        assert await router.call(replicas, limiter) == PRIMARY
+
+    assert replicas.started == [PRIMARY]
+    assert (router.hedges_sent, router.hedges_skipped) == (0, 1)
+    assert limiter.get_stats()["max_queue_depth"] == 0
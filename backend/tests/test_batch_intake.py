@@ -0,0 +1,84 @@
+import json
+
+from app.core.database import SessionLocal
+from app.models.database import LegalIssue
+from app.services.batch_intake import batch_intake
+
+
+def read_lines(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+
+async def test_batch_stores_and_classifies_every_valid_item(llm_stub, client, unique):
+    items = [
+        {"description": unique("My landlord will not fix the broken heating"), "location": "CA"},
+        {"description": unique("My employer has not paid my final wages"), "location": "NY"},
+        {"description": "too short"},
+        {"description": unique("A debt collector keeps calling me at work"), "urgency": "high"},
+    ]
+    requests_before = llm_stub.stats()["requests"]
+
+    response = await client.post("/api/analyze/batch", json=items)
+
+    assert response.status_code == 200
+    *results, summary = read_lines(response)
+    assert summary["summary"]["items"] == 4
+    assert summary["summary"]["succeeded"] == 3
+    assert summary["summary"]["failed"] == 1
+    assert summary["summary"]["unsaved_issue_ids"] == []
+    assert llm_stub.stats()["requests"] - requests_before == 3
+
+    by_index = {result["index"]: result for result in results}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert "issue_id" not in by_index[2] and "description" in by_index[2]["error"]
+
+    issue_ids = [by_index[index]["issue_id"] for index in (0, 1, 3)]
+    db = SessionLocal()
+    try:
+        issues = {issue.id: issue for issue in db.query(LegalIssue).filter(LegalIssue.id.in_(issue_ids))}
+    finally:
+        db.close()
+    for index in (0, 1, 3):
+        issue = issues[by_index[index]["issue_id"]]
+        assert issue.category == by_index[index]["analysis"]["category"]
+        assert issue.classification_source == "llm"
+
+
+async def test_ndjson_batch_rejects_only_malformed_lines(llm_stub, client, unique):
+    body = "\n".join([
+        json.dumps({"description": unique("My landlord entered my apartment without notice")}),
+        "{not json",
+        json.dumps({"description": unique("I was denied a loan because of my age")}),
+    ])
+
+    response = await client.post(
+        "/api/analyze/batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    *results, summary = read_lines(response)
+    assert summary["summary"]["succeeded"] == 2
+    assert next(result for result in results if result["index"] == 1)["error"].startswith("Invalid JSON")
+
+
+async def test_oversized_batch_is_refused(client, monkeypatch, unique):
+    monkeypatch.setattr(batch_intake, "max_items", 2)
+
+    response = await client.post(
+        "/api/analyze/batch", json=[{"description": unique("Issue about unpaid rent")} for _ in range(3)]
+    )
+
+    assert response.status_code == 413
+
+
+async def test_categories_that_fail_to_save_are_listed_in_the_summary(llm_stub, client, monkeypatch, unique):
+    def fail(categories):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(batch_intake, "_update_categories", fail)
+    items = [{"description": unique("My landlord will not fix the broken heating")} for _ in range(2)]
+
+    response = await client.post("/api/analyze/batch", json=items)
+
+    *results, summary = read_lines(response)
+    assert all("analysis" in result for result in results)
+    assert summary["summary"]["unsaved_issue_ids"] == sorted(result["issue_id"] for result in results)
@@ -0,0 +1,31 @@
+import asyncio
+
+from app.core.config import settings
+from app.services.batching import MicroBatcher
+
+
+async def test_micro_batcher_sends_queued_prompts_in_one_request(llm_stub, app, unique):
+    batcher = MicroBatcher(settings.local_llm_batch_url, max_batch_size=4, max_wait_ms=50, max_tokens=200)
+    stats_before = llm_stub.stats()
+
+    prompts = [f'Return JSON with "category".\nIssue description: {unique("Debt collector calls")}' for _ in range(4)]
+    responses = await asyncio.gather(*(batcher.submit(prompt) for prompt in prompts))
+
+    stats = llm_stub.stats()
+    assert stats["batch_requests"] - stats_before["batch_requests"] == 1
+    assert stats["prompts"] - stats_before["prompts"] == 4
+    assert batcher.size_flushes == 1
+    assert all('"category"' in response for response in responses)
+
+
+async def test_micro_batcher_flushes_a_partial_batch_after_the_wait(llm_stub, app, unique):
+    batcher = MicroBatcher(settings.local_llm_batch_url, max_batch_size=8, max_wait_ms=20, max_tokens=200)
+    batches_before = llm_stub.stats()["batch_requests"]
+
+    responses = await asyncio.gather(*(
+        batcher.submit(f'Return JSON with "category".\nIssue description: {unique("Unpaid wages")}') for _ in range(3)
+    ))
+
+    assert len(responses) == 3
+    assert llm_stub.stats()["batch_requests"] - batches_before == 1
+    assert (batcher.size_flushes, batcher.timer_flushes) == (0, 1)
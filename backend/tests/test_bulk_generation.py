@@ -0,0 +1,90 @@
+import asyncio
+import io
+import json
+import os
+import uuid
+import zipfile
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.database import DocumentTemplate, GeneratedDocument, LegalIssue
+from app.models.schemas import BulkDocumentItem, DocumentType
+from app.services.bulk_generation import MANIFEST_NAME, bulk_generation
+from app.services.document_store import document_store
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def issue_ids(db, app):
+    issues = [
+        LegalIssue(description=f"Invoice {number} from my small business is still unpaid.", category="consumer")
+        for number in range(3)
+    ]
+    db.add_all(issues)
+    db.commit()
+    return [issue.id for issue in issues]
+
+
+@pytest.fixture
+def template(db, app):
+    return db.query(DocumentTemplate).filter(DocumentTemplate.name == "Demand Letter for Payment").one()
+
+
+def custom_data() -> dict:
+    return {"recipient_name": f"Acme {uuid.uuid4().hex[:8]}", "amount": "450", "deadline": "7"}
+
+
+async def test_archive_holds_each_pdf_and_a_manifest_with_the_failed_item(client, db, issue_ids, template):
+    items = [{"issue_id": issue_id, "custom_data": custom_data()} for issue_id in issue_ids[:2]]
+    items.append({"issue_id": 999999999, "custom_data": custom_data()})
+
+    response = await client.post("/api/generate/bulk", json={
+        "template_id": template.id, "document_type": "demand_letter", "items": items
+    })
+
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist()[-1] == MANIFEST_NAME
+    manifest = json.loads(archive.read(MANIFEST_NAME))
+    assert (manifest["succeeded"], manifest["failed"]) == (2, 1)
+
+    by_index = {item["index"]: item for item in manifest["items"]}
+    assert by_index[2]["error"] == "Legal issue not found"
+    for index in (0, 1):
+        item = by_index[index]
+        assert archive.read(item["entry"]).startswith(b"%PDF")
+        document = db.get(GeneratedDocument, item["document_id"])
+        assert document.issue_id == issue_ids[index]
+        assert os.path.exists(document.file_path)
+
+
+async def test_pdfs_of_an_abandoned_request_are_deleted(app, issue_ids, template, monkeypatch):
+    rendered = []
+    render_file = document_store.render_file
+
+    async def recording_render_file(*args):
+        digest, size_bytes, reused = await render_file(*args)
+        rendered.append(digest)
+        return digest, size_bytes, reused
+
+    monkeypatch.setattr(document_store, "render_file", recording_render_file)
+    items = [BulkDocumentItem(issue_id=issue_id, custom_data=custom_data()) for issue_id in issue_ids]
+    discarded_before = bulk_generation.discarded
+
+    stream = bulk_generation.run(app.state.document_generator, template, DocumentType.DEMAND_LETTER, items)
+    first_chunk = await stream.__anext__()
+    # The client goes away after the first entry
+    await stream.aclose()
+    await asyncio.gather(*bulk_generation._cleanups)
+
+    assert first_chunk.startswith(b"PK")
+    assert rendered
+    assert bulk_generation.discarded - discarded_before == len(rendered)
+    assert not any(os.path.exists(document_store.path_for(digest)) for digest in rendered)
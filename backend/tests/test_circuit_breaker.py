@@ -0,0 +1,24 @@
+from app.services.circuit_breaker import OPEN, CircuitBreaker, llm_breakers
+
+
+async def test_open_breaker_serves_fallback_advice_without_calling_stub(llm_stub, llm_service, monkeypatch, unique):
+    breaker = CircuitBreaker(
+        "local_llm", window=4, min_calls=2, error_rate=0.5, slow_call_ms=30000, slow_rate=1.0, open_seconds=60
+    )
+    monkeypatch.setitem(llm_breakers, "local_llm", breaker)
+    llm_stub.configure(error_rate=1.0)
+
+    for _ in range(2):
+        advice = await llm_service.generate_advice(unique("I was fired after asking for overtime pay"), "employment", "CA")
+        assert advice["model_used"] == "error_fallback"
+    assert breaker.state == OPEN
+
+    requests_before = llm_stub.stats()["requests"]
+    advice = await llm_service.generate_advice(unique("I was fired after asking for overtime pay"), "employment", "CA")
+    classification = await llm_service.classify_legal_domain(unique("I was fired after asking for overtime pay"))
+
+    assert advice["model_used"] == "deterministic_fallback"
+    assert advice["next_steps"]
+    assert classification["source"] == "fast_path_fallback"
+    assert llm_stub.stats()["requests"] == requests_before
+    assert breaker.rejected == 2
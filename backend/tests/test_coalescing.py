@@ -0,0 +1,26 @@
+import asyncio
+
+from app.services.llm_service import llm_singleflight
+
+
+async def test_identical_concurrent_classifications_share_one_stub_call(llm_stub, llm_service, unique):
+    description = unique("My landlord has kept my security deposit for two months")
+    requests_before = llm_stub.stats()["requests"]
+    collapsed_before = llm_singleflight.collapsed
+
+    results = await asyncio.gather(*(llm_service.classify_legal_domain(description, "CA") for _ in range(5)))
+
+    assert llm_stub.stats()["requests"] - requests_before == 1
+    assert llm_singleflight.collapsed - collapsed_before == 4
+    assert {result["source"] for result in results} == {"llm"}
+    assert len({result["category"] for result in results}) == 1
+
+
+async def test_different_prompts_are_not_coalesced(llm_stub, llm_service, unique):
+    requests_before = llm_stub.stats()["requests"]
+
+    await asyncio.gather(*(
+        llm_service.classify_legal_domain(unique("My employer did not pay my overtime"), "CA") for _ in range(3)
+    ))
+
+    assert llm_stub.stats()["requests"] - requests_before == 3
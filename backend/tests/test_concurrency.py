@@ -0,0 +1,50 @@
+import asyncio
+
+from app.services.concurrency import ConcurrencyLimiter, llm_limiters, llm_priority, on_llm_admit
+
+STRICT_WEIGHTS = {"high": 3.0, "medium": 2.0, "low": 1.0, "background": 0.0}
+
+
+async def test_full_queue_answers_429_with_retry_after(llm_stub, client, monkeypatch, unique):
+    limiter = ConcurrencyLimiter("classify", 1, 0, 10.0)
+    monkeypatch.setitem(llm_limiters, "classify", limiter)
+
+    responses = await asyncio.gather(*(
+        client.post("/api/analyze", json={
+            "description": unique("My employer has not paid my final wages"),
+            "location": "CA",
+            "reuse_similar": False
+        })
+        for _ in range(2)
+    ))
+
+    assert sorted(response.status_code for response in responses) == [200, 429]
+    rejected = next(response for response in responses if response.status_code == 429)
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert limiter.rejected == 1
+
+
+async def test_queued_advice_calls_are_admitted_by_urgency(llm_stub, llm_service, monkeypatch, unique):
+    limiter = ConcurrencyLimiter("advice", 1, 10, 10.0, STRICT_WEIGHTS, aging_rate=0.0)
+    monkeypatch.setitem(llm_limiters, "advice", limiter)
+    admitted = []
+
+    def start(lane: str) -> asyncio.Future:
+        # Tasks copy the current context, so the lane and callback apply to their LLM calls
+        with llm_priority(lane), on_llm_admit(lambda: admitted.append(lane)):
+            return asyncio.ensure_future(
+                llm_service.generate_advice(unique("My landlord will not return my deposit"), "housing", "CA")
+            )
+
+    tasks = [start("medium")]
+    while limiter.admitted < 1:
+        await asyncio.sleep(0.01)
+    tasks.append(start("low"))
+    while limiter.queue_depth < 1:
+        await asyncio.sleep(0.01)
+    tasks.append(start("high"))
+    results = await asyncio.gather(*tasks)
+
+    assert admitted == ["medium", "high", "low"]
+    assert {advice["model_used"] for advice in results} == {"local-llm-stub"}
+    assert limiter.get_stats()["lanes"]["high"]["admitted"] == 1
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.database import DocumentTemplate, GeneratedDocument, LegalIssue
+from app.services.document_generator import SNAPSHOT_KEY
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def issue_id(db, app):
+    issue = LegalIssue(description="My landlord has not fixed the leaking roof for a month.", category="housing")
+    db.add(issue)
+    db.commit()
+    return issue.id
+
+
+@pytest.fixture
+def template(db, app):
+    return db.query(DocumentTemplate).filter(DocumentTemplate.name == "Tenant Demand for Repairs").one()
+
+
+async def test_missing_custom_fields_are_rejected(client, issue_id, template):
+    response = await client.post("/api/generate", json={
+        "issue_id": issue_id,
+        "template_id": template.id,
+        "document_type": "demand_letter",
+        "custom_data": {"landlord_name": "Jordan Lee"}
+    })
+
+    assert response.status_code == 422
+    assert "property_address" in response.json()["detail"]["missing_fields"]
+
+
+async def test_without_custom_data_missing_fields_become_placeholders(client, db, issue_id, template):
+    response = await client.post("/api/generate", json={
+        "issue_id": issue_id,
+        "template_id": template.id,
+        "document_type": "demand_letter"
+    })
+
+    assert response.status_code == 200
+    content_data = json.loads(db.get(GeneratedDocument, response.json()["id"]).content_data)
+    assert content_data["property_address"] == "[PROPERTY ADDRESS]"
+    assert "[PROPERTY ADDRESS]" in content_data[SNAPSHOT_KEY]["content"]
@@ -0,0 +1,92 @@
+import os
+import uuid
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.database import DocumentBlob, DocumentTemplate, GeneratedDocument, LegalIssue
+from app.services.document_store import document_store
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def issue_id(db, app):
+    issue = LegalIssue(description="My former employer has not paid my final wages.", category="employment")
+    db.add(issue)
+    db.commit()
+    return issue.id
+
+
+@pytest.fixture
+def template(db, app):
+    return db.query(DocumentTemplate).filter(DocumentTemplate.name == "Demand Letter for Payment").one()
+
+
+def blob_for(db, file_path):
+    db.expire_all()
+    return db.query(DocumentBlob).filter(DocumentBlob.file_path == file_path).first()
+
+
+async def test_identical_documents_share_one_file_until_the_last_is_deleted(client, db, issue_id, template):
+    body = {
+        "issue_id": issue_id,
+        "template_id": template.id,
+        "document_type": "demand_letter",
+        "custom_data": {"recipient_name": f"Acme {uuid.uuid4().hex[:8]}", "amount": "1,200", "deadline": "14"}
+    }
+
+    first = (await client.post("/api/generate", json=body)).json()
+    second = (await client.post("/api/generate", json=body)).json()
+
+    assert (first["reused"], second["reused"]) == (False, True)
+    file_path = db.get(GeneratedDocument, first["id"]).file_path
+    assert db.get(GeneratedDocument, second["id"]).file_path == file_path
+    assert blob_for(db, file_path).ref_count == 2
+
+    assert (await client.delete(f"/api/documents/{first['id']}")).status_code == 200
+    assert os.path.exists(file_path)
+    assert blob_for(db, file_path).ref_count == 1
+    download = await client.get(f"/api/documents/{second['id']}/download")
+    assert download.status_code == 200 and download.content.startswith(b"%PDF")
+
+    assert (await client.delete(f"/api/documents/{second['id']}")).status_code == 200
+    assert not os.path.exists(file_path)
+    assert blob_for(db, file_path) is None
+
+
+async def test_file_stored_again_after_release_is_not_unlinked(db, template):
+    content = f"Stored, released and stored again {uuid.uuid4().hex}"
+    blob, _ = await document_store.store(db, template, content, "October 1, 2026")
+    db.commit()
+    file_path = blob.file_path
+
+    # A delete commits its release, then another request stores the same
+    # content before the delete gets to unlink the file
+    assert document_store.release(db, file_path)
+    db.commit()
+    other = SessionLocal()
+    try:
+        _, reused = await document_store.store(other, template, content, "October 1, 2026")
+        other.commit()
+    finally:
+        other.close()
+
+    assert reused
+    assert not document_store.remove_unused(db, file_path)
+    assert os.path.exists(file_path)
+    assert blob_for(db, file_path).ref_count == 1
+
+
+async def test_references_are_never_added_to_a_released_row(db, template):
+    blob, _ = await document_store.store(db, template, f"Released {uuid.uuid4().hex}", "October 1, 2026")
+    db.flush()
+    db.query(DocumentBlob).filter(DocumentBlob.id == blob.id).update({DocumentBlob.ref_count: 0})
+
+    assert not document_store._reference(db, blob.sha256, 1)
+    db.rollback()
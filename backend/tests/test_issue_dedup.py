@@ -0,0 +1,87 @@
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import LegalAdvice, LegalIssue
+from app.services import issue_dedup as issue_dedup_module
+from app.services.issue_dedup import NearDuplicateIndex, find_reusable_issue
+
+DESCRIPTION = "My landlord has kept my whole security deposit although I left the apartment clean"
+
+
+@pytest.fixture
+def db(app):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = NearDuplicateIndex()
+    monkeypatch.setattr(issue_dedup_module, "issue_dedup", index)
+    monkeypatch.setattr(settings, "enable_issue_dedup", True)
+    return index
+
+
+@pytest.fixture
+def location():
+    # Matches are looked up per location, so each test gets one of its own
+    return f"Town {uuid.uuid4().hex[:8]}"
+
+
+def stored_issue(db, index, location, source="llm", user_email=None, advice_model=None) -> LegalIssue:
+    issue = LegalIssue(
+        description=DESCRIPTION, category="housing", classification_source=source,
+        location=location, user_email=user_email
+    )
+    db.add(issue)
+    db.flush()
+    if advice_model:
+        db.add(LegalAdvice(issue_id=issue.id, advice=f"Advice from {advice_model}", model_used=advice_model))
+    db.commit()
+    index.add(issue.id, issue.description, location)
+    return issue
+
+
+def test_fallback_categories_are_not_reused(db, index, location):
+    stored_issue(db, index, location, source="error_fallback")
+    stored_issue(db, index, location, source="fast_path_fallback")
+    classified = stored_issue(db, index, location, source="llm")
+
+    duplicate = find_reusable_issue(db, DESCRIPTION, location)
+
+    assert duplicate["issue"].id == classified.id
+    assert duplicate["advice"] is None
+
+
+def test_only_fallbacks_mean_no_reusable_issue(db, index, location):
+    stored_issue(db, index, location, source="error_fallback")
+
+    assert find_reusable_issue(db, DESCRIPTION, location) is None
+
+
+def test_advice_is_only_reused_from_the_same_submitter(db, index, location):
+    stored_issue(db, index, location, user_email="someone.else@example.com", advice_model="local-llm-stub")
+    stored_issue(db, index, location, user_email="tenant@example.com", advice_model="deterministic_fallback")
+    own = stored_issue(db, index, location, user_email="tenant@example.com", advice_model="local-llm-stub")
+
+    duplicate = find_reusable_issue(db, DESCRIPTION, location, require_advice=True, user_email="tenant@example.com")
+
+    assert duplicate["issue"].id == own.id
+    assert duplicate["advice"].model_used == "local-llm-stub"
+    assert find_reusable_issue(db, DESCRIPTION, location, require_advice=True) is None
+    assert find_reusable_issue(
+        db, DESCRIPTION, location, require_advice=True, user_email="new.tenant@example.com"
+    ) is None
+
+
+def test_category_is_reused_from_other_submitters_without_their_advice(db, index, location):
+    other = stored_issue(db, index, location, user_email="someone.else@example.com", advice_model="local-llm-stub")
+
+    duplicate = find_reusable_issue(db, DESCRIPTION, location, user_email="tenant@example.com")
+
+    assert duplicate["issue"].id == other.id
+    assert duplicate["advice"] is None
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import DocumentBlob, DocumentTemplate, GeneratedDocument, LegalIssue
+from app.services.document_store import document_store
+from app.services.pdf_render import pdf_render_pool
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def issue_id(db, app):
+    issue = LegalIssue(description="A customer has owed me for two invoices since spring.", category="consumer")
+    db.add(issue)
+    db.commit()
+    return issue.id
+
+
+@pytest.fixture
+def template(db, app):
+    return db.query(DocumentTemplate).filter(DocumentTemplate.name == "Demand Letter for Payment").one()
+
+
+async def test_concurrent_first_downloads_share_one_render(client, db, issue_id, template, monkeypatch):
+    monkeypatch.setattr(settings, "lazy_pdf_rendering", True)
+    generated = (await client.post("/api/generate", json={
+        "issue_id": issue_id,
+        "template_id": template.id,
+        "document_type": "demand_letter",
+        "custom_data": {"recipient_name": f"Acme {uuid.uuid4().hex[:8]}", "amount": "900", "deadline": "10"}
+    })).json()
+    file_path = db.get(GeneratedDocument, generated["id"]).file_path
+    assert not os.path.exists(file_path)
+    renders_before = pdf_render_pool.completed
+    shared_before = document_store.shared_renders
+
+    downloads = await asyncio.gather(*(client.get(f"/api/documents/{generated['id']}/download") for _ in range(3)))
+
+    assert [download.status_code for download in downloads] == [200, 200, 200]
+    assert len({download.content for download in downloads}) == 1
+    assert downloads[0].content.startswith(b"%PDF")
+    assert pdf_render_pool.completed - renders_before == 1
+    assert document_store.shared_renders - shared_before == 2
+    db.expire_all()
+    blob = db.query(DocumentBlob).filter(DocumentBlob.file_path == file_path).one()
+    assert blob.size_bytes == os.path.getsize(file_path)
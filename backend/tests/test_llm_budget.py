@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.services import llm_service as llm_service_module
+from app.services.llm_budget import BudgetExceededError, LLMBudget
+
+
+def budget(task: str, tokens=None, calls=None) -> LLMBudget:
+    return LLMBudget({task: tokens}, {task: calls}, SessionLocal)
+
+
+@pytest.fixture
+def task(app):
+    # A task name of its own, so each test starts from an empty row for today
+    return f"t{uuid.uuid4().hex[:8]}"
+
+
+def test_call_cap_is_shared_by_every_worker(task):
+    workers = [budget(task, calls=3), budget(task, calls=3)]
+
+    workers[0].reserve(task)
+    workers[1].reserve(task)
+    workers[0].reserve(task)
+    with pytest.raises(BudgetExceededError) as exceeded:
+        workers[1].reserve(task)
+
+    assert exceeded.value.reason == "3/3 calls"
+    assert workers[0].usage(task) == {"tokens": 0, "calls": 3}
+    assert workers[1].rejected == {task: 1}
+
+
+def test_released_calls_can_be_reserved_again(task):
+    worker, other = budget(task, calls=1), budget(task, calls=1)
+
+    worker.reserve(task)
+    worker.release(task)
+    other.reserve(task)
+
+    assert worker.usage(task)["calls"] == 1
+
+
+def test_token_cap_counts_tokens_charged_by_other_workers(task):
+    worker, other = budget(task, tokens=100), budget(task, tokens=100)
+
+    other.reserve(task)
+    other.charge(task, 120)
+
+    with pytest.raises(BudgetExceededError) as exceeded:
+        worker.reserve(task)
+    assert exceeded.value.reason == "120/100 tokens"
+
+
+async def test_failed_call_hands_its_reservation_back(llm_stub, llm_service, monkeypatch, unique):
+    shared = LLMBudget({"advice": None}, {"advice": 5}, SessionLocal)
+    monkeypatch.setattr(llm_service_module, "llm_budget", shared)
+    calls_before = shared.usage("advice")["calls"]
+    llm_stub.configure(error_rate=1.0)
+
+    advice = await llm_service.generate_advice(unique("My landlord changed the locks"), "housing", "CA")
+
+    assert advice["model_used"] == "error_fallback"
+    assert shared.usage("advice")["calls"] == calls_before
+
+    llm_stub.configure(error_rate=0.0)
+    await llm_service.generate_advice(unique("My landlord changed the locks"), "housing", "CA")
+    usage = shared.usage("advice")
+    assert usage["calls"] == calls_before + 1
+    assert usage["tokens"] > 0
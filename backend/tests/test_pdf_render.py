@@ -0,0 +1,39 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.services import pdf_render
+from app.services.pdf_render import PDFRenderPool, PDFRenderUnavailableError
+
+
+def slow_render(content, file_path, document_title, document_date):
+    time.sleep(0.3)
+    with open(file_path, "wb") as file:
+        file.write(b"%PDF-1.4")
+    return 300.0
+
+
+async def test_file_of_a_timed_out_render_is_removed_when_it_ends(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_render, "_render", slow_render)
+    pool = PDFRenderPool(workers=0, max_queue=1, timeout=0.05)
+    file_path = str(tmp_path / "letter.pdf.tmp")
+
+    with pytest.raises(PDFRenderUnavailableError) as unavailable:
+        await pool.render("Dear landlord", file_path, "Letter")
+    assert unavailable.value.reason == "render timeout"
+    assert pool.get_stats()["active"] == 1
+
+    await asyncio.sleep(0.5)
+    assert pool.get_stats()["active"] == 0
+    assert not os.path.exists(file_path)
+
+
+async def test_file_of_a_completed_render_is_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_render, "_render", slow_render)
+    pool = PDFRenderPool(workers=0, max_queue=1, timeout=5)
+    file_path = str(tmp_path / "letter.pdf")
+
+    assert await pool.render("Dear landlord", file_path, "Letter") == 300.0
+    assert os.path.exists(file_path)
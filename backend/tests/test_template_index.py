@@ -0,0 +1,69 @@
+import time
+import uuid
+
+import pytest
+
+from app.core.database import SessionLocal, engine
+from app.models.database import DocumentTemplate
+from app.services.template_index import TemplateIndex, template_index
+
+
+@pytest.fixture
+def category(app):
+    category = f"test-{uuid.uuid4().hex[:8]}"
+    yield category
+    with engine.begin() as connection:
+        connection.execute(DocumentTemplate.__table__.delete().where(DocumentTemplate.category == category))
+
+
+def template_row(category: str) -> dict:
+    return {"name": f"Letter {uuid.uuid4().hex[:8]}", "category": category, "template_content": "Dear {{ name }}"}
+
+
+def test_committed_change_marks_the_index_stale(category):
+    template_index.get(category)
+    invalidations = template_index.invalidations
+
+    db = SessionLocal()
+    try:
+        db.add(DocumentTemplate(**template_row(category)))
+        db.flush()
+        db.rollback()
+        assert template_index.invalidations == invalidations
+
+        db.add(DocumentTemplate(**template_row(category)))
+        db.commit()
+    finally:
+        db.close()
+
+    assert template_index.invalidations == invalidations + 1
+    assert [template["category"] for template in template_index.get(category)] == [category]
+
+
+def test_change_from_another_process_is_found_by_the_periodic_check(category):
+    index = TemplateIndex(SessionLocal, check_interval=0.2)
+    index.refresh()
+    assert [template["category"] for template in index.get(category)] != [category]
+
+    # Core statements on their own connection fire no Session events, like a write from init_db.py
+    with engine.begin() as connection:
+        connection.execute(DocumentTemplate.__table__.insert().values(**template_row(category), is_active=True))
+
+    checks = index.checks
+    assert [template["category"] for template in index.get(category)] != [category]
+    assert index.checks == checks  # throttled: no query within the interval
+
+    time.sleep(0.25)
+    assert [template["category"] for template in index.get(category)] == [category]
+    assert index.external_changes == 1
+    assert index.loads == 2
+
+
+def test_check_without_changes_keeps_the_loaded_index(category):
+    index = TemplateIndex(SessionLocal, check_interval=0.01)
+    index.refresh()
+
+    time.sleep(0.02)
+    index.get(category)
+
+    assert (index.checks, index.external_changes, index.loads) == (1, 0, 1)